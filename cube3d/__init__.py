@@ -42,11 +42,34 @@ print (CB.is_solved())
 __ver__ = "0.0.1"
 
 __all__ = [ 
-	'Point', 'Band', 'Cube',
-	'get_cube'
+	'Point', 'Band', 'Cube', 'NxNCube',
+	'get_cube', 'read_cubes',
+	'from_facelets', 'to_facelets', 'from_json', 'read_csv',
+	'Algorithm', 'parse_moves', 'simplify', 'cycles', 'order',
+	'CubeBatch',
+	'solve', 'TwoPhaseSolver',
+	'canonicalize', 'validate',
+	'random_cube', 'random_scrambles',
 	]
 
 from .base import Point, Band, Cube
-from .input import get_cube
+from .nxn import NxNCube
+from .algorithm import Algorithm, parse_moves
+from .simplify import simplify
+from .cycles import cycles, order
+from .batch import CubeBatch
+from .solver import solve
+from .twophase import TwoPhaseSolver
+from .symmetry import canonicalize
+from .validate import validate
+from .scramble import random_cube, random_scrambles
+from .formats import from_facelets, to_facelets, from_json, read_csv
+
+def __getattr__(name):
+	# Excel readers need pandas, imported on first use only
+	if name in ('get_cube', 'read_cubes'):
+		from . import input
+		return getattr(input, name)
+	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -0,0 +1,202 @@
+"""Move sequences (algorithms) in standard notation, compiled to a single facelet permutation.
+
+Notation:
+	* F B U D L R : quarter turn of front, back, top (up), bottom (down), left, right face
+	* M E S       : quarter turn of middle slice, following L, D, F respectively
+	* x y z       : turn of whole cube, following R, U, F respectively
+	* suffix ``'`` for anti-clockwise, ``2`` for half turn (any number n turns n quarter turns)
+
+An `Algorithm` is compiled once and then applied to a `Cube` in one gather, whatever its length::
+
+	sexy = Algorithm("R U R' U'")
+	sexy.apply(cube)
+	(sexy ** 6).apply(cube)
+	(sexy * Algorithm("F2")).inverse().apply(cube)
+"""
+import re
+import numpy as np
+
+from .state import solved_state
+from .base import (
+	Cube, FACES, FACELETS, MOVES, MOVE_TABLE, ORIENTATION_TABLE, ORIENTATION_FACES,
+	front, top, bottom, right,
+)
+
+# ---------------
+
+_TOKEN = re.compile(r"\s*([FBUDLRMESxyz])(\d*)('?)\s*")
+_SUFFIX = {1: '', 2: '2', 3: "'"}
+
+def _orientation(**faces):
+	"""whole cube orientation permutation, where given positions hold given original faces.
+	"""
+	wanted = [(FACES.index(position), FACES.index(face)) for position, face in faces.items()]
+	for perm, now in zip(ORIENTATION_TABLE, ORIENTATION_FACES):
+		if all(now[position] == face for position, face in wanted):
+			return perm
+
+def _quarter_turns():
+	"""clockwise quarter turn permutation for each notation letter.
+	"""
+	turns = {name: MOVE_TABLE[i] for i, name in enumerate(MOVES) if len(name) == 1}
+	turns['x'] = _orientation(front=bottom, top=front)
+	turns['y'] = _orientation(front=right, top=top)
+	turns['z'] = _orientation(front=front, right=top)
+	inverse = lambda name: turns[name][turns[name]][turns[name]]
+	turns['M'] = turns['R'][inverse('L')][inverse('x')]
+	turns['E'] = turns['U'][inverse('D')][inverse('y')]
+	turns['S'] = inverse('F')[turns['B']][turns['z']]
+	return turns
+
+def _permutations():
+	"""permutation of every move name ( R, R2, R' ... ).
+	"""
+	permutations = {}
+	for name, quarter in _quarter_turns().items():
+		perm = np.arange(FACELETS)
+		for turns in (1, 2, 3):
+			perm = perm[quarter]
+			permutations[name + _SUFFIX[turns]] = np.array(perm, dtype=np.intp)
+	return permutations
+
+PERMUTATIONS = _permutations()
+
+# ---------------
+
+def parse_moves(moves):
+	"""parse a move sequence in standard notation.
+
+	Args:
+		moves (str): move sequence, ex: "R U R' U2 F"
+
+	Raises:
+		ValueError: for a move which is not in notation
+
+	Returns:
+		tuple: move names, ex: ('R', 'U', "R'", 'U2', 'F')
+	"""
+	parsed, position = [], 0
+	while position < len(moves):
+		token = _TOKEN.match(moves, position)
+		if not token:
+			if moves[position:].strip(): raise ValueError(f"invalid move at {position}: {moves[position:]!r}")
+			break
+		letter, count, prime = token.groups()
+		turns = (int(count) if count else 1) * (-1 if prime else 1) % 4
+		if turns: parsed.append(letter + _SUFFIX[turns])
+		position = token.end()
+	return tuple(parsed)
+
+
+class Algorithm():
+	"""A compiled move sequence. Holds the whole sequence as one facelet permutation.
+
+	Algorithms compose with ``*`` (left one first), invert with `inverse` and raise to powers with ``**``.
+	"""
+
+	def __init__(self, moves='', permutation=None):
+		"""Initialize Algorithm from a move sequence in standard notation, or from a ready permutation.
+
+		Args:
+			moves (str, tuple, optional): move sequence or parsed move names. Defaults to ''.
+			permutation (ndarray, optional): 54 facelet indexes. Defaults to None.
+		"""
+		self.moves = parse_moves(moves) if isinstance(moves, str) else tuple(moves)
+		if permutation is None:
+			permutation = np.arange(FACELETS)
+			for move in self.moves:
+				permutation = permutation[PERMUTATIONS[move]]
+		self.permutation = np.array(permutation, dtype=np.intp)
+
+	def __repr__(self): return f"Algorithm({' '.join(self.moves)!r})"
+	def __len__(self): return len(self.moves)
+	def __eq__(self, other): return isinstance(other, Algorithm) and np.array_equal(self.permutation, other.permutation)
+	def __hash__(self): return hash(self.permutation.tobytes())
+
+	def __mul__(self, other):
+		"""this algorithm followed by other.
+		"""
+		if isinstance(other, str): other = Algorithm(other)
+		return Algorithm(self.moves + other.moves, self.permutation[other.permutation])
+
+	def __pow__(self, k):
+		"""this algorithm repeated k times (negative k repeats inverse), by repeated squaring.
+		"""
+		base = self if k >= 0 else self.inverse()
+		k = abs(k) % _order(base.permutation)
+		result, square = np.arange(FACELETS), base.permutation
+		for bit in bin(k)[:1:-1]:
+			if bit == '1': result = result[square]
+			square = square[square]
+		return Algorithm(base.moves * k, result)
+
+	@property
+	def cubies(self):
+		"""cubies (cp, co, ep, eo) of algorithm applied to a solved cube, see `cubie`, or None for an algorithm
+		moving centers (whole cube turns, slices).
+		"""
+		if '_cubies' not in self.__dict__:
+			from .cubie import to_cubies
+			fixed = (self.permutation[4::9] == np.arange(4, FACELETS, 9)).all()
+			self._cubies = to_cubies(solved_state()[self.permutation]) if fixed else None
+		return self._cubies
+
+	def order(self):
+		"""number of repetitions of this algorithm getting a cube back to where it started, see `cycles`.
+		"""
+		return _order(self.permutation)
+
+	def inverse(self):
+		"""algorithm undoing this one.
+
+		Returns:
+			Algorithm: inverse algorithm
+		"""
+		permutation = np.empty_like(self.permutation)
+		permutation[self.permutation] = np.arange(FACELETS)
+		moves = tuple(move[0] + _SUFFIX[4 - _turns(move)] for move in reversed(self.moves))
+		return Algorithm(moves, permutation)
+
+	def simplified(self):
+		"""same algorithm written with fewest face turns, see `simplify.simplify`.
+
+		Returns:
+			Algorithm: simplified algorithm
+		"""
+		from .simplify import simplify
+		return Algorithm(simplify(self.moves), self.permutation)
+
+	def apply(self, cube):
+		"""apply algorithm to a cube, or to every cube of a CubeBatch, in place.
+
+		Args:
+			cube (Cube|CubeBatch): cube(s) to be moved
+
+		Returns:
+			Cube|CubeBatch: same cube(s) after move
+		"""
+		if isinstance(cube, Cube):
+			cube._permute(self)
+			cube._journal(self)
+		else:
+			cube.states = cube.states[:, self.permutation]
+		return cube
+
+	__call__ = apply
+
+
+def _turns(move):
+	"""number of clockwise quarter turns of a move name.
+	"""
+	return {'': 1, '2': 2, "'": 3}[move[1:]]
+
+def _order(permutation):
+	"""number of repetitions of a permutation to get back to identity.
+	"""
+	order, seen = 1, np.zeros(len(permutation), dtype=bool)
+	for start in range(len(permutation)):
+		length, i = 0, start
+		while not seen[i]:
+			seen[i], i, length = True, permutation[i], length + 1
+		if length: order = np.lcm(order, length)
+	return int(order)
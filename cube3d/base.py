@@ -1,7 +1,13 @@
 """Model defining 0D, 1D, 2D, 3D elements requirements for cube and its rotation methods.
 """
+from collections import deque, namedtuple
 import numpy as np
 
+from .state import (
+	FACES, FACELETS, DEFAULT_COLORS, POSITIONS, NORMALS, POINT_FACELETS,
+	face_index, facelet_at, solved_state, encode, decode,
+)
+
 # ---------------
 
 AXISES = ('x', 'y', 'z')
@@ -17,6 +23,8 @@ axis_map = {
 	left: {'x': -1},
 	right: {'x': 1},
 }
+# saved state of a cube, see `Cube.snapshot`
+Snapshot = namedtuple('Snapshot', ('facelets', 'orientation', 'colors'))
 # ---------------
 
 class Members():
@@ -70,24 +78,82 @@ class Square(Members):
 
 class Cube(Members):
 	"""A Three-Dimentional; Cube object and its properties 
-	"""    	
 
-	def __init__(self, *arg):
+	Cube state is kept compact as 54 facelet color codes in one ``uint8`` array (`state`) and
+	color names once in `colors`. Points, Bands and Squares are built from this state on request.
+
+	Turning the whole cube (`change_to`) only changes its `orientation`, an index in ORIENTATION_TABLE:
+	the new cube shares facelets of old one (made read-only) and reads them through that permutation.
+	Moves and color updates never write into shared facelets, they replace them. That makes `clone` and
+	`snapshot` cheap (nothing is copied), and a cube only gets own facelets on its next move.
+
+	Moves (face turns and applied algorithms) can be kept in a journal of last `journal_size` moves, to be
+	reverted with `undo` and done again with `redo`. Journal is off by default (journal_size 0), so that
+	moves cost nothing more and a cube stays small; turn it on for a cube which needs undo::
+
+		cube.journal_size = 100
+	"""
+	journal_size = 0
+	_undo = _redo = _pieces = None
+
+	def __init__(self, *arg, state=None, colors=None, orientation=0):
 		"""Initialize Cube object by providing its members as in arguments. which will be numpy array of arrays
-		"""    		
-		super().__init__(*arg)
-		self.set_initial_views()
+		(three Squares of three Bands of three Points). Alternatively provide compact `state` and `colors`
+		directly. Without any of them a solved cube is created.
 
-	def set_initial_views(self):
-		"""set all six faces of cube. faces are (front, back, left, right, top, bottom)
-		"""    		
-		self.views = {
-			front: 	self[0],
-			back: 	np.flip(np.flip(self[2]), 1),
-			left: 	np.flip(self[...,0].T, 1),
-			right: 	self[...,2].T,
-			top: 	self[[0,1,2], 2],
-			bottom: np.flip(np.flip(self[[0,1,2], 0]), 1),
+		Args:
+			state (ndarray, optional): 54 facelet color codes. Defaults to None.
+			colors (tuple, optional): color names for color codes. Defaults to None.
+			orientation (int, optional): orientation in which `state` is to be read. Defaults to 0 (as is).
+		"""
+		if arg:
+			state, colors = _state_from_points(np.array(arg))
+		elif state is None:
+			state = solved_state()
+		self._facelets = np.ascontiguousarray(state, dtype=np.uint8)
+		self.orientation = orientation
+		self.colors = DEFAULT_COLORS if colors is None else tuple(colors)
+
+	@property
+	def state(self):
+		"""54 facelet color codes as seen in current orientation.
+		"""
+		if self.orientation:
+			self._facelets = self._facelets[ORIENTATION_TABLE[self.orientation]]
+			self.orientation = 0
+		return self._facelets
+
+	@state.setter
+	def state(self, state):
+		self._facelets = np.ascontiguousarray(state, dtype=np.uint8)
+		self.orientation = 0
+		self._pieces = None
+
+	@property
+	def members(self):
+		"""27 Point objects (3x3x3 numpy array) built from current state. Points are a snapshot,
+		changing them does not change the cube.
+		"""
+		points, state = np.empty((3, 3, 3), dtype=object), self.state
+		for zi, yi, xi in np.ndindex(3, 3, 3):
+			colors = {}
+			for xiscolor, f in zip(XISCOLOR, POINT_FACELETS[zi, yi, xi]):
+				colors[xiscolor] = self.colors[state[f]] if f >= 0 else None
+			points[zi, yi, xi] = Point(x=xi-1, y=yi-1, z=zi-1, **colors)
+		return points
+
+	@property
+	def views(self):
+		"""all six faces of cube as Point objects. faces are (front, back, left, right, top, bottom)
+		"""
+		points = self.members
+		return {
+			front: 	points[0],
+			back: 	np.flip(np.flip(points[2]), 1),
+			left: 	np.flip(points[...,0].T, 1),
+			right: 	points[...,2].T,
+			top: 	points[[0,1,2], 2],
+			bottom: np.flip(np.flip(points[[0,1,2], 0]), 1),
 		}
 
 	def show(self, view):
@@ -97,61 +163,137 @@ class Cube(Members):
 			view (str): face of a cube
 
 		Returns:
-			list: Two dimentional Square Object detail
-		"""    		
-		op_dic = []
-		xis = view_dir[view]
-		for band in self.views[view]:
-			for piece in band:
-				op_dic.append(piece.members[xis])
-		op_dic = np.array(op_dic)
-		op_dic.resize(3,3)
-		return op_dic
+			ndarray: 3x3 colors of the face
+		"""
+		return decode(self._facelets[VIEW_INDEX[self.orientation, face_index(view)]], self.colors)
+
+	def show_all(self):
+		"""return all six faces of cube, in FACES order (front, back, top, bottom, left, right).
+
+		Returns:
+			ndarray: 6x3x3 colors of the faces
+		"""
+		return decode(self._facelets[VIEW_INDEX[self.orientation]], self.colors)
 
 	def update_view(self, view, updated_sqr):
-		"""update face of cube with given updated Square
+		"""update face of cube with given updated Square, or with 3x3 colors of the face (as `show` returns).
+		Points of a Square update colors of their side facelets too.
 
 		Args:
 			view (str): face of a cube
 			updated_sqr (Square): Square object, numpy array of array
-		"""    		
-		for i, band in enumerate(self.views[view]):
-			for j, piece in enumerate(band):
-				
-				self.views[view][i, j] = updated_sqr.members.flat[i*3+j]
+		"""
+		f = face_index(view)
+		points = np.asarray(updated_sqr.members if isinstance(updated_sqr, Members) else updated_sqr)
+		if not isinstance(points.flat[0], Point):
+			self._set_colors(np.arange(f*9, f*9+9), points.ravel())
+			return
+		facelets = VIEW_POINT_FACELETS[f]
+		colors = [[point.members[xis]['xiscolor'] for xis in AXISES] for point in points.flat]
+		has = facelets >= 0
+		self._set_colors(facelets[has], np.array(colors, dtype=object)[has])
+
+	def _set_colors(self, facelets, colors):
+		"""set colors of given facelets, new colors are added to palette.
 
+		Args:
+			facelets (list): facelet indexes
+			colors (list): color names for those facelets
+		"""
+		codes = {color: i for i, color in enumerate(self.colors)}
+		for color in colors:
+			if color not in codes: codes[color] = len(codes)
+		self.colors = tuple(codes)
+		state = self.state.copy()
+		state[facelets] = [codes[color] for color in colors]
+		self.state = state
 
 	def is_solved(self):
 		"""check is cube in solved position
 
 		Returns:
 			bool: True if solved, else False
-		"""    		
-		for view, xis in view_dir.items():
-			for band in self.views[view]:
-				if not self._all_points_same(band, xis): return False
-		return True
+		"""
+		# whole cube turns keep faces together, so facelets need not be read in orientation
+		faces = self._facelets.reshape(6, 9)
+		return bool((faces == faces[:, :1]).all())
+
+	# Identity --------------------------------
 
-	@staticmethod
-	def _all_points_same(band, xis):
-		"""to check the provided axis color remain unchanged or not.
+	def rank(self):
+		"""unique number of cube state, see `cubie.rank_state`.
+
+		Raises:
+			ValueError: if cube is not in a legal state
+
+		Returns:
+			int: rank, below 24 * cubie.STATES
+		"""
+		from .cubie import rank_state
+		return rank_state(self.state)
+
+	@classmethod
+	def from_rank(cls, rank, colors=None):
+		"""cube of a rank given by `rank`.
 
 		Args:
-			band (Square): Square 2D object
-			xis (str): axis (x,y,z)
+			rank (int): rank of cube state
+			colors (tuple, optional): color names for color codes. Defaults to DEFAULT_COLORS.
 
 		Returns:
-			bool: True if all colors are same as previous, else False
-		"""    		
-		xiscolor = ''
-		for piece in band:
-			piece_color = piece.members[xis]['xiscolor']#[:3]		# enable [:3] to match only first 3 characters of color
-			if xiscolor == '':
-				xiscolor = piece_color
-				continue
-			elif xiscolor != piece_color:
-				return False
-		return True
+			Cube: Cube object
+		"""
+		from .cubie import unrank_state
+		return cls(state=unrank_state(rank), colors=colors)
+
+	def __eq__(self, other):
+		"""cubes are equal when every facelet has same color.
+		"""
+		if not isinstance(other, Cube): return NotImplemented
+		if self.colors == other.colors: return bool(np.array_equal(self.state, other.state))
+		return bool(np.array_equal(decode(self.state, self.colors), decode(other.state, other.colors)))
+
+	def __hash__(self):
+		"""hash of facelets as faces they belong to, and center colors (independent of palette order).
+		`rank` is a perfect hash of legal cubes, but much slower.
+		"""
+		from .cubie import face_labels
+		try:
+			return hash((face_labels(self.state).tobytes(), tuple(self.colors[code] for code in self.state[4::9])))
+		except ValueError:
+			return hash(tuple(decode(self.state, self.colors)))
+
+	# Pieces --------------------------------
+
+	def pieces(self):
+		"""location index of pieces of current state, see `pieces.PieceIndex`. it is built on first use, then
+		updated by face turns and applied algorithms (built again after state is assigned).
+
+		Raises:
+			ValueError: if a corner or edge is not a real piece
+
+		Returns:
+			PieceIndex: piece index
+		"""
+		if self._pieces is None or self._pieces.palette != self.colors:
+			from .pieces import PieceIndex
+			self._pieces = PieceIndex.of_state(self.state, self.colors)
+		return self._pieces
+
+	def locate(self, colors):
+		"""where a piece is, ex: cube.locate(('White', 'Red', 'Blue')), see `pieces.PieceIndex.locate`.
+		"""
+		return self.pieces().locate(colors)
+
+	def piece_at(self, position):
+		"""piece at (x, y, z) position, see `pieces.PieceIndex.piece_at`.
+		"""
+		return self.pieces().piece_at(position)
+
+	def unsolved_pieces(self):
+		"""pieces not at home or turned at home, see `pieces.PieceIndex.unsolved`.
+		"""
+		return self.pieces().unsolved()
 
 	# Rotation of Cube --------------------------------
 
@@ -160,47 +302,40 @@ class Cube(Members):
 
 		Returns:
 			Cube: updated cube after move
-		"""    		
-		l = [cube[[2,1,0], i] for i in range(3)]
-		return _rotate_cube(l, swap_axis=('y', 'z'), inverse_axis='z')
+		"""
+		return cube.change_to(bottom)
 
 	def change_to_top(cube):
 		"""Turn the whole cube, i.e. Turn cube such face it faces now towards top Square.
 
 		Returns:
 			Cube: updated cube after move
-		"""    		
-		l = [cube[[0,1,2], i] for i in reversed(range(3))]
-		return _rotate_cube(l, swap_axis=('y', 'z'), inverse_axis='y')
+		"""
+		return cube.change_to(top)
 
 	def change_to_left(cube):
 		"""Turn the whole cube, i.e. Turn cube such face it faces now towards left Square.
 
 		Returns:
 			Cube: updated cube after move
-		"""    		
-		l = np.array([cube[...,j][[2,1,0], i] for j in range(3) for i in range(3)])
-		l.resize(3,3,3)
-		return _rotate_cube(l, swap_axis=('x', 'z'), inverse_axis='z')
+		"""
+		return cube.change_to(left)
 
 	def change_to_right(cube):
 		"""Turn the whole cube, i.e. Turn cube such face it faces now towards right Square.
 
 		Returns:
 			Cube: updated cube after move
-		"""    		
-		l = np.array([cube[...,j][[0,1,2], i] for j in reversed(range(3)) for i in range(3)])
-		l.resize(3,3,3)
-		return _rotate_cube(l, swap_axis=('x', 'z'), inverse_axis='x')
+		"""
+		return cube.change_to(right)
 
 	def change_to_back(cube):
 		"""Turn the whole cube, i.e. Turn cube such face it faces now towards back Square.
 
 		Returns:
 			Cube: updated cube after move
-		"""    		
-		_cube = cube.change_to_top()
-		return _cube.change_to_top()
+		"""
+		return cube.change_to(back)
 
 	def change_to(cube, view):
 		"""Turn the whole cube, i.e. Turn cube such face it faces now towards give view side.
@@ -209,16 +344,10 @@ class Cube(Members):
 			view (str): face name to turn towards
 
 		Returns:
-			Cube: updated cube after move
-		"""    		
-		maps = {
-			left: cube.change_to_left(),
-			right: cube.change_to_right(),
-			top: cube.change_to_top(),
-			bottom: cube.change_to_bottom(),
-			back: cube.change_to_back(),
-		}
-		return maps[view]
+			Cube: updated cube after move, sharing facelets with this cube
+		"""
+		cube._facelets.flags.writeable = False
+		return Cube(state=cube._facelets, colors=cube.colors, orientation=ORIENTATION_PRODUCT[cube.orientation, CHANGE_TO[view]])
 
 	# Rotation of a Square --------------------------------
 
@@ -228,13 +357,97 @@ class Cube(Members):
 		Args:
 			view (str): face name to be rotated
 			clockwise (bool, optional): True will rotate clockwise False will rotate anti-clockwise. Defaults to True.
-		"""    		
-		sqr = cube.views[view]
-		sqr = [ sqr[[0,1,2], i]  for i in reversed(range(3)) ] if clockwise else [ sqr[[2,1,0], i]  for i in range(3) ] 
-		swap_axis = _get_swap_axis(view, clockwise)
-		inverse_axis = _get_inverse_axis(swap_axis, clockwise)
-		updated_sqr = _rotate_square(sqr, swap_axis=swap_axis, inverse_axis=inverse_axis)
-		cube.update_view(view, updated_sqr)
+		"""
+		cube._facelets = cube._facelets[_FRAME_TURNS[cube.orientation, view, clockwise]]
+		if cube._pieces is not None: cube._pieces.turn(_FACE_MOVES[view, clockwise])
+		cube._journal((view, clockwise))
+
+	# Snapshots and journal --------------------------------
+
+	def clone(self):
+		"""copy of cube sharing facelets until either of both moves (copy-on-write).
+
+		Returns:
+			Cube: copy, with an empty journal (and journal off)
+		"""
+		self._facelets.flags.writeable = False
+		return Cube(state=self._facelets, colors=self.colors, orientation=self.orientation)
+
+	__copy__ = clone
+	def __deepcopy__(self, memo): return self.clone()
+
+	def snapshot(self):
+		"""current state of cube, to be brought back with `restore`. nothing is copied.
+
+		Returns:
+			Snapshot: saved state
+		"""
+		self._facelets.flags.writeable = False
+		return Snapshot(self._facelets, self.orientation, self.colors)
+
+	def restore(self, snapshot):
+		"""bring cube back to a saved state. journal is cleared, moves made before do not apply anymore.
+
+		Args:
+			snapshot (Snapshot): state from `snapshot`
+		"""
+		self._facelets, self.orientation, self.colors = snapshot
+		self._undo = self._redo = self._pieces = None
+
+	def _journal(self, move):
+		"""record a move done, a new move drops moves undone so far.
+
+		Args:
+			move (tuple, Algorithm): (view, clockwise) of a face turn, or an applied algorithm
+		"""
+		if not self.journal_size: return
+		if self._undo is None: self._undo = deque(maxlen=self.journal_size)
+		self._undo.append(move)
+		self._redo = None
+
+	def _permute(self, algorithm):
+		"""move cube by permutation of an algorithm, keeping piece index when algorithm leaves centers in place.
+		"""
+		pieces = self._pieces
+		self.state = self.state[algorithm.permutation]
+		if pieces is not None and algorithm.cubies is not None:
+			pieces.apply(algorithm.cubies)
+			self._pieces = pieces
+
+	def _move(self, move, backwards):
+		"""do a journal move, or its inverse, without recording it.
+		"""
+		if isinstance(move, tuple):
+			view, clockwise = move
+			self._facelets = self._facelets[_FRAME_TURNS[self.orientation, view, clockwise != backwards]]
+			if self._pieces is not None: self._pieces.turn(_FACE_MOVES[view, clockwise != backwards])
+		else:
+			self._permute(move.inverse() if backwards else move)
+
+	def undo(self):
+		"""revert last move by doing its inverse (moves are journaled only with journal_size set).
+
+		Returns:
+			bool: False if there is no move to undo
+		"""
+		if not self._undo: return False
+		move = self._undo.pop()
+		self._move(move, backwards=True)
+		if self._redo is None: self._redo = []
+		self._redo.append(move)
+		return True
+
+	def redo(self):
+		"""do again last undone move.
+
+		Returns:
+			bool: False if there is no move to redo
+		"""
+		if not self._redo: return False
+		move = self._redo.pop()
+		self._move(move, backwards=False)
+		self._undo.append(move)
+		return True
 
 
 
@@ -250,7 +463,7 @@ def _get_swap_axis(view, clockwise):
 
 	Returns:
 		tuple: detail in tuple for axis to be swapped.
-	"""	
+	"""
 	swap_axis = {
 		front: ('x', 'y'), back: ('y', 'x'),
 		left: ('y', 'z'), right: ('z', 'y'),
@@ -260,6 +473,8 @@ def _get_swap_axis(view, clockwise):
 
 def _get_inverse_axis(swap_axis, clockwise):
 	"""returns the axis which is needed to be inversed based on rotation direction.
+	swap_axis from `_get_swap_axis` is already reversed for anti-clockwise rotation, so its first axis is
+	the one to be inversed in either direction.
 
 	Args:
 		swap_axis (tuple): axis details to be swapped during rotations
@@ -267,54 +482,192 @@ def _get_inverse_axis(swap_axis, clockwise):
 
 	Returns:
 		str: axis to be inversed
-	"""    	
-	return swap_axis[0] if clockwise else swap_axis[1]
+	"""
+	return swap_axis[0]
 
-def _rotate_square(bands, *args, **kwargs):
-	"""rotate given square/band with provided swap axis and inverse_axis details in kwargs.
-	kwargs defines = swap_axis, inverse_axis
+def _square_permutation(view, clockwise=True):
+	"""facelet permutation rotating given face (square) in given direction.
 
 	Args:
-		bands (Square): Square 2D object (containing bands) to be rotated.
+		view (str): face name to be rotated
+		clockwise (bool, optional): direction of rotation. Defaults to True.
 
 	Returns:
-		Square: Square 2D object after rotation.
-	"""    	
-	s = Square(*bands)
-	return _change_position(s, *args, **kwargs)
+		ndarray: facelet indexes, state after rotation is ``state[permutation]``
+	"""
+	swap_axis = _get_swap_axis(view, clockwise)
+	inverse_axis = _get_inverse_axis(swap_axis, clockwise)
+	(xis, direction), = axis_map[view].items()
+	layer = np.flatnonzero(POSITIONS[:, AXISES.index(xis)] == direction)
+	return _change_position(np.arange(FACELETS), layer, swap_axis=swap_axis, inverse_axis=inverse_axis)
+
+def _rotate_square(state, view, clockwise=True):
+	"""rotate given face (square) of cube state(s) in given direction.
+
+	Args:
+		state (ndarray): 54 facelet color codes, or (..., 54) array of many states
+		view (str): face name to be rotated
+		clockwise (bool, optional): direction of rotation. Defaults to True.
+
+	Returns:
+		ndarray: state after rotation.
+	"""
+	return state[..., _TURNS[view, clockwise]]
 
 
 ### Functions for Cube ###
 
-def _rotate_cube(squares, *args, **kwargs):
-	"""rotate given cube with provided swap axis and inverse_axis details in kwargs. 
+# axis to swap and inverse for turning whole cube towards a face
+cube_turns = {
+	left: (('x', 'z'), 'z'),
+	right: (('x', 'z'), 'x'),
+	top: (('y', 'z'), 'y'),
+	bottom: (('y', 'z'), 'z'),
+}
+
+def _cube_permutation(swap_axis, inverse_axis):
+	"""facelet permutation turning whole cube with provided swap axis and inverse_axis.
+
+	Returns:
+		ndarray: facelet indexes, state after turn is ``state[permutation]``
+	"""
+	return _change_position(np.arange(FACELETS), np.arange(FACELETS), swap_axis, inverse_axis)
+
+def _rotate_cube(state, view):
+	"""turn whole cube state(s) such that given face (view) comes to front.
 
 	Args:
-		squares (Cube): Cube 3D object (containing Squares) to be rotated
+		state (ndarray): 54 facelet color codes, or (..., 54) array of many states
+		view (str): face to be turned towards
 
 	Returns:
-		Cube: Cube 3D object
-	"""    	
-	c = Cube(*squares)
-	return _change_position(c, *args, **kwargs)
+		ndarray: state after rotation.
+	"""
+	return state[..., ORIENTATION_TABLE[CHANGE_TO[view]]]
 
 
 ### Functions Common ###
 
-def _change_position(instance, swap_axis, inverse_axis):
-	"""rotate an instance/object (either Square, Cube)
+def _change_position(state, facelets, swap_axis, inverse_axis):
+	"""move given facelets of a cube state, by swapping and inversing their co-ordinates and directions.
 
 	Args:
-		instance (Square, Cube): Either Square-2D , Cube-3D object
-		swap_axis ([type]): axis to be swapped
-		inverse_axis ([type]): axis to be inversed
+		state (ndarray): 54 facelet color codes
+		facelets (ndarray): indexes of facelets to be moved
+		swap_axis (tuple): axis to be swapped
+		inverse_axis (str): axis to be inversed
 
 	Returns:
-		Square, Cube: Either Square-2D , Cube-3D object
-	"""    	
-	a, b = swap_axis[0], swap_axis[1]
-	for point in instance.members.flat:
-		point.members[inverse_axis]['direction'] *= -1
-		point.members[a], point.members[b] = point.members[b], point.members[a]
-	return instance
+		ndarray: state after move
+	"""
+	a, b = AXISES.index(swap_axis[0]), AXISES.index(swap_axis[1])
+	i = AXISES.index(inverse_axis)
+	positions, normals = POSITIONS[facelets], NORMALS[facelets]
+	for v in (positions, normals):
+		v[:, i] *= -1
+		v[:, [a, b]] = v[:, [b, a]]
+	moved = state.copy()
+	moved[facelet_at(positions, normals)] = state[facelets]
+	return moved
+
+
+### Permutation tables ###
+# All moves are precomputed once as facelet permutations, applying a move is a single gather:
+# ``state[..., MOVE_TABLE[move]]``.
+
+# 18 face turns; move = face * 3 + (0: clockwise, 1: half turn, 2: anti-clockwise)
+FACE_NOTATION = {front: 'F', back: 'B', top: 'U', bottom: 'D', left: 'L', right: 'R'}
+MOVES = tuple(FACE_NOTATION[view] + suffix for view in FACES for suffix in ('', '2', "'"))
+
+def _move_table():
+	"""permutations of all 18 face turns.
 
+	Returns:
+		ndarray: (18, 54) facelet indexes
+	"""
+	table = []
+	for view in FACES:
+		quarter = _square_permutation(view)
+		table.append(quarter)
+		table.append(quarter[quarter])
+		table.append(quarter[quarter][quarter])
+	return np.array(table, dtype=np.intp)
+
+def _orientation_table():
+	"""permutations of all 24 whole cube orientations, generated by turning cube towards top and right.
+	orientation 0 is the identity.
+
+	Returns:
+		ndarray: (24, 54) facelet indexes
+	"""
+	generators = [_cube_permutation(*cube_turns[view]) for view in (top, right)]
+	table, pending = [np.arange(FACELETS)], [np.arange(FACELETS)]
+	seen = {table[0].tobytes()}
+	while pending:
+		perm = pending.pop(0)
+		for generator in generators:
+			turned = perm[generator]
+			if turned.tobytes() in seen: continue
+			seen.add(turned.tobytes())
+			table.append(turned)
+			pending.append(turned)
+	return np.array(table, dtype=np.intp)
+
+MOVE_TABLE = _move_table()
+ORIENTATION_TABLE = _orientation_table()
+_ORIENTATION_INDEX = {perm.tobytes(): i for i, perm in enumerate(ORIENTATION_TABLE)}
+
+def orientation_index(permutation):
+	"""index in ORIENTATION_TABLE of a whole cube permutation.
+	"""
+	return _ORIENTATION_INDEX[np.asarray(permutation, dtype=np.intp).tobytes()]
+
+# orientation reached by turning towards each face
+CHANGE_TO = {view: orientation_index(_cube_permutation(*turn)) for view, turn in cube_turns.items()}
+CHANGE_TO[back] = orientation_index(ORIENTATION_TABLE[CHANGE_TO[top]][ORIENTATION_TABLE[CHANGE_TO[top]]])
+# original face now at each face position, for every orientation
+ORIENTATION_FACES = ORIENTATION_TABLE[:, 4::9] // 9
+# facelets of each face (3x3, as `Cube.show` lays it out) in every orientation
+VIEW_INDEX = ORIENTATION_TABLE.reshape(len(ORIENTATION_TABLE), len(FACES), 3, 3)
+# facelets (along x, y, z, -1 for none) of the Points of each face, in face layout
+VIEW_POINT_FACELETS = POINT_FACELETS[tuple((POSITIONS + 1).T[::-1])].reshape(len(FACES), 9, 3)
+
+_TURNS = {}
+for _f, _view in enumerate(FACES):
+	_TURNS[_view, True] = MOVE_TABLE[_f*3]
+	_TURNS[_view, False] = MOVE_TABLE[_f*3 + 2]
+
+# orientation after turning a cube of orientation a to orientation b (of its own frame)
+ORIENTATION_PRODUCT = np.array([[orientation_index(a[b]) for b in ORIENTATION_TABLE] for a in ORIENTATION_TABLE])
+
+def _frame_turns():
+	"""face turns as seen in each orientation, as permutations of unturned facelets: turning facelets of a
+	cube with orientation o by ``_FRAME_TURNS[o, view, clockwise]`` turns its view as seen in that orientation.
+	"""
+	turns = {}
+	for o, perm in enumerate(ORIENTATION_TABLE):
+		inverse = np.argsort(perm)
+		for (view, clockwise), turn in _TURNS.items():
+			turns[o, view, clockwise] = perm[turn][inverse]
+	return turns
+
+_FRAME_TURNS = _frame_turns()
+# number in MOVES of a face turn, the same in every orientation (it is read in orientation of cube)
+_FACE_MOVES = {(view, clockwise): f * 3 + (0 if clockwise else 2) for f, view in enumerate(FACES) for clockwise in (True, False)}
+
+
+def _state_from_points(points):
+	"""compact state of a cube from its 27 Point objects.
+
+	Args:
+		points (ndarray): 3x3x3 array of Point objects
+
+	Returns:
+		tuple: (state, colors) facelet color codes and color names
+	"""
+	colors = []
+	for position, normal in zip(POSITIONS, NORMALS):
+		x, y, z = position
+		xis = AXISES[np.flatnonzero(normal)[0]]
+		colors.append(points[z+1, y+1, x+1].members[xis]['xiscolor'])
+	return encode(colors)
@@ -0,0 +1,176 @@
+"""Many cubes at once. States of N cubes are held as one (N, 54) ``uint8`` array and every
+move, turn of whole cube, solved check and face extraction is a single NumPy operation over it.
+"""
+import numpy as np
+
+from .base import Cube, FACELETS, DEFAULT_COLORS, MOVES, MOVE_TABLE, VIEW_INDEX, _rotate_square, _rotate_cube
+from .state import face_index, solved_state, decode
+from .algorithm import Algorithm, parse_moves
+
+# ---------------
+
+# move table with an extra identity row, so that move index -1 means "no move"
+_STEPS = np.vstack([MOVE_TABLE, np.arange(FACELETS)])
+
+def move_indexes(moves):
+	"""convert move names to indexes in MOVE_TABLE.
+
+	Args:
+		moves (str, iterable): face turns in standard notation, or move names/indexes
+
+	Returns:
+		ndarray: move indexes
+	"""
+	if isinstance(moves, str): moves = parse_moves(moves)
+	return np.array([MOVES.index(m) if isinstance(m, str) else m for m in moves], dtype=np.intp)
+
+
+class CubeBatch():
+	"""N Cubes sharing one color palette, with their states in a single (N, 54) array.
+	"""
+
+	def __init__(self, states, colors=None):
+		"""Initialize batch by providing states of cubes.
+
+		Args:
+			states (ndarray): (N, 54) facelet color codes
+			colors (tuple, optional): color names for color codes. Defaults to DEFAULT_COLORS.
+		"""
+		self.states = np.ascontiguousarray(states, dtype=np.uint8).reshape(-1, FACELETS)
+		self.colors = DEFAULT_COLORS if colors is None else tuple(colors)
+
+	@classmethod
+	def solved(cls, n, colors=None):
+		"""batch of n solved cubes.
+		"""
+		return cls(np.tile(solved_state(), (n, 1)), colors)
+
+	@classmethod
+	def from_cubes(cls, cubes):
+		"""batch from Cube objects, colors are brought to palette of first cube.
+
+		Args:
+			cubes (list): Cube objects
+
+		Returns:
+			CubeBatch: batch of cubes
+		"""
+		cubes = list(cubes)
+		palette = list(cubes[0].colors) if cubes else list(DEFAULT_COLORS)
+		states = np.empty((len(cubes), FACELETS), dtype=np.uint8)
+		for i, cube in enumerate(cubes):
+			if cube.colors == tuple(palette[:len(cube.colors)]):
+				states[i] = cube.state
+				continue
+			for color in cube.colors:
+				if color not in palette: palette.append(color)
+			codes = np.array([palette.index(color) for color in cube.colors], dtype=np.uint8)
+			states[i] = codes[cube.state]
+		return cls(states, palette)
+
+	@classmethod
+	def from_rank(cls, ranks, colors=None):
+		"""batch of cubes of given ranks, see `cubie.rank_state`.
+		"""
+		from .cubie import unrank_state
+		return cls(unrank_state(np.asarray(ranks, dtype=object).reshape(-1)), colors)
+
+	def __len__(self): return len(self.states)
+	def __iter__(self): return (self[i] for i in range(len(self)))
+
+	def __getitem__(self, i):
+		"""single Cube for an integer index, sub-batch for a slice / mask / index array.
+		"""
+		if isinstance(i, (int, np.integer)):
+			return Cube(state=self.states[i].copy(), colors=self.colors)
+		return CubeBatch(self.states[i], self.colors)
+
+	def copy(self):
+		"""independent copy of batch.
+		"""
+		return CubeBatch(self.states.copy(), self.colors)
+
+	# Moves --------------------------------
+
+	def rotate_square(self, view, clockwise=True):
+		"""rotate a side/view of all cubes in given direction perspective to that face.
+
+		Args:
+			view (str): face name to be rotated
+			clockwise (bool, optional): True will rotate clockwise False will rotate anti-clockwise. Defaults to True.
+		"""
+		self.states = _rotate_square(self.states, view, clockwise)
+
+	def apply(self, moves):
+		"""apply moves to all cubes.
+
+		Args:
+			moves (str, Algorithm): move sequence in standard notation or compiled algorithm
+		"""
+		if not isinstance(moves, Algorithm): moves = Algorithm(moves)
+		self.states = self.states[:, moves.permutation]
+
+	def apply_moves(self, moves):
+		"""apply a different move to each cube.
+
+		Args:
+			moves (ndarray): move indexes in MOVE_TABLE, shape (N,) for one move per cube or (N, L) for a
+				sequence of L moves per cube. index -1 is no move (to pad shorter sequences).
+		"""
+		moves = np.asarray(moves, dtype=np.intp)
+		if moves.ndim == 1: moves = moves[:, None]
+		for column in moves.T:
+			self.states = np.take_along_axis(self.states, _STEPS[column], axis=1)
+
+	def change_to(self, view):
+		"""Turn all cubes, i.e. Turn cubes such face it faces now towards give view side.
+
+		Args:
+			view (str): face name to turn towards
+
+		Returns:
+			CubeBatch: updated cubes after move
+		"""
+		return CubeBatch(_rotate_cube(self.states, view), self.colors)
+
+	# Verification/Display --------------------------------
+
+	def is_solved(self):
+		"""check which cubes are in solved position
+
+		Returns:
+			ndarray: (N,) bool, True for solved cubes
+		"""
+		faces = self.states.reshape(-1, 6, 9)
+		return (faces == faces[:, :, :1]).all(axis=(1, 2))
+
+	def rank(self):
+		"""unique number of state of each cube, see `cubie.rank_state`.
+
+		Raises:
+			ValueError: if a cube is not in a legal state
+
+		Returns:
+			ndarray: (N,) object array of int ranks
+		"""
+		from .cubie import rank_state
+		return rank_state(self.states)
+
+	def show(self, view):
+		"""return the face of all cubes.
+
+		Args:
+			view (str): face of cubes
+
+		Returns:
+			ndarray: (N, 3, 3) colors of the face
+		"""
+		return decode(self.states[:, VIEW_INDEX[0, face_index(view)]], self.colors)
+
+	def show_all(self):
+		"""return all six faces of all cubes, in FACES order.
+
+		Returns:
+			ndarray: (N, 6, 3, 3) colors of the faces
+		"""
+		return decode(self.states[:, VIEW_INDEX[0]], self.colors)
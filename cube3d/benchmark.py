@@ -0,0 +1,284 @@
+"""Benchmark suite. Times the main operations of cube3d over several input sizes, records peak memory,
+and compares a run against a saved baseline::
+
+	cube3d bench --save baseline.json             # record numbers
+	cube3d bench --compare baseline.json          # fails (exit status 1) on a slowdown beyond threshold
+
+A benchmark is a function taking the input size ``n`` and returning the callable to be measured, so that
+setup is not timed. Each case is timed a few times (best time is kept, as in `timeit`) and run once more
+under `tracemalloc` for its peak memory. Cases whose requirements are not there (pandas, cube.xlsx,
+solver tables) are skipped.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import tempfile
+import tracemalloc
+import numpy as np
+
+from .base import Cube, FACES, MOVES
+from .batch import CubeBatch
+from .algorithm import Algorithm
+
+# ---------------
+
+BENCHMARKS = {}
+THRESHOLD = 0.25
+SCRAMBLE_LENGTH = 20
+
+class Skip(Exception):
+	"""raised by a benchmark setup when it can not run here.
+	"""
+
+def benchmark(*sizes):
+	"""register a benchmark function for given input sizes.
+	"""
+	def register(function):
+		BENCHMARKS[function.__name__] = (function, sizes)
+		return function
+	return register
+
+_TEMPORARY = None		# folder of files made by benchmark setups, removed at end of suite (or of Python)
+
+def _temporary_folder():
+	global _TEMPORARY
+	if _TEMPORARY is None: _TEMPORARY = tempfile.TemporaryDirectory(prefix='cube3d-bench-')
+	return _TEMPORARY.name
+
+def _remove_temporary_folder():
+	global _TEMPORARY
+	if _TEMPORARY is not None: _TEMPORARY.cleanup()
+	_TEMPORARY = None
+
+def _scrambles(n, seed=0):
+	"""n random move index sequences of SCRAMBLE_LENGTH face turns, (n, SCRAMBLE_LENGTH).
+	"""
+	return np.random.default_rng(seed).integers(0, len(MOVES), (n, SCRAMBLE_LENGTH))
+
+def _workbook(n):
+	"""Excel workbook of n cubes (3x3 blocks one below other, a sheet per side), file name in temporary folder.
+	"""
+	try:
+		import pandas as pd
+	except ImportError:
+		raise Skip("pandas not installed")
+	from .input import _sheet_to_view
+	cubes = CubeBatch.solved(n)
+	cubes.apply_moves(_scrambles(n))
+	path = os.path.join(_temporary_folder(), f'cubes{n}.xlsx')
+	with pd.ExcelWriter(path) as writer:
+		for view in FACES:
+			blocks = _sheet_to_view(cubes.show(view), view).reshape(-1, 3)
+			pd.DataFrame(blocks).to_excel(writer, sheet_name=view, header=False, index=False)
+	return path
+
+# ---------------
+# benchmarks, each returns the callable to be timed
+
+@benchmark(100, 10000)
+def rotate_square(n):
+	cube, turns = Cube(), [(FACES[i % 6], i % 4 != 3) for i in range(n)]
+	def run():
+		for view, clockwise in turns: cube.rotate_square(view, clockwise)
+	return run
+
+@benchmark(100, 10000)
+def change_to(n):
+	views = [FACES[1 + i % 5] for i in range(n)]
+	def run():
+		cube = Cube()
+		for view in views: cube = cube.change_to(view)
+	return run
+
+@benchmark(100, 10000)
+def is_solved(n):
+	cube = Algorithm("R U R' U'").apply(Cube())
+	def run():
+		for _ in range(n): cube.is_solved()
+	return run
+
+@benchmark(100, 10000)
+def show(n):
+	cube = Algorithm("R U R' U'").apply(Cube()).change_to('left')
+	def run():
+		for i in range(n): cube.show(FACES[i % 6])
+	return run
+
+@benchmark(100, 10000)
+def show_all(n):
+	cube = Algorithm("R U R' U'").apply(Cube()).change_to('left')
+	def run():
+		for _ in range(n): cube.show_all()
+	return run
+
+@benchmark(100, 10000)
+def locate(n):
+	"""a face turn and a piece location query, n times.
+	"""
+	cube, turns = Cube(), [(FACES[i % 6], i % 4 != 3) for i in range(n)]
+	def run():
+		for view, clockwise in turns:
+			cube.rotate_square(view, clockwise)
+			cube.locate(('Red', 'Green', 'White'))
+	return run
+
+@benchmark(1)
+def get_cube(n):
+	path = os.path.join(os.getcwd(), 'cube.xlsx')
+	if not os.path.exists(path): raise Skip("no cube.xlsx in current folder")
+	try:
+		from .input import get_cube
+	except ImportError:
+		raise Skip("pandas not installed")
+	return lambda: get_cube(path)
+
+@benchmark(100, 1000)
+def read_cubes(n):
+	path = _workbook(n)
+	from .input import read_cubes
+	return lambda: read_cubes(path)
+
+@benchmark(100, 10000)
+def many_cubes(n):
+	"""n cubes one after other: scramble with face turns, check solved, show front.
+	"""
+	scrambles = [[MOVES[m] for m in row] for row in _scrambles(n)]
+	algorithms = [Algorithm(moves) for moves in scrambles]
+	def run():
+		for algorithm in algorithms:
+			cube = algorithm.apply(Cube())
+			cube.is_solved()
+			cube.show('front')
+	return run
+
+@benchmark(1000, 100000)
+def batch(n):
+	"""n cubes at once: scramble, check solved, show all faces.
+	"""
+	scrambles = _scrambles(n)
+	def run():
+		cubes = CubeBatch.solved(n)
+		cubes.apply_moves(scrambles)
+		cubes.is_solved()
+		cubes.show_all()
+	return run
+
+@benchmark(10)
+def twophase_solve(n):
+	from .tables import table_path
+	from .twophase import TwoPhaseSolver, PRUNING_TABLES
+	if not all(os.path.exists(table_path(name)) for name in PRUNING_TABLES):
+		raise Skip("two-phase tables not generated (python -m cube3d.tables)")
+	solver = TwoPhaseSolver()
+	cubes = CubeBatch.solved(n)
+	cubes.apply_moves(_scrambles(n))
+	cubes = list(cubes)
+	def run():
+		for cube in cubes: solver.solve(cube)
+	return run
+
+# ---------------
+
+def measure(run, repeat=5, minimum=0.2):
+	"""best time of one call, and peak memory allocated during one call.
+
+	Args:
+		run (callable): code to measure
+		repeat (int, optional): timed rounds, best one is kept. Defaults to 5.
+		minimum (float, optional): seconds a round lasts at least (run is called many times in a round). Defaults to 0.2.
+
+	Returns:
+		dict: seconds (per call) and peak_bytes
+	"""
+	start = time.perf_counter()
+	run()
+	once = time.perf_counter() - start
+	number = max(1, int(minimum / once)) if once > 0 else 1000
+	best = once
+	for _ in range(repeat):
+		start = time.perf_counter()
+		for _ in range(number): run()
+		best = min(best, (time.perf_counter() - start) / number)
+	tracemalloc.start()
+	try:
+		run()
+		peak = tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+	return {'seconds': best, 'peak_bytes': peak}
+
+def run_all(names=None, quick=False, report=None):
+	"""run benchmarks.
+
+	Args:
+		names (list, optional): benchmark names (or name prefixes) to run. Defaults to None (all).
+		quick (bool, optional): smallest size only, single round. Defaults to False.
+		report (callable, optional): called with (case, result) after each case. Defaults to None.
+
+	Returns:
+		dict: results with environment details, results keyed by ``name[size]``
+	"""
+	results = {}
+	try:
+		for name, (function, sizes) in BENCHMARKS.items():
+			if names and not any(name.startswith(wanted) for wanted in names): continue
+			for n in sizes[:1] if quick else sizes:
+				case = f"{name}[{n}]"
+				try:
+					run = function(n)
+				except Skip as e:
+					result = {'skipped': str(e)}
+				else:
+					result = measure(run, repeat=1, minimum=0) if quick else measure(run)
+					result['per_item'] = result['seconds'] / n
+				results[case] = result
+				if report: report(case, result)
+	finally:
+		_remove_temporary_folder()
+	return {
+		'python': platform.python_version(), 'numpy': np.__version__, 'machine': platform.machine(),
+		'time': time.strftime('%Y-%m-%d %H:%M:%S'), 'results': results,
+	}
+
+def compare(results, baseline, threshold=THRESHOLD):
+	"""cases slower than baseline by more than threshold.
+
+	Args:
+		results (dict): output of `run_all`
+		baseline (dict): earlier output of `run_all`
+		threshold (float, optional): allowed slowdown, 0.25 is 25%. Defaults to THRESHOLD.
+
+	Returns:
+		list: (case, baseline seconds, seconds, ratio) of regressions
+	"""
+	regressions = []
+	for case, result in results['results'].items():
+		old = baseline['results'].get(case, {})
+		if 'seconds' not in result or 'seconds' not in old: continue
+		ratio = result['seconds'] / old['seconds']
+		if ratio > 1 + threshold: regressions.append((case, old['seconds'], result['seconds'], ratio))
+	return regressions
+
+def _format(case, result, baseline=None):
+	if 'skipped' in result: return f"{case:<24} skipped: {result['skipped']}"
+	line = f"{case:<24} {result['seconds']*1e3:12.3f} ms {result['per_item']*1e6:12.3f} us/item {result['peak_bytes']/1024:10.1f} KiB"
+	old = (baseline or {}).get('results', {}).get(case, {})
+	if 'seconds' in old: line += f"   x{result['seconds'] / old['seconds']:.2f} of baseline"
+	return line
+
+def main(options):
+	"""run benchmarks for command line (`cube3d bench`), returns exit status.
+	"""
+	baseline = None
+	if options.compare:
+		with open(options.compare) as f: baseline = json.load(f)
+	results = run_all(options.names, options.quick, lambda case, result: print(_format(case, result, baseline), flush=True))
+	if options.save:
+		with open(options.save, 'w') as f: json.dump(results, f, indent=1)
+	if baseline is None: return 0
+	regressions = compare(results, baseline, options.threshold)
+	for case, old, new, ratio in regressions:
+		print(f"REGRESSION {case}: {old*1e3:.3f} ms -> {new*1e3:.3f} ms (x{ratio:.2f})", file=sys.stderr)
+	return 1 if regressions else 0
@@ -0,0 +1,105 @@
+"""``cube3d`` command line.
+
+	cube3d replay [input] [-o output] [--format jsonl|binary|states] [--faces front,top] [--cube CUBE] [--skip-errors]
+	cube3d bench [names ...] [--quick] [--save FILE] [--compare FILE] [--threshold 0.25]
+	cube3d serve [--socket PATH | --host 127.0.0.1 --port 8765] [--workers N] [--window SECONDS] [--data-dir DIR]
+
+replay applies move sequences (one per line, from a file or stdin) to a starting cube, see `pipeline`.
+bench runs the benchmark suite, see `benchmark`.
+serve runs a long-lived cube server speaking line-delimited JSON, see `server`.
+"""
+import argparse
+import os
+import sys
+
+from .state import FACES
+from .formats import from_json
+from . import pipeline
+
+# ---------------
+
+def load_cube(cube):
+	"""starting cube from command line: an Excel workbook, a JSON file, or facelet string/JSON text.
+	"""
+	if cube is None: return None
+	if os.path.isfile(cube):
+		if cube.lower().endswith(('.xlsx', '.xls')):
+			from .input import get_cube
+			return get_cube(cube)
+		with open(cube) as f: return from_json(f.read())
+	return from_json(cube)
+
+def _faces(text):
+	faces = tuple(face.strip() for face in text.split(',') if face.strip())
+	for face in faces:
+		if face not in FACES: raise argparse.ArgumentTypeError(f"invalid face {face!r}, choose from {', '.join(FACES)}")
+	return faces
+
+def _replay(options):
+	cube = load_cube(options.cube)
+	binary = options.format != 'jsonl'
+	lines = open(options.input) if options.input != '-' else sys.stdin
+	if options.output == '-': out = sys.stdout.buffer if binary else sys.stdout
+	else: out = open(options.output, 'wb' if binary else 'w')
+	try:
+		count = pipeline.run(lines, out, cube, options.format, options.faces, options.batch_size, 'skip' if options.skip_errors else 'raise')
+	finally:
+		if lines is not sys.stdin: lines.close()
+		if options.output != '-': out.close()
+		else: out.flush()
+	if options.verbose: print(f"{count} cubes", file=sys.stderr)
+
+def _bench(options):
+	from .benchmark import main
+	status = main(options)
+	if status: sys.exit(status)
+
+def _serve(options):
+	from .server import serve
+	def ready(addresses):
+		if options.verbose: print(f"cube3d serving on {', '.join(map(str, addresses))}", file=sys.stderr, flush=True)
+	serve(options.socket, options.host, options.port, options.workers, options.window, ready=ready, data_dir=options.data_dir)
+
+def main(args=None):
+	"""command line entry point.
+	"""
+	parser = argparse.ArgumentParser(prog='cube3d', description='3-Dimention Rubic cube tools')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	replay = commands.add_parser('replay', help='apply move sequences to a cube and write resulting states')
+	replay.add_argument('input', nargs='?', default='-', help='file of move sequences, one per line (default: stdin)')
+	replay.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+	replay.add_argument('--format', choices=('jsonl', 'binary', 'states'), default='jsonl', help='output format (default: jsonl)')
+	replay.add_argument('--faces', type=_faces, default=(), help='comma separated faces to include in jsonl records')
+	replay.add_argument('--cube', default=None, help='starting cube: Excel/JSON file, facelet string or JSON (default: solved)')
+	replay.add_argument('--batch-size', type=int, default=pipeline.BATCH_SIZE, help=f'cubes moved at once (default: {pipeline.BATCH_SIZE})')
+	replay.add_argument('--skip-errors', action='store_true', help='write an error record for a line which is not a move sequence and go on (default: stop there)')
+	replay.add_argument('-v', '--verbose', action='store_true', help='report number of cubes on stderr')
+	replay.set_defaults(run=_replay)
+
+	bench = commands.add_parser('bench', help='run benchmark suite, optionally against a saved baseline')
+	bench.add_argument('names', nargs='*', help='benchmarks to run (name prefixes, default: all)')
+	bench.add_argument('--quick', action='store_true', help='smallest size only, single round')
+	bench.add_argument('--save', default=None, help='write results to this JSON file')
+	bench.add_argument('--compare', default=None, help='baseline JSON file, exit status 1 on regressions')
+	bench.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown against baseline (default: 0.25 = 25%%)')
+	bench.set_defaults(run=_bench)
+
+	serve = commands.add_parser('serve', help='run a cube server on a Unix socket or localhost TCP port')
+	serve.add_argument('--socket', default=None, help='Unix socket path (default: TCP)')
+	serve.add_argument('--host', default='127.0.0.1', help='TCP address (default: 127.0.0.1)')
+	serve.add_argument('--port', type=int, default=8765, help='TCP port (default: 8765)')
+	serve.add_argument('--workers', type=int, default=None, help='solver processes (default: number of CPUs)')
+	serve.add_argument('--window', type=float, default=0.0, help='seconds to collect moves before applying them together (default: 0)')
+	serve.add_argument('--data-dir', default=None, help='folder clients may load cube files from (default: none, no file loading)')
+	serve.add_argument('-v', '--verbose', action='store_true', help='report listening address on stderr')
+	serve.set_defaults(run=_serve)
+
+	options = parser.parse_args(args)
+	try:
+		options.run(options)
+	except (ValueError, OSError) as e:
+		parser.exit(1, f"cube3d {options.command}: error: {e}\n")
+
+if __name__ == '__main__':
+	main()
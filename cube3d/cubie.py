@@ -0,0 +1,303 @@
+"""Cubie level model of a cube: permutation and orientation of 8 corners and 12 edges.
+
+Corner slots are URF, UFL, ULB, UBR, DFR, DLF, DBL, DRB and edge slots are UR, UF, UL, UB, DR, DF, DL,
+DB, FR, FL, BL, BR (U = top, D = bottom, F = front, B = back, L = left, R = right). A piece is numbered by
+its home slot.
+
+	* cp[s] : corner piece in slot s,  co[s] : its twist (0, 1, 2)
+	* ep[s] : edge piece in slot s,    eo[s] : its flip (0, 1)
+
+Colors are read relative to center colors, so a cube in any orientation (after `Cube.change_to`) gives
+the cubies of that orientation. All conversions work on a single state (54,) or many states (N, 54).
+
+`rank_state` numbers every legal state (cubies, and orientation of whole cube given by center codes) with
+a unique integer below 24 * STATES, and `unrank_state` gives the state back.
+"""
+from math import factorial
+import numpy as np
+
+from .state import FACES, FACE_NORMAL, facelet_at, solved_state
+from .base import MOVE_TABLE, ORIENTATION_FACES
+
+# ---------------
+
+U, D, F, B, L, R = (FACES.index(face) for face in ('top', 'bottom', 'front', 'back', 'left', 'right'))
+CORNERS = ((U, R, F), (U, F, L), (U, L, B), (U, B, R), (D, F, R), (D, L, F), (D, B, L), (D, R, B))
+EDGES = ((U, R), (U, F), (U, L), (U, B), (D, R), (D, F), (D, L), (D, B), (F, R), (F, L), (B, L), (B, R))
+
+def _facelets(faces):
+	"""facelet indexes of a slot touching given faces, in given order.
+	"""
+	normals = np.array([FACE_NORMAL[FACES[face]] for face in faces])
+	position = normals.sum(axis=0)
+	return facelet_at(np.tile(position, (len(faces), 1)), normals)
+
+CORNER_FACELETS = np.array([_facelets(corner) for corner in CORNERS], dtype=np.intp)
+EDGE_FACELETS = np.array([_facelets(edge) for edge in EDGES], dtype=np.intp)
+
+def _piece_lookup(pieces):
+	"""lookup from colors of a slot (read in slot facelet order) to (piece, orientation), -1 if no such piece.
+	"""
+	size = len(FACES) ** len(pieces[0])
+	piece, orientation = np.full(size, -1, dtype=np.int8), np.full(size, -1, dtype=np.int8)
+	for p, colors in enumerate(pieces):
+		for o in range(len(colors)):
+			turned = colors[-o:] + colors[:-o] if o else colors
+			key = np.ravel_multi_index(turned, (len(FACES),) * len(colors))
+			piece[key], orientation[key] = p, o
+	return piece, orientation
+
+_CORNER_LOOKUP = _piece_lookup(CORNERS)
+_EDGE_LOOKUP = _piece_lookup(EDGES)
+# place values of slot colors in lookup keys
+_CORNER_DIGITS, _EDGE_DIGITS = np.array([36, 6, 1]), np.array([6, 1])
+_FACES_BACKWARDS = np.arange(len(FACES) - 1, -1, -1, dtype=np.uint8)
+# colors (in slot facelet order) of each piece * orientations + orientation
+_CORNER_COLORS = np.array([np.roll(colors, o) for colors in CORNERS for o in range(3)], dtype=np.uint8)
+_EDGE_COLORS = np.array([np.roll(colors, o) for colors in EDGES for o in range(2)], dtype=np.uint8)
+
+# ---------------
+
+def face_labels(state):
+	"""facelet colors replaced by the face whose center has that color.
+
+	Args:
+		state (ndarray): (54,) or (N, 54) facelet color codes
+
+	Raises:
+		ValueError: if a facelet color is not the color of any center
+
+	Returns:
+		ndarray: same shape as state, face index of each facelet
+	"""
+	state = np.asarray(state)
+	if state.ndim == 1:
+		faces = np.full(max(int(state.max()), 5) + 1, 255, dtype=np.uint8)
+		faces[state[4::9][::-1]] = _FACES_BACKWARDS
+		labels = faces[state]
+		if (labels == 255).any(): raise ValueError("cube has facelet color which is not a center color")
+		return labels
+	flat = state.reshape(-1, state.shape[-1]).astype(np.intp)
+	rows = np.arange(len(flat))[:, None]
+	# face of each color code, per state (first face of a center color given twice)
+	faces = np.full((len(flat), int(flat.max(initial=0)) + 1), 255, dtype=np.uint8)
+	faces[rows, flat[:, 4::9][:, ::-1]] = _FACES_BACKWARDS
+	labels = faces[rows, flat]
+	if (labels == 255).any():
+		raise ValueError("cube has facelet color which is not a center color")
+	return labels.reshape(state.shape)
+
+def _pieces(labels):
+	"""(cp, co, ep, eo) of face labels, -1 for piece and orientation of a slot whose colors are not a real piece.
+	"""
+	labels = np.asarray(labels, dtype=np.intp)
+	corner = labels[..., CORNER_FACELETS] @ _CORNER_DIGITS
+	edge = labels[..., EDGE_FACELETS] @ _EDGE_DIGITS
+	return _CORNER_LOOKUP[0][corner], _CORNER_LOOKUP[1][corner], _EDGE_LOOKUP[0][edge], _EDGE_LOOKUP[1][edge]
+
+def to_cubies(state):
+	"""cubie level description of cube state(s).
+
+	Args:
+		state (ndarray): (54,) or (N, 54) facelet color codes
+
+	Raises:
+		ValueError: if colors of a corner or edge are not of any real piece
+
+	Returns:
+		tuple: (cp, co, ep, eo) int8 arrays of shape (..., 8) and (..., 12)
+	"""
+	cp, co, ep, eo = _pieces(face_labels(state))
+	if (cp < 0).any() or (ep < 0).any():
+		raise ValueError("cube has a corner or edge which is not a real piece")
+	return cp, co, ep, eo
+
+def from_cubies(cp, co, ep, eo):
+	"""facelet state(s) from cubie level description. color codes are face indexes (home colors).
+
+	Args:
+		cp, co (ndarray): (..., 8) corner permutation and twist
+		ep, eo (ndarray): (..., 12) edge permutation and flip
+
+	Returns:
+		ndarray: (..., 54) uint8 facelet color codes
+	"""
+	cp, co, ep, eo = (np.asarray(a, dtype=np.intp) for a in (cp, co, ep, eo))
+	state = np.empty(cp.shape[:-1] + (54,), dtype=np.uint8)
+	state[..., 4::9] = np.arange(len(FACES))
+	state[..., CORNER_FACELETS] = _CORNER_COLORS[cp * 3 + co]
+	state[..., EDGE_FACELETS] = _EDGE_COLORS[ep * 2 + eo]
+	return state
+
+def _gather(a, index):
+	"""a[..., index] for stacked or single arrays.
+	"""
+	if index.ndim == 1: return a[..., index]
+	if a.ndim == 1: return a[index]
+	return np.take_along_axis(a, index, axis=-1)
+
+def multiply(a, b):
+	"""cubies of `a` followed by `b`, each a (cp, co, ep, eo) tuple (works on stacked arrays too).
+	"""
+	acp, aco, aep, aeo = a
+	bcp, bco, bep, beo = b
+	co = (_gather(aco, bcp) + bco) % 3
+	eo = (_gather(aeo, bep) + beo) % 2
+	return _gather(acp, bcp), co.astype(np.int8), _gather(aep, bep), eo.astype(np.int8)
+
+# cubies of each of the 18 face turns
+MOVE_CUBIES = to_cubies(solved_state()[MOVE_TABLE])
+
+# ---------------
+# Lehmer coding (vectorized) of permutations and partial permutations
+
+def rank_partial(slots, n):
+	"""rank of k distinct values from range(n), in order, among all n!/(n-k)! arrangements.
+
+	Args:
+		slots (ndarray): (..., k) distinct integers in range(n)
+		n (int): number of values to choose from
+
+	Returns:
+		ndarray: (...,) int64 ranks
+	"""
+	slots = np.asarray(slots, dtype=np.int64)
+	rank = np.zeros(slots.shape[:-1], dtype=np.int64)
+	for i in range(slots.shape[-1]):
+		digit = slots[..., i] - (slots[..., :i] < slots[..., i:i+1]).sum(axis=-1)
+		rank = rank * (n - i) + digit
+	return rank
+
+def unrank_partial(rank, n, k):
+	"""inverse of `rank_partial`.
+
+	Args:
+		rank (ndarray): ranks
+		n (int): number of values to choose from
+		k (int): number of values chosen
+
+	Returns:
+		ndarray: (..., k) int8 values
+	"""
+	rank = np.array(rank, dtype=np.int64)
+	digits = []
+	for i in reversed(range(k)):
+		digits.append(rank % (n - i))
+		rank //= (n - i)
+	available = np.ones(rank.shape + (n,), dtype=bool)
+	slots = np.empty(rank.shape + (k,), dtype=np.int8)
+	for i, digit in enumerate(reversed(digits)):
+		slot = (np.cumsum(available, axis=-1) > digit[..., None]).argmax(axis=-1)
+		slots[..., i] = slot
+		np.put_along_axis(available, slot[..., None], False, axis=-1)
+	return slots
+
+def rank_permutation(perm):
+	"""Lehmer rank of permutation(s) among all n! permutations.
+	"""
+	return rank_partial(perm, np.shape(perm)[-1])
+
+def unrank_permutation(rank, n):
+	"""inverse of `rank_permutation`.
+	"""
+	return unrank_partial(rank, n, n)
+
+def rank_orientation(orientation, base):
+	"""orientation digits (last one dropped, being implied by the others) as an integer.
+	"""
+	orientation = np.asarray(orientation, dtype=np.int64)
+	rank = np.zeros(orientation.shape[:-1], dtype=np.int64)
+	for i in range(orientation.shape[-1] - 1):
+		rank = rank * base + orientation[..., i]
+	return rank
+
+def unrank_orientation(rank, base, n):
+	"""inverse of `rank_orientation`, last digit makes the sum of all digits a multiple of base.
+	"""
+	rank = np.array(rank, dtype=np.int64)
+	orientation = np.empty(rank.shape + (n,), dtype=np.int8)
+	for i in reversed(range(n - 1)):
+		orientation[..., i] = rank % base
+		rank //= base
+	orientation[..., n-1] = -orientation[..., :n-1].sum(axis=-1) % base
+	return orientation
+
+def count_partial(n, k):
+	"""number of arrangements of k values out of n.
+	"""
+	return factorial(n) // factorial(n - k)
+
+# ---------------
+# perfect hash of legal states
+
+CORNER_STATES = factorial(8) * 3 ** 7
+EDGE_STATES = factorial(12) // 2 * 2 ** 11
+STATES = CORNER_STATES * EDGE_STATES
+
+def parity(perm):
+	"""parity (0 even, 1 odd) of permutation(s), (..., n) -> (...,).
+	"""
+	perm = np.asarray(perm)
+	i, j = np.triu_indices(perm.shape[-1], 1)
+	return ((perm[..., i] > perm[..., j]).sum(axis=-1) % 2).astype(np.int8)
+
+def _orientation_of(state):
+	"""index in ORIENTATION_FACES of center codes, -1 where centers are not a permutation of face codes.
+	"""
+	match = (np.asarray(state)[..., None, 4::9] == ORIENTATION_FACES).all(axis=-1)
+	return np.where(match.any(axis=-1), match.argmax(axis=-1), -1)
+
+def rank_state(state):
+	"""unique number of legal cube state(s).
+
+	rank = ((orientation * CORNER_STATES + corners) * EDGE_STATES + edges), where corners is Lehmer rank
+	of corner permutation with twist digits, edges is Lehmer rank of edge permutation (halved, its parity
+	is that of corners) with flip digits. A cube in home orientation has rank below STATES.
+
+	Args:
+		state (ndarray): (54,) or (N, 54) facelet color codes, center codes being 0-5
+
+	Raises:
+		ValueError: if a state is not legal (or its center codes are not 0-5)
+
+	Returns:
+		int, ndarray: rank, or (N,) object array of ranks (they do not fit in 64 bits)
+	"""
+	cp, co, ep, eo = to_cubies(state)
+	orientation = _orientation_of(state)
+	legal = (
+		(orientation >= 0)
+		& (np.sort(cp, axis=-1) == np.arange(8)).all(axis=-1) & (np.sort(ep, axis=-1) == np.arange(12)).all(axis=-1)
+		& (co.sum(axis=-1) % 3 == 0) & (eo.sum(axis=-1) % 2 == 0) & (parity(cp) == parity(ep))
+	)
+	if not legal.all(): raise ValueError("cube is not a legal state")
+	corners = rank_permutation(cp) * 3 ** 7 + rank_orientation(co, 3)
+	edges = rank_permutation(ep) // 2 * 2 ** 11 + rank_orientation(eo, 2)
+	if np.ndim(corners) == 0: return (int(orientation) * CORNER_STATES + int(corners)) * EDGE_STATES + int(edges)
+	return (orientation.astype(object) * CORNER_STATES + corners.astype(object)) * EDGE_STATES + edges.astype(object)
+
+def unrank_state(rank):
+	"""inverse of `rank_state`.
+
+	Args:
+		rank (int, ndarray): rank, or (N,) ranks
+
+	Raises:
+		ValueError: if a rank is out of range
+
+	Returns:
+		ndarray: (54,) or (N, 54) uint8 facelet color codes
+	"""
+	rank = np.asarray(rank, dtype=object)
+	if ((rank < 0) | (rank >= len(ORIENTATION_FACES) * STATES)).any(): raise ValueError("rank out of range")
+	rest, edges = rank // EDGE_STATES, rank % EDGE_STATES
+	orientation, corners = rest // CORNER_STATES, rest % CORNER_STATES
+	orientation, corners, edges = (np.asarray(a, dtype=np.int64) for a in (orientation, corners, edges))
+	cp = unrank_permutation(corners // 3 ** 7, 8)
+	co = unrank_orientation(corners % 3 ** 7, 3, 8)
+	ep = unrank_permutation(edges // 2 ** 11 * 2, 12)
+	# even rank and next one differ by a swap of last two edges, take the one of corner parity
+	ep = np.where((parity(ep) != parity(cp))[..., None], ep[..., [*range(10), 11, 10]], ep)
+	eo = unrank_orientation(edges % 2 ** 11, 2, 12)
+	state = from_cubies(cp, co, ep, eo).astype(np.intp)
+	return np.take_along_axis(ORIENTATION_FACES[orientation], state, axis=-1).astype(np.uint8)
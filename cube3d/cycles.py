@@ -0,0 +1,92 @@
+"""Cycle structure of move sequences: which pieces a sequence moves around, with what twist, and its order
+(number of repetitions getting a cube back where it started)::
+
+	[str(cycle) for cycle in cycles("R U")]    # ['(URF)+', '(UFL ULB UBR DRB DFR)++', '(UR BR DR FR UF UL UB)']
+	order("R U")                              # 105
+	(Algorithm("R U") ** 1000).apply(cube)    # same as 1000 times "R U", in one gather
+
+A cycle of length n with a total twist t (flip for edges) brings its pieces home after n repetitions,
+turned by t, so they are home and unturned only after n * 3 / gcd(t, 3) repetitions (n * 2 for a flipped
+edge cycle). Order of a sequence is the least common multiple of these over all its cycles (for sequences
+moving centers, whole cube turns or slices, it is order of their facelet permutation).
+"""
+from math import gcd
+from collections import namedtuple
+import numpy as np
+
+from .state import FACES, solved_state
+from .base import FACE_NOTATION
+from .algorithm import Algorithm, _order
+from .cubie import CORNERS, EDGES, to_cubies
+
+# ---------------
+
+CORNER_NAMES = tuple(''.join(FACE_NOTATION[FACES[face]] for face in corner) for corner in CORNERS)
+EDGE_NAMES = tuple(''.join(FACE_NOTATION[FACES[face]] for face in edge) for edge in EDGES)
+
+
+class Cycle(namedtuple('Cycle', 'kind slots twist')):
+	"""pieces moving around slots, each one to next slot (last one to first), twisted by a total of twist
+	(clockwise thirds for corners, flips for edges) after going around once.
+	"""
+	__slots__ = ()
+
+	@property
+	def order(self):
+		"""repetitions to get pieces of cycle home and unturned.
+		"""
+		turns = 3 if self.kind == 'corner' else 2
+		return len(self.slots) * turns // gcd(self.twist, turns)
+
+	def __str__(self):
+		return f"({' '.join(self.slots)})" + ('+' * self.twist if self.kind == 'corner' else "'" * self.twist)
+
+
+def _algorithm(sequence):
+	return sequence if isinstance(sequence, Algorithm) else Algorithm(sequence)
+
+def _cycles(perm, orientation, names, kind, turns):
+	"""cycles of a piece permutation, perm[s] being piece ending in slot s.
+	"""
+	found, seen = [], np.zeros(len(perm), dtype=bool)
+	destination = np.argsort(perm)			# slot where piece of each slot goes
+	for start in range(len(perm)):
+		if seen[start]: continue
+		slots, s = [], start
+		while not seen[s]:
+			seen[s] = True
+			slots.append(s)
+			s = destination[s]
+		twist = int(orientation[slots].sum()) % turns
+		if len(slots) > 1 or twist: found.append(Cycle(kind, tuple(names[s] for s in slots), twist))
+	return found
+
+def cycles(sequence):
+	"""corner and edge cycles of a move sequence (pieces it leaves in place unturned are not listed).
+
+	Pieces are followed relative to centers, so whole cube turns do not count and a slice turn is seen as
+	the two face turns around it.
+
+	Args:
+		sequence (str, tuple, Algorithm): move sequence
+
+	Returns:
+		list: Cycle of corners, then of edges
+	"""
+	cp, co, ep, eo = to_cubies(solved_state()[_algorithm(sequence).permutation])
+	return _cycles(cp, co, CORNER_NAMES, 'corner', 3) + _cycles(ep, eo, EDGE_NAMES, 'edge', 2)
+
+def order(sequence):
+	"""number of repetitions of a move sequence getting cube back to where it started (1 for no move).
+
+	Args:
+		sequence (str, tuple, Algorithm): move sequence
+
+	Returns:
+		int: order of sequence
+	"""
+	algorithm = _algorithm(sequence)
+	if (algorithm.permutation[4::9] == np.arange(4, 54, 9)).all():
+		return int(np.lcm.reduce([cycle.order for cycle in cycles(algorithm)] or [1]))
+	# whole cube turns and slices move centers, cubies relative to centers do not give order then
+	return _order(algorithm.permutation)
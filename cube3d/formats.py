@@ -0,0 +1,133 @@
+"""Loading cubes from plain text formats, without pandas.
+
+	* facelet string : 54 characters, one color letter per facelet in facelet order (faces in
+	  `state.FACES` order, each laid out as `Cube.show` returns it).
+	* JSON           : a facelet string, a list of 54 colors, or an object with the six faces
+	  ( front, back, top, bottom, left, right ) each as 3x3 colors laid out as `Cube.show` returns it.
+	* CSV            : one cube per row, either a facelet string or 54 color columns.
+"""
+import csv
+import json
+import numpy as np
+
+from .base import Cube
+from .batch import CubeBatch
+from .state import FACES, FACELETS, encode
+
+# ---------------
+
+def from_colors(colors, palette=()):
+	"""Cube from colors of its 54 facelets.
+
+	Args:
+		colors (iterable): 54 colors in facelet order
+		palette (tuple, optional): colors to keep at start of palette. Defaults to colors of centers.
+
+	Returns:
+		Cube: Cube object
+	"""
+	state, palette = encode(colors, palette)
+	return Cube(state=state, colors=palette)
+
+def from_facelets(facelets, colors=None):
+	"""Cube from a 54 character facelet string.
+
+	Args:
+		facelets (str): one color letter per facelet, whitespace is ignored
+		colors (dict, optional): color name for each letter. Defaults to letters as color names.
+
+	Returns:
+		Cube: Cube object
+	"""
+	letters = ''.join(facelets.split())
+	return from_colors(letters if colors is None else [colors[letter] for letter in letters])
+
+def to_facelets(cube):
+	"""54 character facelet string of a cube, each color written by its first letter.
+
+	Raises:
+		ValueError: if two colors of cube start with same letter
+
+	Returns:
+		str: facelet string
+	"""
+	letters = [str(color)[:1] for color in cube.colors]
+	if len(set(letters)) < len(letters): raise ValueError(f"colors {cube.colors} do not have distinct first letters")
+	return ''.join(letters[code] for code in cube.state)
+
+def from_json(data):
+	"""Cube from JSON.
+
+	Args:
+		data (str, list, dict): JSON text, or already parsed JSON
+
+	Raises:
+		ValueError: if data is not any of the cube formats
+
+	Returns:
+		Cube: Cube object
+	"""
+	if isinstance(data, str):
+		data = data.strip()
+		if len(''.join(data.split())) == FACELETS and not data.startswith(('[', '{', '"')): return from_facelets(data)
+		data = json.loads(data)
+	if isinstance(data, str): return from_facelets(data)
+	if isinstance(data, dict):
+		data = [color for view in FACES for row in data[view] for color in row]
+	if isinstance(data, list) and len(data) == FACELETS: return from_colors(data)
+	raise ValueError("JSON is not a facelet string, list of 54 colors or object of six faces")
+
+# ---------------
+
+def batch_from_colors(colors):
+	"""CubeBatch from facelet colors of many cubes, sharing one palette.
+
+	Args:
+		colors (ndarray): (N, 54) colors
+
+	Returns:
+		CubeBatch: cubes
+	"""
+	colors = np.asarray(colors, dtype=object).reshape(-1, FACELETS)
+	if not len(colors): return CubeBatch(np.empty((0, FACELETS), dtype=np.uint8))
+	values, inverse = np.unique(colors.astype(str), return_inverse=True)
+	palette = list(dict.fromkeys([str(color) for color in colors[0, 4::9]] + values.tolist()))
+	codes = np.array([palette.index(value) for value in values], dtype=np.uint8)
+	return CubeBatch(codes[inverse.reshape(colors.shape)], palette)
+
+def rows_to_colors(rows):
+	"""facelet colors from rows each holding one cube, as a facelet string or as 54 colors. empty rows
+	and a header row (neither of both) are skipped.
+
+	Args:
+		rows (iterable): rows of values
+
+	Raises:
+		ValueError: for a row which is not a cube
+
+	Returns:
+		list: 54 colors per cube
+	"""
+	cubes = []
+	for n, row in enumerate(rows):
+		values = [value for value in row if str(value).strip() != '']
+		if not values: continue
+		if len(values) == 1 and len(''.join(str(values[0]).split())) == FACELETS:
+			cubes.append(list(''.join(str(values[0]).split())))
+		elif len(values) == FACELETS:
+			cubes.append(values)
+		elif n > 0 or cubes:
+			raise ValueError(f"row {n+1} is neither a facelet string nor {FACELETS} colors")
+	return cubes
+
+def read_csv(file):
+	"""many cubes from a CSV file, one cube per row.
+
+	Args:
+		file (str): CSV file name
+
+	Returns:
+		CubeBatch: cubes
+	"""
+	with open(file, newline='') as f:
+		return batch_from_colors(rows_to_colors(csv.reader(f)))
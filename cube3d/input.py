@@ -1,30 +1,52 @@
 """Sample Execution Fuction, to read the Cube position, colors from an excel file. and create
 necessary cube object.
 
-Uses pandas to read Excel
+Uses pandas to read Excel. A workbook is opened once and all its sheets are read in one pass.
 """
+import numpy as np
 import pandas as pd
 from .base import *
+from .formats import from_colors, batch_from_colors, rows_to_colors, read_csv
+
+def _sheet_to_view(blocks, view):
+	"""turn 3x3 blocks as written in sheets (top row first) to layout of `Cube.show`.
+	"""
+	return np.flip(blocks, axis=-1 if view == back else -2)
 
 def _read_cube_from_excel(file):
 	"""read the cube details from excel. Excel should have six different side details ('front', 'back', 'top', 'bottom', 'left', 'right')
-	assuming facing front.
+	assuming facing front. Each sheet can hold many cubes, one 3x3 block (three rows) per cube.
 
 	Args:
 		file (str): Excel file name, where cube detail is stored.
 
 	Returns:
-		dict: cube data in dictionary format
-	"""    	
-	d = {}
-	for side, ax in axis_map.items():
-		transpose_for = (front, bottom, top, back)
-		df = pd.read_excel(file, sheet_name=side, header=None).fillna("")
-		if side in transpose_for:
-			d[side] = df.T.to_dict()
-		else:
-			d[side] = df.to_dict()
-	return d
+		dict: (rows, 3) array of colors for each side
+	"""
+	with pd.ExcelFile(file) as workbook:
+		return _parse_sides(workbook)
+
+def _parse_sides(workbook):
+	"""colors of all six side sheets of an open workbook.
+	"""
+	return {side: workbook.parse(side, header=None).fillna("").to_numpy(dtype=object) for side in axis_map}
+
+def _facelet_colors(sheets):
+	"""facelet colors of cubes in blocks of six sheets.
+
+	Args:
+		sheets (dict): (3N, 3) array of colors for each side
+
+	Returns:
+		ndarray: (N, 54) facelet colors
+	"""
+	faces = []
+	for view in FACES:
+		values = sheets[view]
+		if values.ndim != 2 or values.shape[1] != 3 or len(values) % 3:
+			raise ValueError(f"sheet {view} should have blocks of 3x3 colors, got {values.shape}")
+		faces.append(_sheet_to_view(values.reshape(-1, 3, 3), view).reshape(-1, 9))
+	return np.concatenate(faces, axis=1)
 
 def get_cube(file):
 	"""read the cube details from excel. Excel should have six different side details ('front', 'back', 'top', 'bottom', 'left', 'right')
@@ -35,52 +57,26 @@ def get_cube(file):
 
 	Returns:
 		Cube: Cube object
-	"""    	
-	d = _read_cube_from_excel(file)
-	P000 = Point(x=-1 ,y=-1  ,z=-1 , x_color=d[left][2][2], y_color=d[bottom][0][0], z_color=d[front][2][0])
-	P001 = Point(x=0  ,y=-1  ,z=-1 , x_color=None, y_color=d[bottom][0][1], z_color=d[front][2][1])
-	P002 = Point(x=1  ,y=-1  ,z=-1 , x_color=d[right][0][2], y_color=d[bottom][0][2], z_color=d[front][2][2])
-	P010 = Point(x=-1 ,y=0  ,z=-1 , x_color=d[left][2][1], y_color=None, z_color=d[front][1][0])
-	P011 = Point(x=0  ,y=0  ,z=-1 , x_color=None, y_color=None, z_color=d[front][1][1])
-	P012 = Point(x=1  ,y=0  ,z=-1 , x_color=d[right][0][1], y_color=None, z_color=d[front][1][2])
-	P020 = Point(x=-1 ,y=1  ,z=-1 , x_color=d[left][2][0], y_color=d[top][2][0], z_color=d[front][0][0])
-	P021 = Point(x=0  ,y=1  ,z=-1 , x_color=None, y_color=d[top][2][1], z_color=d[front][0][1])
-	P022 = Point(x=1  ,y=1  ,z=-1 , x_color=d[right][0][0], y_color=d[top][2][2], z_color=d[front][0][2])
-
-	P100 = Point(x=-1 ,y=-1  ,z=0 , x_color=d[left][1][2], y_color=d[bottom][1][0], z_color=None)
-	P101 = Point(x=0  ,y=-1  ,z=0 , x_color=None, y_color=d[bottom][1][1], z_color=None)
-	P102 = Point(x=1  ,y=-1  ,z=0 , x_color=d[right][1][2], y_color=d[bottom][1][2], z_color=None)
-	P110 = Point(x=-1 ,y=0  ,z=0 , x_color=d[left][1][1], y_color=None, z_color=None)
-	P111 = Point(x=0  ,y=0  ,z=0 , x_color=None, y_color=None, z_color=None)
-	P112 = Point(x=1  ,y=0  ,z=0 , x_color=d[right][1][1], y_color=None, z_color=None)
-	P120 = Point(x=-1 ,y=1  ,z=0 , x_color=d[left][1][0], y_color=d[top][1][0], z_color=None)
-	P121 = Point(x=0  ,y=1  ,z=0 , x_color=None, y_color=d[top][1][1], z_color=None)
-	P122 = Point(x=1  ,y=1  ,z=0 , x_color=d[right][1][0], y_color=d[top][1][2], z_color=None)
-
-	P200 = Point(x=-1 ,y=-1  ,z=1 , x_color=d[left][0][2], y_color=d[bottom][2][0], z_color=d[back][2][2])
-	P201 = Point(x=0  ,y=-1  ,z=1 , x_color=None, y_color=d[bottom][2][1], z_color=d[back][2][1])
-	P202 = Point(x=1  ,y=-1  ,z=1 , x_color=d[right][2][2], y_color=d[bottom][2][2], z_color=d[back][2][0])
-	P210 = Point(x=-1 ,y=0  ,z=1 , x_color=d[left][0][1], y_color=None, z_color=d[back][1][2])
-	P211 = Point(x=0  ,y=0  ,z=1 , x_color=None, y_color=None, z_color=d[back][1][1])
-	P212 = Point(x=1  ,y=0  ,z=1 , x_color=d[right][2][1], y_color=None, z_color=d[back][1][0])
-	P220 = Point(x=-1 ,y=1  ,z=1 , x_color=d[left][0][0], y_color=d[top][0][0], z_color=d[back][0][2])
-	P221 = Point(x=0  ,y=1  ,z=1 , x_color=None, y_color=d[top][0][1], z_color=d[back][0][1])
-	P222 = Point(x=1  ,y=1  ,z=1 , x_color=d[right][2][0], y_color=d[top][0][2], z_color=d[back][0][0])
-
-	B00 = Band(P000, P001, P002)
-	B01 = Band(P010, P011, P012)
-	B02 = Band(P020, P021, P022)
-	B10 = Band(P100, P101, P102)
-	B11 = Band(P110, P111, P112)
-	B12 = Band(P120, P121, P122)
-	B20 = Band(P200, P201, P202)
-	B21 = Band(P210, P211, P212)
-	B22 = Band(P220, P221, P222)
-
-	SQZ0 = Square(B00, B01, B02)
-	SQZ1 = Square(B10, B11, B12)
-	SQZ2 = Square(B20, B21, B22)
-
-	return Cube(SQZ0, SQZ1, SQZ2)
+	"""
+	return from_colors(_facelet_colors(_read_cube_from_excel(file))[0])
+
+def read_cubes(file, sheet_name=None):
+	"""read many cubes from a CSV file or an Excel workbook.
 
+	* CSV file : one cube per row (see `formats.read_csv`)
+	* workbook with six side sheets : one cube per 3x3 block, blocks one below other in each sheet
+	* any other workbook (or given sheet_name) : one cube per row, as a facelet string or 54 colors
 
+	Args:
+		file (str): CSV or Excel file name
+		sheet_name (str, optional): sheet holding one cube per row. Defaults to None.
+
+	Returns:
+		CubeBatch: cubes
+	"""
+	if str(file).lower().endswith('.csv'): return read_csv(file)
+	with pd.ExcelFile(file) as workbook:
+		if sheet_name is None and set(axis_map) <= set(workbook.sheet_names):
+			return batch_from_colors(_facelet_colors(_parse_sides(workbook)))
+		rows = workbook.parse(sheet_name or 0, header=None, dtype=str).fillna("").to_numpy(dtype=object)
+	return batch_from_colors(rows_to_colors(rows))
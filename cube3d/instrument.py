@@ -0,0 +1,175 @@
+"""Opt-in instrumentation of hot paths: call counters, cumulative timing and tracer callbacks.
+
+Instrumented operations are the `Cube` methods (turns, reorientation, undo/redo, solved check, display),
+applying an `Algorithm` (``algorithm.apply(cube)`` or ``algorithm(cube)``) and the `base` helpers moving
+facelets of state arrays (used by `CubeBatch`, and replaced in every module importing them). Nothing is measured until
+`enable` is called: it swaps those functions for measuring wrappers, and `disable` puts the originals
+back, so there is no cost at all while disabled::
+
+	with instrumented(tracer=print):
+		cube.rotate_square('front')
+		cube.is_solved()
+	print(snapshot())          # {'Cube.rotate_square': {'count': 1, 'seconds': ...}, ...}
+	print(prometheus())
+
+A tracer is called after every instrumented call as ``tracer(operation, arguments, seconds)``, arguments
+being a dict of all arguments of the call by parameter name, defaults filled in, however they were passed
+(``rotate_square('front', False)`` and ``rotate_square(view='front', clockwise=False)`` both give
+``{'cube': cube, 'view': 'front', 'clockwise': False}``).
+"""
+import sys
+import time
+import inspect
+import functools
+from contextlib import contextmanager
+from collections import Counter, defaultdict
+
+from . import base
+from .algorithm import Algorithm
+
+# ---------------
+
+# operation name -> (owner, attribute), owner being a class or a module
+OPERATIONS = {
+	'Cube.rotate_square': (base.Cube, 'rotate_square'),
+	'Cube.change_to': (base.Cube, 'change_to'),
+	'Cube.is_solved': (base.Cube, 'is_solved'),
+	'Cube.show': (base.Cube, 'show'),
+	'Cube.show_all': (base.Cube, 'show_all'),
+	'Cube.update_view': (base.Cube, 'update_view'),
+	'Cube.undo': (base.Cube, 'undo'),
+	'Cube.redo': (base.Cube, 'redo'),
+	'Algorithm.apply': (Algorithm, 'apply'),
+	'base._rotate_square': (base, '_rotate_square'),
+	'base._rotate_cube': (base, '_rotate_cube'),
+	'base._change_position': (base, '_change_position'),
+}
+
+counts = Counter()
+seconds = defaultdict(float)
+tracers = []
+_originals = {}
+
+# ---------------
+
+def _wrap(operation, function):
+	"""function counting, timing and tracing its calls as given operation.
+	"""
+	clock, signature = time.perf_counter, inspect.signature(function)
+	@functools.wraps(function)
+	def wrapper(*args, **kwargs):
+		start = clock()
+		try:
+			return function(*args, **kwargs)
+		finally:
+			elapsed = clock() - start
+			counts[operation] += 1
+			seconds[operation] += elapsed
+			if tracers:
+				arguments = signature.bind(*args, **kwargs)
+				arguments.apply_defaults()
+				for tracer in tracers: tracer(operation, dict(arguments.arguments), elapsed)
+	return wrapper
+
+def _modules():
+	"""loaded cube3d modules (module level helpers are replaced wherever they were imported).
+	"""
+	return [module for name, module in list(sys.modules.items()) if name == 'cube3d' or name.startswith('cube3d.')]
+
+def _replace(owner, attribute, old, new):
+	if isinstance(owner, type):
+		# aliases too, such as Algorithm.__call__ of Algorithm.apply
+		for name, value in list(owner.__dict__.items()):
+			if value is old: setattr(owner, name, new)
+		return
+	for module in _modules():
+		if getattr(module, attribute, None) is old: setattr(module, attribute, new)
+
+def is_enabled():
+	"""True while instrumentation is enabled.
+	"""
+	return bool(_originals)
+
+def enable(tracer=None):
+	"""start instrumentation (counters and times keep adding up from earlier runs, see `reset`).
+
+	Args:
+		tracer (callable, optional): tracer to add, see `add_tracer`. Defaults to None.
+	"""
+	if tracer is not None: add_tracer(tracer)
+	if _originals: return
+	for operation, (owner, attribute) in OPERATIONS.items():
+		original = owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute)
+		_originals[operation] = original
+		_replace(owner, attribute, original, _wrap(operation, original))
+
+def disable():
+	"""stop instrumentation, original functions are put back. counters and times are kept.
+	"""
+	for operation, original in _originals.items():
+		owner, attribute = OPERATIONS[operation]
+		_replace(owner, attribute, owner.__dict__[attribute] if isinstance(owner, type) else getattr(owner, attribute), original)
+	_originals.clear()
+
+@contextmanager
+def instrumented(tracer=None, clear=True):
+	"""instrumentation enabled within a with block.
+
+	Args:
+		tracer (callable, optional): tracer to add for the block. Defaults to None.
+		clear (bool, optional): reset counters and times first. Defaults to True.
+	"""
+	if clear: reset()
+	was_enabled = is_enabled()
+	enable(tracer)
+	try:
+		yield
+	finally:
+		if tracer is not None: remove_tracer(tracer)
+		if not was_enabled: disable()
+
+def add_tracer(tracer):
+	"""call tracer(operation, arguments, seconds) after each instrumented call.
+	"""
+	tracers.append(tracer)
+
+def remove_tracer(tracer):
+	"""stop calling a tracer.
+	"""
+	if tracer in tracers: tracers.remove(tracer)
+
+def reset():
+	"""clear counters and times.
+	"""
+	counts.clear()
+	seconds.clear()
+
+# ---------------
+# export
+
+def snapshot():
+	"""counters and cumulative times of all operations called so far.
+
+	Returns:
+		dict: operation -> {'count': int, 'seconds': float}
+	"""
+	return {operation: {'count': counts[operation], 'seconds': seconds[operation]} for operation in counts}
+
+def prometheus(prefix='cube3d'):
+	"""counters and cumulative times in Prometheus text exposition format.
+
+	Args:
+		prefix (str, optional): metric name prefix. Defaults to 'cube3d'.
+
+	Returns:
+		str: metrics text
+	"""
+	lines = []
+	for metric, help_, values in (
+		('operations_total', 'Number of calls of instrumented cube3d operations.', counts),
+		('operation_seconds_total', 'Time spent in instrumented cube3d operations.', seconds),
+	):
+		name = f"{prefix}_{metric}"
+		lines += [f"# HELP {name} {help_}", f"# TYPE {name} counter"]
+		lines += [f'{name}{{operation="{operation}"}} {values[operation]}' for operation in sorted(counts)]
+	return '\n'.join(lines) + '\n'
@@ -0,0 +1,268 @@
+"""Cubes of any size, NxNxN (2x2x2, 4x4x4, ... 50x50x50).
+
+Colors are held per face, as a (6, n, n) ``uint8`` array of color codes (faces in `FACES` order, each laid
+out as `Cube.show` lays it out), so a cube needs 6 n^2 bytes whatever its size. A layer turn moves only
+the 4 n facelets around that layer (plus the facelets of the face itself for an outer layer), through
+index arrays worked out once per layer from the geometry of the cube.
+
+Layers are counted from a face: depth 0 is the face layer, depth n-1 the opposite face layer. Turns
+follow the directions of `Cube` (clockwise as seen from outside the face), and an NxNCube(3) moves exactly
+like a `Cube`.
+
+Notation for `apply` (WCA): R, R', R2 turn a face; 3R turns the 3rd layer from it; Rw (or 2Rw) turns
+two outer layers, 3Rw three; x, y, z turn whole cube.
+"""
+import re
+import numpy as np
+
+from .state import FACES, FACE_NORMAL, DEFAULT_COLORS, POSITIONS, NORMALS, _LAYOUT, face_index, decode
+from .base import MOVE_TABLE, FACE_NOTATION, front, back, top, bottom, left, right
+
+# ---------------
+
+_TOKEN = re.compile(r"\s*(\d*)([FBUDLRxyz])(w?)(\d*)('?)\s*")
+_NOTATION_FACE = {letter: view for view, letter in FACE_NOTATION.items()}
+# whole cube turns, as all layers of a face
+_WHOLE = {'x': right, 'y': top, 'z': front}
+# whole cube turn (face, clockwise) bringing each face to front, as `Cube.change_to`
+_CHANGE_TO = {bottom: (right, True), top: (right, False), right: (top, True), left: (top, False)}
+
+def _rotations():
+	"""3x3 integer matrix turning co-ordinates clockwise around each face, taken from face turns of `Cube`.
+	"""
+	rotations = {}
+	for f, view in enumerate(FACES):
+		perm = MOVE_TABLE[f*3]
+		moved = np.flatnonzero(perm != np.arange(len(perm)))
+		source = np.vstack([POSITIONS[perm[moved]], NORMALS[perm[moved]]]).astype(float)
+		destination = np.vstack([POSITIONS[moved], NORMALS[moved]]).astype(float)
+		rotations[view] = np.rint(np.linalg.lstsq(source, destination, rcond=None)[0].T).astype(np.int64)
+	return rotations
+
+_ROTATIONS = _rotations()
+
+def _face_axes():
+	"""(normal, row direction, column direction) unit vectors of each face layout.
+	"""
+	axes = []
+	for view in FACES:
+		origin = np.array(_LAYOUT[view](0, 0))
+		axes.append((np.array(FACE_NORMAL[view]), np.array(_LAYOUT[view](1, 0)) - origin, np.array(_LAYOUT[view](0, 1)) - origin))
+	return np.array(axes, dtype=np.int64)
+
+_AXES = _face_axes()
+
+# ---------------
+
+class Geometry():
+	"""co-ordinates of facelets of an n sized cube, and index arrays of its layer turns (worked out on first use).
+
+	Co-ordinates are doubled, so that they are integers for any n: facelet centers lie at odd (even for
+	odd n) values from -(n-1) to n-1 and faces at -n and n.
+	"""
+	_sizes = {}
+
+	@classmethod
+	def of(cls, n):
+		"""shared geometry of n sized cubes.
+		"""
+		if n not in cls._sizes: cls._sizes[n] = cls(n)
+		return cls._sizes[n]
+
+	def __init__(self, n):
+		self.n = n
+		row, column = np.divmod(np.arange(n * n), n)
+		v, u = 2 * row - (n - 1), 2 * column - (n - 1)
+		normal, down, across = _AXES[:, 0], _AXES[:, 1], _AXES[:, 2]
+		self.positions = (normal[:, None] * n + down[:, None] * v[:, None] + across[:, None] * u[:, None]).reshape(-1, 3)
+		self.normals = np.repeat(normal, n * n, axis=0)
+		self._turns = {}
+
+	def index(self, positions, normals):
+		"""facelet indexes (into faces.ravel()) of given co-ordinates and outward directions.
+		"""
+		face = (normals @ np.array([9, 3, 1]))[:, None] == (_AXES[:, 0] @ np.array([9, 3, 1]))[None, :]
+		face = face.argmax(axis=1)
+		row = ((positions * _AXES[face, 1]).sum(axis=1) + self.n - 1) // 2
+		column = ((positions * _AXES[face, 2]).sum(axis=1) + self.n - 1) // 2
+		return (face * self.n + row) * self.n + column
+
+	def layer(self, view, depth):
+		"""indexes of facelets in a layer.
+		"""
+		n, f = self.n, face_index(view)
+		normal = _AXES[f, 0]
+		axis = np.flatnonzero(normal)[0]
+		sides = (self.normals[:, axis] == 0) & (self.positions[:, axis] * normal[axis] == n - 1 - 2 * depth)
+		if depth == 0: sides |= (self.normals == normal).all(axis=1)
+		if depth == n - 1: sides |= (self.normals == -normal).all(axis=1)
+		return np.flatnonzero(sides)
+
+	def turn(self, view, depth, clockwise=True):
+		"""index arrays of a layer turn: after turn, ``faces.flat[destination] = faces.flat[source]``.
+
+		Args:
+			view (str): face the layer is counted from
+			depth (int): layer, 0 for face layer
+			clockwise (bool, optional): direction as seen from outside that face. Defaults to True.
+
+		Returns:
+			tuple: (destination, source) facelet indexes
+		"""
+		key = (view, depth, clockwise)
+		if key not in self._turns:
+			destination = self.layer(view, depth)
+			rotation = _ROTATIONS[view] if clockwise else _ROTATIONS[view].T
+			# a facelet comes from where the inverse rotation takes its place
+			source = self.index(self.positions[destination] @ rotation, self.normals[destination] @ rotation)
+			self._turns[key] = (destination, source)
+		return self._turns[key]
+
+
+class NxNCube():
+	"""A cube of any size n, with face, inner slice and whole cube turns.
+	"""
+
+	def __init__(self, n=3, faces=None, colors=None):
+		"""Initialize cube, solved unless faces are given.
+
+		Args:
+			n (int, optional): number of layers. Defaults to 3.
+			faces (ndarray, optional): (6, n, n) color codes. Defaults to None (solved cube).
+			colors (tuple, optional): color names for color codes. Defaults to DEFAULT_COLORS.
+		"""
+		if n < 1: raise ValueError(f"cube needs at least one layer, got {n}")
+		self.n = n
+		if faces is None: faces = np.repeat(np.arange(len(FACES), dtype=np.uint8), n * n).reshape(len(FACES), n, n)
+		self.faces = np.array(faces, dtype=np.uint8).reshape(len(FACES), n, n)
+		self.colors = DEFAULT_COLORS if colors is None else tuple(colors)
+		self.geometry = Geometry.of(n)
+
+	def __repr__(self): return f"NxNCube({self.n})"
+	def __eq__(self, other): return isinstance(other, NxNCube) and self.colors == other.colors and np.array_equal(self.faces, other.faces)
+	__hash__ = None
+
+	def copy(self):
+		"""independent copy of cube.
+		"""
+		return NxNCube(self.n, self.faces, self.colors)
+
+	# Moves --------------------------------
+
+	def rotate_slice(self, view, depth, clockwise=True):
+		"""turn one layer of cube.
+
+		Args:
+			view (str): face the layer is counted from
+			depth (int): layer, 0 for face layer up to n-1 for opposite face layer
+			clockwise (bool, optional): direction as seen from outside that face. Defaults to True.
+		"""
+		if not 0 <= depth < self.n: raise ValueError(f"depth {depth} out of range for {self.n} layers")
+		destination, source = self.geometry.turn(view, depth, clockwise)
+		flat = self.faces.reshape(-1)
+		flat[destination] = flat[source]
+
+	def rotate_square(self, view, clockwise=True):
+		"""rotate a side/view of cube in given direction perspective to that face.
+
+		Args:
+			view (str): face name to be rotated
+			clockwise (bool, optional): True will rotate clockwise False will rotate anti-clockwise. Defaults to True.
+		"""
+		self.rotate_slice(view, 0, clockwise)
+
+	def rotate_layers(self, view, layers, clockwise=True):
+		"""turn given number of outer layers of a face together (wide turn).
+		"""
+		for depth in range(layers): self.rotate_slice(view, depth, clockwise)
+
+	def change_to(self, view):
+		"""Turn the whole cube, i.e. Turn cube such face it faces now towards give view side.
+
+		Args:
+			view (str): face name to turn towards
+
+		Returns:
+			NxNCube: updated cube after move
+		"""
+		cube = self.copy()
+		for face, clockwise in ((_CHANGE_TO[top],) * 2 if view == back else (_CHANGE_TO[view],)):
+			cube.rotate_layers(face, self.n, clockwise)
+		return cube
+
+	def apply(self, moves):
+		"""apply moves in notation, ex: "R U' 2R Rw2 3Fw x".
+
+		Args:
+			moves (str): move sequence
+
+		Raises:
+			ValueError: for a move which is not in notation, or a layer beyond cube
+
+		Returns:
+			NxNCube: same cube after moves
+		"""
+		for view, depths, clockwise, times in self._parse(moves):
+			for _ in range(times):
+				for depth in depths: self.rotate_slice(view, depth, clockwise)
+		return self
+
+	def _parse(self, moves):
+		"""layer turns of a move sequence, all checked before any of them is done.
+
+		Raises:
+			ValueError: for a move which is not in notation, or a layer beyond cube
+
+		Returns:
+			list: (view, depths, clockwise, quarter turns) of each move
+		"""
+		turns, position = [], 0
+		while position < len(moves):
+			token = _TOKEN.match(moves, position)
+			if not token:
+				if moves[position:].strip(): raise ValueError(f"invalid move at {position}: {moves[position:]!r}")
+				break
+			layer, letter, wide, count, prime = token.groups()
+			if letter in _WHOLE:
+				view, depths = _WHOLE[letter], range(self.n)
+			elif wide:
+				view, depths = _NOTATION_FACE[letter], range(int(layer) if layer else 2)
+			else:
+				depth = int(layer) - 1 if layer else 0
+				view, depths = _NOTATION_FACE[letter], range(depth, depth + 1)
+			if not depths or depths[0] < 0 or depths[-1] >= self.n:
+				raise ValueError(f"move {token.group().strip()!r} at {position} turns layers beyond {self.n} layers")
+			quarters = (int(count) if count else 1) * (-1 if prime else 1) % 4
+			turns.append((view, depths, quarters != 3, 1 if quarters == 3 else quarters))
+			position = token.end()
+		return turns
+
+	# Verification/Display --------------------------------
+
+	def is_solved(self):
+		"""check is cube in solved position
+
+		Returns:
+			bool: True if solved, else False
+		"""
+		faces = self.faces.reshape(len(FACES), -1)
+		return bool((faces == faces[:, :1]).all())
+
+	def show(self, view):
+		"""return the face of cube.
+
+		Args:
+			view (str): face of a cube
+
+		Returns:
+			ndarray: nxn colors of the face
+		"""
+		return decode(self.faces[face_index(view)], self.colors)
+
+	def show_all(self):
+		"""return all six faces of cube, in FACES order.
+
+		Returns:
+			ndarray: 6xnxn colors of the faces
+		"""
+		return decode(self.faces, self.colors)
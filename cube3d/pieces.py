@@ -0,0 +1,181 @@
+"""Where each piece of a cube is: an index from piece (by its colors) to position and orientation, and
+from position to piece.
+
+An index holds cubies of a state (see `cubie`), so a query is a dict lookup and a few array operations,
+and a face turn updates it by one cubie multiplication. `Cube` builds its index on first query, then keeps
+it up to date with every face turn and applied algorithm; a state assigned directly (or an algorithm moving
+centers) has it built again on next query::
+
+	cube.locate(('White', 'Red', 'Blue'))   # Piece(colors=('White', 'Blue', 'Red'), position=(1, 1, -1), ...)
+	cube.piece_at((1, 1, -1))
+	cube.unsolved_pieces()
+
+Positions are (x, y, z) co-ordinates of `Point` (-1, 0 or 1, x towards right, y towards top, z towards back)
+as cube is seen now. Orientation of a piece is its twist (0, 1, 2 clockwise thirds) for a corner, its flip
+(0, 1) for an edge, see `cubie`.
+"""
+from collections import namedtuple
+import numpy as np
+
+from .state import FACES, FACE_NORMAL
+from .cubie import CORNERS, EDGES, MOVE_CUBIES, to_cubies, multiply
+
+# ---------------
+
+# pieces are numbered corners (8), edges (12), centers (6), each by its home slot
+PIECES = CORNERS + EDGES + tuple((face,) for face in range(len(FACES)))
+SLOT_POSITIONS = np.array([np.sum([FACE_NORMAL[FACES[face]] for face in faces], axis=0) for faces in PIECES], dtype=np.int8)
+_SLOT_AT = {tuple(position): slot for slot, position in enumerate(SLOT_POSITIONS.tolist())}
+
+# cubies of each face turn, by its number in MOVES
+_TURNS = [tuple(cubies[m] for cubies in MOVE_CUBIES) for m in range(len(MOVE_CUBIES[0]))]
+_CENTERS = np.arange(len(FACES)) + len(CORNERS) + len(EDGES)
+
+Piece = namedtuple('Piece', 'colors position home orientation')
+Piece.__doc__ = """a piece: its colors (in order of faces of its home slot), position, home position and orientation."""
+
+_NAMES = {}
+
+def _names(centers):
+	"""colors of every piece, and piece number of each set of colors, for given center colors.
+	"""
+	if centers not in _NAMES:
+		names = [tuple(centers[face] for face in faces) for faces in PIECES]
+		_NAMES[centers] = (names, {frozenset(piece): p for p, piece in enumerate(names)})
+	return _NAMES[centers]
+
+
+class PieceIndex():
+	"""location of every piece of a state, and piece at every position, kept as cubies of state.
+	"""
+
+	def __init__(self, cubies, centers, palette=None):
+		"""Initialize PieceIndex.
+
+		Args:
+			cubies (tuple): (cp, co, ep, eo) of state, see `cubie.to_cubies`
+			centers (tuple): color of each center, in face order
+			palette (tuple, optional): color names for color codes of cube indexed. Defaults to None.
+		"""
+		self.cubies = cubies
+		self.palette = palette
+		self.colors, self._by_colors = _names(tuple(centers))
+
+	@classmethod
+	def of_state(cls, state, colors):
+		"""index of a facelet state.
+
+		Args:
+			state (ndarray): 54 facelet color codes
+			colors (tuple): color names for color codes
+
+		Raises:
+			ValueError: if a corner or edge is not a real piece
+
+		Returns:
+			PieceIndex: piece index
+		"""
+		return cls(to_cubies(state), tuple(colors[code] for code in state[4::9].tolist()), colors)
+
+	def turn(self, move):
+		"""update index for a face turn.
+
+		Args:
+			move (int): number of face turn in MOVES
+		"""
+		self.cubies = multiply(self.cubies, _TURNS[move])
+
+	def apply(self, cubies):
+		"""update index for a move sequence not moving centers.
+
+		Args:
+			cubies (tuple): (cp, co, ep, eo) of sequence applied to a solved cube
+		"""
+		self.cubies = multiply(self.cubies, cubies)
+
+	@property
+	def slots(self):
+		"""slot of each piece (inverse permutations of cubies).
+		"""
+		cp, co, ep, eo = self.cubies
+		return np.concatenate([np.argsort(cp), np.argsort(ep) + len(CORNERS), _CENTERS])
+
+	@property
+	def pieces(self):
+		"""piece in each slot.
+		"""
+		cp, co, ep, eo = self.cubies
+		return np.concatenate([cp, ep + len(CORNERS), _CENTERS])
+
+	@property
+	def orientations(self):
+		"""orientation of each piece.
+		"""
+		cp, co, ep, eo = self.cubies
+		return np.concatenate([co, eo, np.zeros(len(FACES), dtype=co.dtype)])[self.slots]
+
+	@property
+	def positions(self):
+		"""position of each piece.
+		"""
+		return SLOT_POSITIONS[self.slots]
+
+	def piece(self, p):
+		"""Piece of a piece number.
+		"""
+		cp, co, ep, eo = self.cubies
+		if p < len(CORNERS):
+			slot = int(np.flatnonzero(cp == p)[0])
+			orientation = co[slot]
+		elif p < len(CORNERS) + len(EDGES):
+			slot = int(np.flatnonzero(ep == p - len(CORNERS))[0])
+			orientation = eo[slot]
+			slot += len(CORNERS)
+		else:
+			slot, orientation = p, 0
+		return Piece(self.colors[p], tuple(SLOT_POSITIONS[slot].tolist()), tuple(SLOT_POSITIONS[p].tolist()), int(orientation))
+
+	def locate(self, colors):
+		"""where a piece is.
+
+		Args:
+			colors (iterable): colors of piece, in any order, ex: ('White', 'Red', 'Blue')
+
+		Raises:
+			ValueError: if no piece has these colors
+
+		Returns:
+			Piece: piece, with its position and orientation
+		"""
+		p = self._by_colors.get(frozenset(colors))
+		if p is None: raise ValueError(f"no piece with colors {tuple(colors)}")
+		return self.piece(p)
+
+	def piece_at(self, position):
+		"""piece at a position.
+
+		Args:
+			position (tuple): (x, y, z) co-ordinates, each -1, 0 or 1
+
+		Raises:
+			ValueError: for a position without piece (cube center, or outside cube)
+
+		Returns:
+			Piece: piece at position
+		"""
+		slot = _SLOT_AT.get(tuple(position))
+		if slot is None: raise ValueError(f"no piece at position {tuple(position)}")
+		cp, co, ep, eo = self.cubies
+		if slot < len(CORNERS): return self.piece(int(cp[slot]))
+		if slot < len(CORNERS) + len(EDGES): return self.piece(int(ep[slot - len(CORNERS)]) + len(CORNERS))
+		return self.piece(slot)
+
+	def unsolved(self):
+		"""pieces not at home, or turned at home.
+
+		Returns:
+			list: Piece of each of them
+		"""
+		cp, co, ep, eo = self.cubies
+		moved = np.concatenate([(cp != np.arange(len(CORNERS))) | (co != 0), (ep != np.arange(len(EDGES))) | (eo != 0)])
+		return [self.piece(int(p)) for p in np.sort(self.pieces[:len(moved)][moved])]
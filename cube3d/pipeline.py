@@ -0,0 +1,223 @@
+"""Streaming replay of move sequences. Each input line is a move sequence, applied to a starting cube,
+and each result is written out as one record.
+
+The pipeline is a chain of generators, so any size of input runs in constant memory::
+
+	lines = read_lines(open('scrambles.txt'))
+	for moves, cubes in replay(batches(lines), start):
+		...
+
+Lines are grouped into batches and every batch is moved as one `CubeBatch`, all its cubes at once.
+A line which is not a move sequence stops the replay with a ValueError once results of lines before it
+are written, or, with ``errors='skip'``, is written as an error record (left out of binary and states
+output) and replay goes on.
+
+Output formats:
+	* jsonl  : one JSON object per line, ``{"line", "moves", "state", "solved", "faces"}``. state is the
+	  facelet string of cube (see `formats`), faces hold 3x3 colors of selected faces. A skipped line
+	  is ``{"line", "moves", "error"}``.
+	* binary : fixed size records of dtype `RECORD` ( 54 facelet color codes and solved flag ), readable
+	  with ``numpy.fromfile(file, dtype=RECORD)``. Color codes index the palette of starting cube.
+	* states : compact state file (21 bytes per cube), readable with `statefile.StateFile`.
+"""
+import json
+import numpy as np
+
+from .base import Cube, FACELETS
+from .batch import CubeBatch
+from .algorithm import PERMUTATIONS, parse_moves
+
+# ---------------
+
+BATCH_SIZE = 4096
+RECORD = np.dtype([('state', np.uint8, (FACELETS,)), ('solved', np.bool_)])
+
+# every move of notation (face turns, slices, whole cube turns) and an extra identity row for padding
+STEP_NAMES = tuple(PERMUTATIONS)
+_STEPS = np.vstack([np.stack([PERMUTATIONS[name] for name in STEP_NAMES]), np.arange(FACELETS)])
+_STEP_INDEX = {name: i for i, name in enumerate(STEP_NAMES)}
+
+# ---------------
+# stages
+
+def read_lines(file):
+	"""move sequences of a text file, one per line. blank lines and lines starting with # are skipped.
+
+	Args:
+		file (file): open text file (or any iterable of lines)
+
+	Yields:
+		tuple: (line number, move sequence)
+	"""
+	for n, line in enumerate(file, 1):
+		line = line.strip()
+		if line and not line.startswith('#'): yield n, line
+
+def batches(items, size=BATCH_SIZE):
+	"""group items in lists of given size (last one may be shorter).
+
+	Args:
+		items (iterable): items to group
+		size (int, optional): items per group. Defaults to BATCH_SIZE.
+
+	Yields:
+		list: items
+	"""
+	batch = []
+	for item in items:
+		batch.append(item)
+		if len(batch) == size:
+			yield batch
+			batch = []
+	if batch: yield batch
+
+def _steps(moves):
+	"""move indexes of one move sequence. moves written as separate names are looked up directly,
+	anything else goes through `parse_moves`.
+	"""
+	try:
+		return [_STEP_INDEX[move] for move in moves.split()]
+	except KeyError:
+		return [_STEP_INDEX[move] for move in parse_moves(moves)]
+
+def _padded(sequences):
+	"""move indexes of sequences as an array, padded with -1 (no move) to the longest one.
+	"""
+	steps = np.full((len(sequences), max(map(len, sequences), default=0)), -1, dtype=np.intp)
+	for i, sequence in enumerate(sequences):
+		steps[i, :len(sequence)] = sequence
+	return steps
+
+def _moved(cube, sequences):
+	"""CubeBatch of move sequences (as move indexes) applied to copies of a cube.
+	"""
+	states = np.tile(cube.state, (len(sequences), 1))
+	for column in _padded(sequences).T:
+		states = np.take_along_axis(states, _STEPS[column], axis=1)
+	return CubeBatch(states, cube.colors)
+
+def replay(groups, cube=None, errors='raise'):
+	"""apply each move sequence to a copy of starting cube, a whole group at once.
+
+	Args:
+		groups (iterable): lists of (line number, move sequence) pairs, see `batches`
+		cube (Cube, optional): starting cube. Defaults to solved cube.
+		errors (str, optional): for a line which is not a move sequence, 'raise' a ValueError (after
+			yielding cubes of lines before it), or 'skip' it, yielding ``([(line number, move sequence,
+			error message)], None)`` in its place. Defaults to 'raise'.
+
+	Raises:
+		ValueError: for a line which is not a move sequence (errors 'raise'), or an unknown errors mode
+
+	Yields:
+		tuple: (list of (line number, move sequence), CubeBatch of resulting cubes)
+	"""
+	if errors not in ('raise', 'skip'): raise ValueError(f"unknown errors mode {errors!r}, expected 'raise' or 'skip'")
+	if cube is None: cube = Cube()
+	for lines in groups:
+		done, sequences = [], []
+		for n, moves in lines:
+			try:
+				sequences.append(_steps(moves))
+			except ValueError as e:
+				if done: yield done, _moved(cube, sequences)
+				done, sequences = [], []
+				if errors == 'raise': raise ValueError(f"line {n}: {e}") from None
+				yield [(n, moves, str(e))], None
+			else:
+				done.append((n, moves))
+		if done: yield done, _moved(cube, sequences)
+
+def records(replayed, faces=()):
+	"""JSON ready records of replayed cubes.
+
+	Args:
+		replayed (iterable): output of `replay`
+		faces (tuple, optional): faces to include. Defaults to ().
+
+	Raises:
+		ValueError: if two colors of cube start with same letter (state can not be a facelet string)
+
+	Yields:
+		dict: record of one cube
+	"""
+	for lines, cubes in replayed:
+		if cubes is None:
+			for n, moves, error in lines: yield {'line': n, 'moves': moves, 'error': error}
+			continue
+		letters = np.array([str(color)[:1] for color in cubes.colors])
+		if len(set(letters.tolist())) < len(letters):
+			raise ValueError(f"colors {cubes.colors} do not have distinct first letters")
+		states = np.ascontiguousarray(letters[cubes.states]).view(f'<U{FACELETS}').ravel().tolist()
+		solved = cubes.is_solved().tolist()
+		shown = {view: cubes.show(view).tolist() for view in faces}
+		for i, (n, moves) in enumerate(lines):
+			record = {'line': n, 'moves': moves, 'state': states[i], 'solved': solved[i]}
+			if faces: record['faces'] = {view: shown[view][i] for view in faces}
+			yield record
+
+# ---------------
+# writers
+
+def write_jsonl(items, out):
+	"""write records as JSON lines.
+
+	Args:
+		items (iterable): records, see `records`
+		out (file): open text file
+
+	Returns:
+		int: number of records written
+	"""
+	count = 0
+	for count, record in enumerate(items, 1):
+		out.write(json.dumps(record) + '\n')
+	return count
+
+def write_binary(replayed, out):
+	"""write replayed cubes as binary records of dtype RECORD.
+
+	Args:
+		replayed (iterable): output of `replay`
+		out (file): open binary file
+
+	Returns:
+		int: number of records written
+	"""
+	count = 0
+	for lines, cubes in replayed:
+		if cubes is None: continue
+		block = np.empty(len(cubes), dtype=RECORD)
+		block['state'], block['solved'] = cubes.states, cubes.is_solved()
+		out.write(block.tobytes())
+		count += len(block)
+	return count
+
+def run(lines, out, cube=None, format='jsonl', faces=(), batch_size=BATCH_SIZE, errors='raise'):
+	"""replay all move sequences of a text stream and write results.
+
+	Args:
+		lines (file): open text file of move sequences, one per line
+		out (file): open output file, text for jsonl and binary for binary format
+		cube (Cube, optional): starting cube. Defaults to solved cube.
+		format (str, optional): 'jsonl', 'binary' or 'states'. Defaults to 'jsonl'.
+		faces (tuple, optional): faces to include in jsonl records. Defaults to ().
+		batch_size (int, optional): cubes moved at once. Defaults to BATCH_SIZE.
+		errors (str, optional): 'raise' or 'skip' lines which are not move sequences, see `replay`. Defaults to 'raise'.
+
+	Raises:
+		ValueError: for an unknown format, or a line which is not a move sequence (errors 'raise')
+
+	Returns:
+		int: number of records written
+	"""
+	replayed = replay(batches(read_lines(lines), batch_size), cube, errors)
+	if format == 'jsonl': return write_jsonl(records(replayed, faces), out)
+	if format == 'binary': return write_binary(replayed, out)
+	if format == 'states':
+		from .statefile import StateWriter
+		with StateWriter(out) as writer:
+			for lines, cubes in replayed:
+				if cubes is not None: writer.write(cubes)
+		return writer.count
+	raise ValueError(f"unknown format {format!r}, expected 'jsonl', 'binary' or 'states'")
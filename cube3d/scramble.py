@@ -0,0 +1,108 @@
+"""Random cubes and random scrambles, in bulk.
+
+Random states are drawn uniformly among all 43,252,003,274,489,856,000 legal states by drawing their
+cubies directly: a random corner permutation, a random edge permutation of same parity, and random twists
+and flips with their sums fixed by the last corner and edge. No moves are simulated. All functions take
+``rng``, a `numpy.random.Generator` or a seed (None for fresh entropy), so results can be reproduced::
+
+	cubes = random_batch(1_000_000, rng=42)          # CubeBatch
+	moves = random_scrambles(1000, 25, rng=42)        # (1000, 25) move indexes, see CubeBatch.apply_moves
+"""
+import numpy as np
+
+from .base import Cube, MOVES
+from .batch import CubeBatch
+from .cubie import from_cubies, parity
+from .solver import ALLOWED
+
+# ---------------
+
+def _generator(rng):
+	return rng if isinstance(rng, np.random.Generator) else np.random.default_rng(rng)
+
+def _orientations(rng, n, pieces, base):
+	"""random orientations with sum a multiple of base, (n, pieces).
+	"""
+	orientation = rng.integers(0, base, (n, pieces), dtype=np.int8)
+	orientation[:, -1] = -orientation[:, :-1].sum(axis=1) % base
+	return orientation
+
+def random_states(n, rng=None):
+	"""n uniformly random legal states.
+
+	Args:
+		n (int): number of states
+		rng (Generator, int, optional): random generator or seed. Defaults to None.
+
+	Returns:
+		ndarray: (n, 54) uint8 facelet color codes (home colors)
+	"""
+	rng = _generator(rng)
+	cp = rng.permuted(np.tile(np.arange(8, dtype=np.int8), (n, 1)), axis=1)
+	ep = rng.permuted(np.tile(np.arange(12, dtype=np.int8), (n, 1)), axis=1)
+	# swapping two edges fixes parity, and is a one to one map between both halves of edge permutations
+	odd = parity(cp) != parity(ep)
+	ep[odd, -2:] = ep[odd, :-3:-1]
+	return from_cubies(cp, _orientations(rng, n, 8, 3), ep, _orientations(rng, n, 12, 2))
+
+def random_cube(rng=None, colors=None):
+	"""a uniformly random legal cube.
+
+	Args:
+		rng (Generator, int, optional): random generator or seed. Defaults to None.
+		colors (tuple, optional): color names for color codes. Defaults to DEFAULT_COLORS.
+
+	Returns:
+		Cube: Cube object
+	"""
+	return Cube(state=random_states(1, rng)[0], colors=colors)
+
+def random_batch(n, rng=None, colors=None):
+	"""n uniformly random legal cubes.
+
+	Args:
+		n (int): number of cubes
+		rng (Generator, int, optional): random generator or seed. Defaults to None.
+		colors (tuple, optional): color names for color codes. Defaults to DEFAULT_COLORS.
+
+	Returns:
+		CubeBatch: cubes
+	"""
+	return CubeBatch(random_states(n, rng), colors)
+
+# ---------------
+
+# moves allowed after each face (last row: first move), padded, and their number
+_CHOICES = np.array([np.resize(np.flatnonzero(allowed), len(MOVES)) for allowed in ALLOWED], dtype=np.intp)
+_COUNTS = ALLOWED.sum(axis=1)
+
+def random_scrambles(n, length, rng=None):
+	"""n random move sequences. A face is never turned twice in a row, and opposite faces in one order only,
+	so no sequence can be written shorter by merging neighbouring moves.
+
+	Args:
+		n (int): number of sequences
+		length (int): moves per sequence
+		rng (Generator, int, optional): random generator or seed. Defaults to None.
+
+	Returns:
+		ndarray: (n, length) move indexes in MOVES
+	"""
+	rng = _generator(rng)
+	moves = np.empty((n, length), dtype=np.intp)
+	last = np.full(n, len(ALLOWED) - 1)
+	for i in range(length):
+		moves[:, i] = _CHOICES[last, (rng.random(n) * _COUNTS[last]).astype(np.intp)]
+		last = moves[:, i] // 3
+	return moves
+
+def scramble_text(moves):
+	"""move sequence in notation, from move indexes.
+
+	Args:
+		moves (ndarray): (length,) move indexes
+
+	Returns:
+		str: moves, ex: "R U' F2"
+	"""
+	return ' '.join(MOVES[move] for move in moves)
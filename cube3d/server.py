@@ -0,0 +1,401 @@
+"""Long-lived cube server (`cube3d serve`), so that one-off requests do not pay for starting Python,
+importing numpy and rebuilding cubes each time.
+
+Server listens on a Unix socket or a localhost TCP port. Protocol is line-delimited JSON: a client writes
+one request object per line and reads one response object per line, in the same order. A request names
+an operation and (except for stats) a cube, cubes being kept in server memory by name::
+
+	{"id": 1, "op": "load", "cube": "a", "state": "RRRRRRRRR..."}    facelet string / JSON of cube, or
+	{"id": 2, "op": "load", "cube": "b", "path": "cube.xlsx"}        a file of data directory (or solved)
+	{"id": 3, "op": "move", "cube": "a", "moves": "R U R' U'"}
+	{"id": 4, "op": "show", "cube": "a", "view": "front"}             one face, or all six without view
+	{"id": 5, "op": "is_solved", "cube": "a"}
+	{"id": 6, "op": "validate", "cube": "a"}
+	{"id": 7, "op": "solve", "cube": "a", "timeout": 1}             solution moves, cube is not changed
+	                                                                (timeout at most MAX_TIMEOUT seconds)
+	{"id": 8, "op": "drop", "cube": "a"}
+	{"id": 9, "op": "stats"}
+
+	{"id": 3, "ok": true, "result": {"solved": false}}
+	{"id": 7, "ok": false, "error": "cube 'x' is not loaded"}
+
+Files are loaded only from the data directory given to server (``--data-dir``), by paths relative to it;
+without one, loading files is off. Errors of a file are reported without their details.
+
+Moves arriving together (from any number of connections) are coalesced: they are queued, and applied as
+one `CubeBatch`-style NumPy gather per move column over all cubes concerned. Solving and loading of files
+run off the event loop, solving in a pool of worker processes which keep their solver tables loaded
+between jobs. Requests of one connection are answered one after other; clients wanting concurrency open
+several connections.
+"""
+import os
+import json
+import time
+import signal
+import asyncio
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .base import Cube, FACES
+from .formats import from_json
+from .pipeline import _STEPS, _steps
+from .validate import validate
+
+# ---------------
+
+HOST = '127.0.0.1'
+PORT = 8765
+WINDOW = 0.0
+LATENCIES = 1000
+MAX_TIMEOUT = 10.0		# longest solve timeout a client may ask for, in seconds
+LINE_LIMIT = 1 << 20		# longest request line, in bytes
+
+def _load(path):
+	"""worker job: cube of an Excel workbook or a JSON file.
+	"""
+	if path.lower().endswith(('.xlsx', '.xls')):
+		from .input import get_cube
+		return get_cube(path)
+	with open(path) as f: return from_json(f.read())
+
+def _solve(state, colors, timeout, directory):
+	"""worker job: two-phase solution of a cube, as move names.
+	"""
+	from .twophase import solve
+	solution = solve(Cube(state=state, colors=colors), timeout=timeout, directory=directory)
+	return None if solution is None else ' '.join(solution.moves)
+
+
+class Stats():
+	"""request counters, queue depths and latencies of a server.
+	"""
+
+	def __init__(self):
+		self.started = time.time()
+		self.requests, self.errors = Counter(), Counter()
+		self.latencies = deque(maxlen=LATENCIES)
+		self.connections = 0
+		self.batches = self.batched = 0
+
+	def record(self, op, seconds, ok):
+		self.requests[op] += 1
+		if not ok: self.errors[op] += 1
+		self.latencies.append(seconds)
+
+	def report(self, server):
+		"""JSON ready stats.
+		"""
+		latencies = np.array(self.latencies) * 1e3
+		percentiles = np.percentile(latencies, [50, 90, 99]).tolist() if len(latencies) else [0.0] * 3
+		return {
+			'uptime': time.time() - self.started,
+			'connections': self.connections,
+			'cubes': len(server.cubes),
+			'queued_moves': len(server.pending),
+			'running_jobs': server.jobs,
+			'requests': dict(self.requests),
+			'errors': dict(self.errors),
+			'move_batches': self.batches,
+			'batched_moves': self.batched,
+			'latency_ms': dict(zip(('p50', 'p90', 'p99'), percentiles), max=float(latencies.max()) if len(latencies) else 0.0),
+		}
+
+
+class CubeServer():
+	"""cubes kept by name, and the request handling of `cube3d serve`.
+	"""
+
+	def __init__(self, workers=None, window=WINDOW, directory=None, data_dir=None):
+		"""Initialize server.
+
+		Args:
+			workers (int, optional): solver processes. Defaults to None (number of CPUs).
+			window (float, optional): seconds to wait for more moves before applying queued ones. Defaults to 0 (next loop turn).
+			directory (str, optional): solver table folder. Defaults to tables.table_directory().
+			data_dir (str, optional): folder cubes may be loaded from. Defaults to None (no file loading).
+		"""
+		self.cubes = {}
+		self.data_dir = None if data_dir is None else os.path.realpath(data_dir)
+		self.pending = []
+		self.jobs = 0
+		self.window = window
+		self.directory = directory
+		self.workers = workers
+		self.stats = Stats()
+		self._pool = None
+		self._flush_handle = None
+
+	@property
+	def pool(self):
+		if self._pool is None: self._pool = ProcessPoolExecutor(self.workers)
+		return self._pool
+
+	def close(self):
+		if self._pool is not None: self._pool.shutdown(wait=False)
+
+	# ---------------
+	# move batching
+
+	def _queue_moves(self, name, steps):
+		"""future of a move request, resolved once queued moves have been applied.
+		"""
+		loop = asyncio.get_running_loop()
+		future = loop.create_future()
+		self.pending.append((name, steps, future))
+		if self._flush_handle is None:
+			self._flush_handle = loop.call_later(self.window, self._flush) if self.window else loop.call_soon(self._flush)
+		return future
+
+	def _flush(self):
+		"""apply all queued moves: sequences of a cube are joined in arrival order, then every cube concerned
+		is moved at once.
+		"""
+		pending, self.pending, self._flush_handle = self.pending, [], None
+		sequences = {}
+		for name, steps, future in pending:
+			sequences.setdefault(name, []).extend(steps)
+		names = [name for name in sequences if name in self.cubes]
+		if names:
+			steps = np.full((len(names), max(len(sequences[name]) for name in names)), -1, dtype=np.intp)
+			for i, name in enumerate(names):
+				steps[i, :len(sequences[name])] = sequences[name]
+			states = np.stack([self.cubes[name].state for name in names])
+			for column in steps.T:
+				states = np.take_along_axis(states, _STEPS[column], axis=1)
+			for name, state in zip(names, states):
+				self.cubes[name].state = state
+		self.stats.batches += 1
+		self.stats.batched += len(pending)
+		for name, steps, future in pending:
+			if future.done(): continue
+			if name in self.cubes: future.set_result({'solved': self.cubes[name].is_solved()})
+			else: future.set_exception(ValueError(f"cube {name!r} is not loaded"))
+
+	# ---------------
+	# operations
+
+	def _cube(self, request):
+		name = request.get('cube')
+		if name not in self.cubes: raise ValueError(f"cube {name!r} is not loaded")
+		return self.cubes[name]
+
+	async def _run(self, executor, function, *args):
+		self.jobs += 1
+		try:
+			return await asyncio.get_running_loop().run_in_executor(executor, function, *args)
+		finally:
+			self.jobs -= 1
+
+	def _data_file(self, path):
+		"""full name of a file of data directory.
+		"""
+		if self.data_dir is None: raise ValueError("loading files is not enabled on this server")
+		if not isinstance(path, str): raise ValueError("path must be a string")
+		full = os.path.realpath(os.path.join(self.data_dir, path))
+		if os.path.commonpath([full, self.data_dir]) != self.data_dir or not os.path.isfile(full):
+			raise ValueError(f"no file {path!r} in data directory")
+		return full
+
+	async def op_load(self, request):
+		name = request.get('cube')
+		if not isinstance(name, str): raise ValueError("load needs a cube name")
+		if 'path' in request:
+			full = self._data_file(request['path'])
+			try:
+				cube = await self._run(None, _load, full)
+			except Exception:
+				raise ValueError(f"can not load {request['path']!r}") from None
+		elif 'state' in request:
+			cube = from_json(request['state'])
+		else:
+			cube = Cube()
+		self.cubes[name] = cube
+		return {'solved': cube.is_solved()}
+
+	async def op_move(self, request):
+		self._cube(request)
+		return await self._queue_moves(request['cube'], _steps(request.get('moves', '')))
+
+	async def op_show(self, request):
+		cube = self._cube(request)
+		view = request.get('view')
+		if view and view not in FACES: raise ValueError(f"invalid view {view!r}, choose from {', '.join(FACES)}")
+		if view: return cube.show(view).tolist()
+		return dict(zip(FACES, cube.show_all().tolist()))
+
+	async def op_is_solved(self, request):
+		return self._cube(request).is_solved()
+
+	async def op_validate(self, request):
+		validate(self._cube(request))
+		return True
+
+	async def op_solve(self, request):
+		cube = self._cube(request)
+		validate(cube)
+		timeout = request.get('timeout')
+		if timeout is not None:
+			if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or not 0 <= timeout < float('inf'):
+				raise ValueError(f"invalid timeout {timeout!r}, give seconds as a non-negative number")
+			timeout = min(timeout, MAX_TIMEOUT)
+		return await self._run(self.pool, _solve, cube.state, cube.colors, timeout, self.directory)
+
+	async def op_drop(self, request):
+		return self.cubes.pop(request.get('cube'), None) is not None
+
+	async def op_stats(self, request):
+		return self.stats.report(self)
+
+	async def handle(self, request):
+		"""response to one request.
+
+		Args:
+			request (dict): parsed request line
+
+		Returns:
+			dict: response, ``{"id", "ok", "result"}`` or ``{"id", "ok", "error"}``
+		"""
+		start = time.perf_counter()
+		op = request.get('op') if isinstance(request, dict) else None
+		response = {'id': request.get('id')} if isinstance(request, dict) else {'id': None}
+		operation = getattr(self, f'op_{op}', None) if isinstance(op, str) else None
+		try:
+			if operation is None: raise ValueError(f"unknown op {op!r}")
+			response.update(ok=True, result=await operation(request))
+		except Exception as e:
+			# a bad request fails alone, server and connection keep running
+			response.update(ok=False, error=str(e) if isinstance(e, (ValueError, OSError)) else f"{type(e).__name__}: {e}")
+		self.stats.record(op if operation else 'invalid', time.perf_counter() - start, response['ok'])
+		return response
+
+	async def connection(self, reader, writer):
+		"""serve one client connection until it closes.
+		"""
+		self.stats.connections += 1
+		try:
+			while True:
+				line = await _read_line(reader)
+				if line == b'': break
+				if line is None:
+					response = {'id': None, 'ok': False, 'error': f"request line longer than {LINE_LIMIT} bytes"}
+				elif not line.strip():
+					continue
+				else:
+					try:
+						request = json.loads(line)
+					except ValueError as e:
+						response = {'id': None, 'ok': False, 'error': f"invalid JSON: {e}"}
+					else:
+						response = await self.handle(request)
+				writer.write(json.dumps(response).encode() + b'\n')
+				await writer.drain()
+		except (ConnectionError, asyncio.IncompleteReadError):
+			pass
+		finally:
+			self.stats.connections -= 1
+			writer.close()
+
+async def _read_line(reader):
+	"""next line of a stream, b'' at its end, None for a line longer than LINE_LIMIT (which is skipped).
+	"""
+	too_long = False
+	while True:
+		try:
+			line = await reader.readuntil(b'\n')
+		except asyncio.IncompleteReadError as e:
+			line = e.partial
+		except asyncio.LimitOverrunError as e:
+			# drop what is read of the line so far, and go on to its end
+			await reader.readexactly(e.consumed)
+			too_long = True
+			continue
+		return None if too_long else line
+
+# ---------------
+
+async def start(server, socket=None, host=HOST, port=PORT):
+	"""start listening, on a Unix socket if given, else on TCP host and port.
+
+	Returns:
+		asyncio.Server: listening server
+	"""
+	if socket:
+		if os.path.exists(socket): os.unlink(socket)
+		return await asyncio.start_unix_server(server.connection, path=socket, limit=LINE_LIMIT)
+	return await asyncio.start_server(server.connection, host, port, limit=LINE_LIMIT)
+
+def serve(socket=None, host=HOST, port=PORT, workers=None, window=WINDOW, directory=None, ready=None, data_dir=None):
+	"""run a cube server until interrupted.
+
+	Args:
+		socket (str, optional): Unix socket path. Defaults to None (TCP).
+		host (str, optional): TCP address. Defaults to HOST (localhost only).
+		port (int, optional): TCP port. Defaults to PORT.
+		workers (int, optional): solver processes. Defaults to None (number of CPUs).
+		window (float, optional): seconds to wait for more moves before applying queued ones. Defaults to WINDOW.
+		directory (str, optional): solver table folder. Defaults to tables.table_directory().
+		ready (callable, optional): called with listening addresses once server accepts connections. Defaults to None.
+		data_dir (str, optional): folder cubes may be loaded from. Defaults to None (no file loading).
+	"""
+	server = CubeServer(workers, window, directory, data_dir)
+	async def run():
+		listening = await start(server, socket, host, port)
+		stop = asyncio.Event()
+		for signal_ in (signal.SIGINT, signal.SIGTERM):
+			try:
+				asyncio.get_running_loop().add_signal_handler(signal_, stop.set)
+			except (NotImplementedError, RuntimeError):
+				pass		# not on Windows, KeyboardInterrupt stops server there
+		if ready: ready([s.getsockname() for s in listening.sockets])
+		async with listening: await stop.wait()
+	try:
+		asyncio.run(run())
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.close()
+		if socket and os.path.exists(socket): os.unlink(socket)
+
+
+class Client():
+	"""blocking client of a cube server, one request at a time::
+
+		with Client(socket='/tmp/cube3d.sock') as client:
+			client.request('load', cube='a')
+			client.request('move', cube='a', moves="R U")
+	"""
+
+	def __init__(self, socket=None, host=HOST, port=PORT):
+		import socket as sockets
+		if socket:
+			self.connection = sockets.socket(sockets.AF_UNIX, sockets.SOCK_STREAM)
+			self.connection.connect(socket)
+		else:
+			self.connection = sockets.create_connection((host, port))
+		self.file = self.connection.makefile('rwb')
+		self.id = 0
+
+	def __enter__(self): return self
+	def __exit__(self, *exc): self.close()
+
+	def close(self):
+		self.file.close()
+		self.connection.close()
+
+	def request(self, op, **fields):
+		"""send a request and wait for its result.
+
+		Raises:
+			ValueError: with error message of server when request failed
+
+		Returns:
+			result of request
+		"""
+		self.id += 1
+		self.file.write(json.dumps(dict(fields, id=self.id, op=op)).encode() + b'\n')
+		self.file.flush()
+		response = json.loads(self.file.readline())
+		if not response['ok']: raise ValueError(response['error'])
+		return response['result']
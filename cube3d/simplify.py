@@ -0,0 +1,158 @@
+"""Simplification of move sequences, before they are executed.
+
+	* turns of one face in a row are merged, modulo 4 ( R R R -> R', U U' -> nothing )
+	* turns of opposite faces commute, so a turn merges across one of opposite face ( R L R' -> L )
+	* whole cube turns (x y z, as `Cube.change_to`) are folded into the face turns after them, which are
+	  renamed to the face they really turn: ``x U`` turns front face, so it becomes ``F x``. The whole cube
+	  turn is written once, at end (or dropped, see ``rotations``)
+	* slice turns are written as two face turns and a whole cube turn ( M -> R L' x' ), which fold as above
+
+Result is face turns only (plus that last whole cube turn), with no face turned twice in a row and no
+axis turned three times in a row, and leaves the cube exactly as the original sequence would::
+
+	simplify("R R R U U' x U M")          # ("R'", 'F', 'R', "L'")
+
+`Simplifier` does the same incrementally, for a stream of moves of any length: it keeps a window of
+moves which can still change, and gives out moves falling out of it.
+"""
+import numpy as np
+
+from .base import MOVES, MOVE_TABLE, ORIENTATION_TABLE, ORIENTATION_PRODUCT, orientation_index
+from .algorithm import PERMUTATIONS, parse_moves, _turns
+
+# ---------------
+
+WINDOW = 1000
+# slice turns as face turns and a whole cube turn
+_SLICES = {'M': ('R', "L'", "x'"), 'E': ('U', "D'", "y'"), 'S': ("F'", 'B', 'z')}
+_MOVE_INDEX = {move.tobytes(): m for m, move in enumerate(MOVE_TABLE)}
+# orientation index of every whole cube turn name
+_ROTATION = {name: orientation_index(perm) for name, perm in PERMUTATIONS.items() if name[0] in 'xyz'}
+
+def _conjugates():
+	"""move m after orientation o is the same as move _CONJUGATES[o, m] before it, (24, 18).
+	"""
+	conjugates = np.empty((len(ORIENTATION_TABLE), len(MOVES)), dtype=np.intp)
+	for o, perm in enumerate(ORIENTATION_TABLE):
+		inverse = np.argsort(perm)
+		for m, move in enumerate(MOVE_TABLE):
+			conjugates[o, m] = _MOVE_INDEX[perm[move][inverse].tobytes()]
+	return conjugates
+
+def _rotation_names():
+	"""shortest whole cube turn names reaching each orientation.
+	"""
+	names = {0: ()}
+	for first in _ROTATION:
+		names.setdefault(_ROTATION[first], (first,))
+	for first in _ROTATION:
+		for second in _ROTATION:
+			names.setdefault(ORIENTATION_PRODUCT[_ROTATION[first], _ROTATION[second]], (first, second))
+	return [names[o] for o in range(len(ORIENTATION_TABLE))]
+
+_CONJUGATES = _conjugates()
+_ROTATION_NAMES = _rotation_names()
+
+# ---------------
+
+class Simplifier():
+	"""incremental move simplifier.
+
+	Moves are fed with `feed`, which gives back simplified moves no longer in the window (they will not
+	change any more), and `flush` gives the rest at end of stream::
+
+		simplifier = Simplifier()
+		for line in stream:
+			execute(simplifier.feed(line))
+		execute(simplifier.flush())
+	"""
+
+	def __init__(self, window=WINDOW, rotations=True):
+		"""Initialize Simplifier.
+
+		Args:
+			window (int, optional): simplified moves held back, a move this far back is given out. None holds
+				back all moves until `flush`. Defaults to WINDOW.
+			rotations (bool, optional): write net whole cube turn at end. when False it is dropped, cube
+				keeps its orientation (same colors on same faces, as `Cube.is_solved` sees them). Defaults to True.
+		"""
+		self.window = window
+		self.rotations = rotations
+		self.orientation = 0
+		self.stack = []			# (face, quarter turns) of moves held back
+		self.moves_in = self.moves_out = 0
+
+	def _push(self, face, turns):
+		"""add a face turn (in frame of start) to stack, merging with last turn of same face on this axis.
+		"""
+		stack = self.stack
+		for depth in (1, 2):
+			if len(stack) < depth or stack[-depth][0] // 2 != face // 2: break
+			if stack[-depth][0] == face:
+				turns = (stack[-depth][1] + turns) % 4
+				if turns: stack[-depth] = (face, turns)
+				else: del stack[-depth]
+				return
+		stack.append((face, turns))
+
+	def _name(self, face, turns):
+		return MOVES[face * 3 + turns - 1]
+
+	def feed(self, moves):
+		"""add moves.
+
+		Args:
+			moves (str, iterable): move sequence in notation, or move names
+
+		Raises:
+			ValueError: for a move which is not in notation
+
+		Returns:
+			list: simplified move names no longer held back
+		"""
+		for move in parse_moves(moves) if isinstance(moves, str) else moves:
+			self.moves_in += 1
+			letter, turns = move[0], _turns(move)
+			for move in _SLICES[letter] * turns if letter in _SLICES else (move,):
+				if move[0] in 'xyz':
+					self.orientation = ORIENTATION_PRODUCT[self.orientation, _ROTATION[move]]
+				else:
+					m = _CONJUGATES[self.orientation, MOVES.index(move)]
+					self._push(m // 3, m % 3 + 1)
+		return self._emit(self.window)
+
+	def _emit(self, keep):
+		if keep is None: return []
+		out = self.stack[:max(len(self.stack) - keep, 0)]
+		del self.stack[:len(out)]
+		self.moves_out += len(out)
+		return [self._name(face, turns) for face, turns in out]
+
+	def flush(self):
+		"""end of stream: all remaining moves, and whole cube turn to final orientation.
+
+		Returns:
+			list: simplified move names
+		"""
+		moves = self._emit(0)
+		if self.rotations: moves += _ROTATION_NAMES[self.orientation]
+		self.orientation = 0
+		return moves
+
+
+def simplify(moves, rotations=True):
+	"""simplified move sequence, see module description.
+
+	Args:
+		moves (str, iterable): move sequence in notation, or move names
+		rotations (bool, optional): write net whole cube turn at end. Defaults to True.
+
+	Raises:
+		ValueError: for a move which is not in notation
+
+	Returns:
+		tuple: move names, ex: ("R'", 'F2')
+	"""
+	simplifier = Simplifier(window=None, rotations=rotations)
+	simplifier.feed(moves)
+	return tuple(simplifier.flush())
@@ -0,0 +1,201 @@
+"""Optimal solver. IDA* search over the 18 face turns, guided by pattern databases.
+
+Three pattern databases give admissible distances (their maximum is used as heuristic):
+
+	* corners : permutation and twist of all 8 corners      (88,179,840 states)
+	* edges A : position and flip of edges UR UF UL UB DR DF (42,577,920 states)
+	* edges B : position and flip of edges DL DB FR FL BL BR (42,577,920 states)
+
+Databases are generated once (a few minutes, or ahead of time in parallel with ``python -m cube3d.tables``), stored as packed 4-bit tables in `tables.table_directory()`
+and loaded memory-mapped, so worker processes share them. Optimal solving is exponential in solution
+length, deep scrambles take long; use `max_depth` to bound the search.
+"""
+import numpy as np
+
+from .base import MOVES
+from .algorithm import Algorithm
+from .cubie import (
+	MOVE_CUBIES, to_cubies, count_partial,
+	rank_permutation, unrank_permutation, rank_orientation, unrank_orientation, rank_partial, unrank_partial,
+)
+from .validate import validate
+from .tables import cached, lookup, pruning_table, CoordinateNeighbours
+
+# ---------------
+
+TWISTS, CORNER_PERMUTATIONS = 3 ** 7, count_partial(8, 8)
+EDGE6_POSITIONS, EDGE6_FLIPS = count_partial(12, 6), 2 ** 6
+EDGES_A, EDGES_B = tuple(range(6)), tuple(range(6, 12))
+
+# face of each move, opposite face is face ^ 1
+MOVE_FACE = np.arange(len(MOVES)) // 3
+
+def _allowed_moves():
+	"""moves allowed after a move of each face (last row: no previous move). Same face is never turned
+	twice in a row, and opposite faces (which commute) are turned in increasing face order only.
+	"""
+	faces = len(MOVES) // 3
+	allowed = np.ones((faces + 1, len(MOVES)), dtype=bool)
+	for last in range(faces):
+		allowed[last] = (MOVE_FACE != last) & ~((MOVE_FACE == last ^ 1) & (MOVE_FACE < last))
+	return allowed
+
+ALLOWED = _allowed_moves()
+
+# ---------------
+# coordinate move tables
+
+def _twist_moves():
+	"""twist coordinate after each move, (2187, 18).
+	"""
+	co = unrank_orientation(np.arange(TWISTS), 3, 8)
+	cp, mco = MOVE_CUBIES[0], MOVE_CUBIES[1]
+	return np.stack([rank_orientation((co[:, cp[m]] + mco[m]) % 3, 3) for m in range(len(MOVES))], axis=1).astype(np.uint16)
+
+def _corner_permutation_moves():
+	"""corner permutation coordinate after each move, (40320, 18).
+	"""
+	perm = unrank_permutation(np.arange(CORNER_PERMUTATIONS), 8)
+	cp = MOVE_CUBIES[0]
+	return np.stack([rank_permutation(perm[:, cp[m]]) for m in range(len(MOVES))], axis=1).astype(np.uint16)
+
+def _edge6_moves():
+	"""position coordinate of 6 tracked edges after each move, and xor mask of their flips, (665280, 18) each.
+	"""
+	slots = unrank_partial(np.arange(EDGE6_POSITIONS), 12, 6).astype(np.intp)
+	ep, meo = MOVE_CUBIES[2], MOVE_CUBIES[3]
+	positions, flips = [], []
+	for m in range(len(MOVES)):
+		destination = np.argsort(ep[m])
+		moved = destination[slots]
+		positions.append(rank_partial(moved, 12))
+		flips.append((meo[m][moved] << np.arange(6)).sum(axis=1))
+	return np.stack(positions, axis=1).astype(np.int32), np.stack(flips, axis=1).astype(np.uint8)
+
+def _edge6_start(pieces):
+	"""coordinate of solved cube for tracked edges.
+	"""
+	return int(rank_partial(pieces, 12)) * EDGE6_FLIPS
+
+def pruning_tables(directory=None):
+	"""pattern databases of the solver, as (name, size, start, neighbours), building their move tables.
+
+	Args:
+		directory (str, optional): table cache folder. Defaults to tables.table_directory().
+
+	Returns:
+		list: arguments of `tables.pruning_table` for each database
+	"""
+	cached('twist_move', _twist_moves, directory)
+	cached('corner_permutation_move', _corner_permutation_moves, directory)
+	cached('edge6_move', lambda: _edge6_moves()[0], directory)
+	cached('edge6_flip', lambda: _edge6_moves()[1], directory)
+	corners = CoordinateNeighbours('corner_permutation_move', 'twist_move', TWISTS, directory)
+	edges = CoordinateNeighbours('edge6_move', 'edge6_flip', EDGE6_FLIPS, directory, xor=True)
+	return [
+		('pdb_corners', CORNER_PERMUTATIONS * TWISTS, 0, corners),
+		('pdb_edges_a', EDGE6_POSITIONS * EDGE6_FLIPS, _edge6_start(EDGES_A), edges),
+		('pdb_edges_b', EDGE6_POSITIONS * EDGE6_FLIPS, _edge6_start(EDGES_B), edges),
+	]
+
+def _edge6(ep, eo, pieces):
+	"""coordinate (position * 64 + flips) of tracked edge pieces.
+	"""
+	where = np.argsort(ep)[list(pieces)]
+	return int(rank_partial(where, 12)) * EDGE6_FLIPS + int((eo[where] << np.arange(6)).sum())
+
+# ---------------
+
+class Solver():
+	"""IDA* optimal solver holding move tables and pattern databases (memory-mapped).
+	"""
+
+	def __init__(self, directory=None):
+		"""Initialize Solver, loading (or generating on first use) its tables.
+
+		Args:
+			directory (str, optional): table cache folder. Defaults to tables.table_directory().
+		"""
+		tables = pruning_tables(directory)
+		self.corner_pdb, self.edge_a_pdb, self.edge_b_pdb = (pruning_table(*table, directory=directory) for table in tables)
+		self.corner_neighbours, self.edge_neighbours = tables[0][3], tables[1][3]
+
+	# ---------------
+
+	def coordinates(self, cube):
+		"""search coordinates (corners, edges A, edges B) of a cube.
+		"""
+		cp, co, ep, eo = to_cubies(cube.state)
+		corners = int(rank_permutation(cp)) * TWISTS + int(rank_orientation(co, 3))
+		return corners, _edge6(ep, eo, EDGES_A), _edge6(ep, eo, EDGES_B)
+
+	def _children(self, node):
+		"""coordinates and heuristic of all 18 children of a node.
+		"""
+		corners, edges_a, edges_b = node
+		corners = self.corner_neighbours(np.array([corners]))[0]
+		edges_a, edges_b = self.edge_neighbours(np.array([edges_a, edges_b]))
+		h = np.maximum(lookup(self.corner_pdb, corners),
+			np.maximum(lookup(self.edge_a_pdb, edges_a), lookup(self.edge_b_pdb, edges_b)))
+		return corners, edges_a, edges_b, h
+
+	def heuristic(self, node):
+		"""admissible lower bound of moves to solve from given coordinates.
+		"""
+		corners, edges_a, edges_b = node
+		return int(max(lookup(self.corner_pdb, corners), lookup(self.edge_a_pdb, edges_a), lookup(self.edge_b_pdb, edges_b)))
+
+	def _search(self, node, depth, bound, last, path):
+		"""depth first search within bound, appending moves of solution to path.
+
+		Returns:
+			bool: True when solved
+		"""
+		corners, edges_a, edges_b, h = self._children(node)
+		allowed = np.flatnonzero(ALLOWED[last] & (depth + 1 + h <= bound))
+		for move in allowed[np.argsort(h[allowed], kind='stable')]:
+			path.append(move)
+			if h[move] == 0: return True
+			if self._search((corners[move], edges_a[move], edges_b[move]), depth + 1, bound, MOVE_FACE[move], path): return True
+			path.pop()
+		return False
+
+	def solve(self, cube, max_depth=20):
+		"""shortest sequence of face turns solving given cube.
+
+		Args:
+			cube (Cube): cube to be solved (not changed)
+			max_depth (int, optional): longest solution to search for. Defaults to 20.
+
+		Raises:
+			ValueError: if cube is not a legal state, see `validate.validate`
+
+		Returns:
+			Algorithm: solution, None if there is no solution within max_depth
+		"""
+		validate(cube)
+		node = self.coordinates(cube)
+		bound = self.heuristic(node)
+		while bound <= max_depth:
+			path = []
+			if bound == 0 or self._search(node, 0, bound, len(ALLOWED) - 1, path):
+				return Algorithm([MOVES[move] for move in path])
+			bound += 1
+		return None
+
+
+_solvers = {}
+
+def solve(cube, max_depth=20, directory=None):
+	"""optimal (shortest) solution of a cube, with IDA* search over pattern databases.
+
+	Args:
+		cube (Cube): cube to be solved (not changed)
+		max_depth (int, optional): longest solution to search for. Defaults to 20.
+		directory (str, optional): table cache folder. Defaults to tables.table_directory().
+
+	Returns:
+		Algorithm: solution, None if there is no solution within max_depth
+	"""
+	if directory not in _solvers: _solvers[directory] = Solver(directory)
+	return _solvers[directory].solve(cube, max_depth)
@@ -0,0 +1,142 @@
+"""Compact facelet state of a cube.
+
+A cube state is held as 54 facelets (9 per face, faces in `FACES` order) in a single contiguous
+``uint8`` array of color codes. Color names are kept once per cube in a palette (tuple) and a code
+is the index of a color in that palette. Palette starts with colors of the six centers, so a solved
+cube in its home orientation is always ``[0]*9 + [1]*9 + ... + [5]*9``.
+
+Facelets of a face are laid out row by row exactly as `Cube.show` returns them::
+
+	front  : rows bottom to top, columns left to right, looking at front
+	left   : rows bottom to top, columns left to right, looking at left (front on right side)
+	right  : rows bottom to top, columns left to right, looking at right (front on left side)
+	top    : rows front to back, columns left to right, looking at top
+	bottom : rows back to front, columns left to right, looking at bottom
+	back   : rows top to bottom, columns left to right, (back = top + top)
+"""
+import numpy as np
+
+# ---------------
+
+FACES = ('front', 'back', 'top', 'bottom', 'left', 'right')
+FACELETS = 54
+DEFAULT_COLORS = ('Red', 'Orange', 'Green', 'Blue', 'Yellow', 'White')
+
+# outward direction of each face
+FACE_NORMAL = {
+	'front': 	(0, 0, -1),
+	'back': 	(0, 0, 1),
+	'top': 		(0, 1, 0),
+	'bottom': 	(0, -1, 0),
+	'left': 	(-1, 0, 0),
+	'right': 	(1, 0, 0),
+}
+# (row, column) of a face  ->  (x, y, z) co-ordinates of Point carrying that facelet
+_LAYOUT = {
+	'front': 	lambda r, c: (c-1, r-1, -1),
+	'back': 	lambda r, c: (c-1, 1-r, 1),
+	'top': 		lambda r, c: (c-1, 1, r-1),
+	'bottom': 	lambda r, c: (c-1, -1, 1-r),
+	'left': 	lambda r, c: (-1, r-1, 1-c),
+	'right': 	lambda r, c: (1, r-1, c-1),
+}
+# ---------------
+
+def _geometry():
+	"""co-ordinates and outward direction of all 54 facelets.
+
+	Returns:
+		tuple: (positions, normals) two int8 arrays of shape (54, 3)
+	"""
+	positions, normals = [], []
+	for face in FACES:
+		for r in range(3):
+			for c in range(3):
+				positions.append(_LAYOUT[face](r, c))
+				normals.append(FACE_NORMAL[face])
+	return np.array(positions, dtype=np.int8), np.array(normals, dtype=np.int8)
+
+POSITIONS, NORMALS = _geometry()
+
+
+def _key(positions, normals):
+	"""unique integer for each (position, normal) pair of given facelets.
+	"""
+	p = (positions.astype(np.int16) + 1) @ (9, 3, 1)
+	n = (normals.astype(np.int16) + 1) @ (9, 3, 1)
+	return p * 27 + n
+
+_FACELET_AT = np.full(27*27, -1, dtype=np.int16)
+_FACELET_AT[_key(POSITIONS, NORMALS)] = np.arange(FACELETS)
+
+def facelet_at(positions, normals):
+	"""facelet indexes for given co-ordinates and outward directions.
+
+	Args:
+		positions (ndarray): (n, 3) co-ordinates of Points
+		normals (ndarray): (n, 3) outward directions
+
+	Returns:
+		ndarray: (n,) facelet indexes, -1 where there is no such facelet
+	"""
+	return _FACELET_AT[_key(np.asarray(positions), np.asarray(normals))]
+
+
+def _point_facelets():
+	"""facelet index for each Point (z, y, x index) and axis (x, y, z), -1 where the Point has no
+	facelet along that axis.
+	"""
+	table = np.full((3, 3, 3, 3), -1, dtype=np.int16)
+	for f, (position, normal) in enumerate(zip(POSITIONS, NORMALS)):
+		x, y, z = position
+		table[z+1, y+1, x+1, np.flatnonzero(normal)[0]] = f
+	return table
+
+POINT_FACELETS = _point_facelets()
+
+# ---------------
+
+def face_index(view):
+	"""position of a face (view) in `FACES`.
+	"""
+	return FACES.index(view)
+
+def solved_state():
+	"""facelets of a solved cube in home orientation.
+
+	Returns:
+		ndarray: uint8 array of 54 color codes
+	"""
+	return np.repeat(np.arange(len(FACES), dtype=np.uint8), 9)
+
+def encode(colors, palette=()):
+	"""convert 54 facelet colors to compact state.
+
+	Args:
+		colors (iterable): 54 color names in facelet order
+		palette (tuple, optional): colors to keep at start of palette. Defaults to colors of centers.
+
+	Returns:
+		tuple: (state, palette) uint8 array of color codes and tuple of color names
+	"""
+	colors = list(colors)
+	if len(colors) != FACELETS:
+		raise ValueError(f"cube needs {FACELETS} facelets, got {len(colors)}")
+	palette = list(dict.fromkeys(palette or colors[4::9]))
+	for color in colors:
+		if color not in palette: palette.append(color)
+	codes = {color: i for i, color in enumerate(palette)}
+	state = np.fromiter((codes[color] for color in colors), dtype=np.uint8, count=FACELETS)
+	return state, tuple(palette)
+
+def decode(state, palette):
+	"""convert color codes back to color names.
+
+	Args:
+		state (ndarray): color codes, any shape
+		palette (tuple): color names
+
+	Returns:
+		ndarray: color names in same shape as state
+	"""
+	return np.array(palette, dtype=object)[state]
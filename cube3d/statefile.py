@@ -0,0 +1,283 @@
+"""Compact binary files of cube states, read by memory mapping.
+
+A file is a header and fixed size records, one per cube. A record is 21 bytes of cubies (see `cubie`)::
+
+	corners      8 x uint8   piece * 3 + twist  of each corner slot
+	edges       12 x uint8   piece * 2 + flip   of each edge slot
+	orientation      uint8   whole cube orientation, index in ORIENTATION_FACES (0 for home orientation)
+
+Header holds a magic string, format version, record size, number of records and the six center colors
+(palette of all cubes in file), and is padded to 64 bytes so that records are aligned::
+
+	with StateWriter('cubes.c3d') as writer:
+		writer.write(cubes)                         # Cube, CubeBatch or (N, 54) states, any number of times
+	states = StateFile('cubes.c3d')
+	states.records                                  # (N,) memory-mapped array of dtype RECORD
+	solved = states.records[states.is_solved()]
+	batch = states[1000:2000]                        # CubeBatch
+
+Nothing is read from disk until records are used, and then only pages of records used. Filters work on
+records directly, a chunk at a time, so files larger than memory can be scanned.
+"""
+import os
+import json
+import struct
+import numpy as np
+
+from .base import Cube, DEFAULT_COLORS, ORIENTATION_FACES
+from .batch import CubeBatch
+from .cubie import to_cubies, from_cubies, _orientation_of
+
+# ---------------
+
+MAGIC = b'CUBE3D\x1a\n'
+VERSION = 1
+RECORD = np.dtype([('corners', np.uint8, (8,)), ('edges', np.uint8, (12,)), ('orientation', np.uint8)])
+CHUNK = 1 << 20
+_HEADER = struct.Struct('<8sHHQH')		# magic, version, record size, count, palette length
+_ALIGN = 64
+_SOLVED_CORNERS = np.arange(8, dtype=np.uint8) * 3
+_SOLVED_EDGES = np.arange(12, dtype=np.uint8) * 2
+
+def pack(states):
+	"""records of facelet states.
+
+	Args:
+		states (ndarray): (N, 54) facelet color codes, center codes being 0-5
+
+	Raises:
+		ValueError: if a state is not a set of real pieces (see `validate`), or its center codes are not 0-5
+
+	Returns:
+		ndarray: (N,) records of dtype RECORD
+	"""
+	states = np.asarray(states).reshape(-1, 54)
+	cp, co, ep, eo = to_cubies(states)
+	orientation = _orientation_of(states)
+	if (orientation < 0).any(): raise ValueError("cube has center codes which are not 0-5, can not be packed")
+	records = np.empty(len(states), dtype=RECORD)
+	records['corners'], records['edges'], records['orientation'] = cp * 3 + co, ep * 2 + eo, orientation
+	return records
+
+def unpack(records):
+	"""facelet states of records, inverse of `pack`.
+
+	Args:
+		records (ndarray): records of dtype RECORD
+
+	Returns:
+		ndarray: (N, 54) uint8 facelet color codes
+	"""
+	corners, edges = records['corners'].astype(np.intp), records['edges'].astype(np.intp)
+	state = from_cubies(corners // 3, corners % 3, edges // 2, edges % 2).astype(np.intp)
+	return np.take_along_axis(ORIENTATION_FACES[records['orientation']], state, axis=-1).astype(np.uint8)
+
+def _header(colors, count):
+	palette = json.dumps(list(colors)).encode()
+	size = -(-(_HEADER.size + len(palette)) // _ALIGN) * _ALIGN
+	return (_HEADER.pack(MAGIC, VERSION, RECORD.itemsize, count, len(palette)) + palette).ljust(size, b'\0')
+
+def read_header(file):
+	"""header of a state file.
+
+	Args:
+		file (file): open binary file, at its start
+
+	Raises:
+		ValueError: if file is not a state file, or of a newer version
+
+	Returns:
+		dict: version, record_size, count, colors and offset (of first record)
+	"""
+	fixed = file.read(_HEADER.size)
+	if len(fixed) < _HEADER.size or fixed[:len(MAGIC)] != MAGIC: raise ValueError("not a cube3d state file")
+	magic, version, record_size, count, length = _HEADER.unpack(fixed)
+	if version > VERSION: raise ValueError(f"state file version {version} is newer than supported version {VERSION}")
+	if record_size != RECORD.itemsize: raise ValueError(f"state file records are {record_size} bytes, expected {RECORD.itemsize}")
+	colors = tuple(json.loads(file.read(length).decode()))
+	offset = -(-(_HEADER.size + length) // _ALIGN) * _ALIGN
+	return {'version': version, 'record_size': record_size, 'count': count, 'colors': colors, 'offset': offset}
+
+# ---------------
+
+class StateWriter():
+	"""writes cubes to a state file, a batch at a time. count in header is set on `close` (left 0 in a
+	stream which can not seek, such as a pipe, readers count records from file size then).
+
+	A file given by name is written under a temporary name next to it, and takes its name only on `close`,
+	so a failed write (a cube which can not be packed, a full disk) leaves no partial file behind, nor
+	replaces an existing one; used as a context manager, an exception calls `abort` instead of `close`.
+	"""
+
+	def __init__(self, path, colors=None):
+		"""Initialize StateWriter, creating (or, on close, replacing) file.
+
+		Args:
+			path (str, file): file name, or open binary file (left open on close)
+			colors (tuple, optional): six center colors, in code order. Defaults to those of first cube written
+				(DEFAULT_COLORS for states).
+		"""
+		self.own = isinstance(path, (str, bytes, os.PathLike))
+		if self.own:
+			self.path = os.fsdecode(path)
+			self.temporary = f"{self.path}.{os.getpid()}.tmp"
+		self.file = open(self.temporary, 'xb') if self.own else path
+		self.start = self.file.tell() if not self.own and self.file.seekable() else 0
+		self.colors = None if colors is None else tuple(colors)
+		self.count = 0
+		if self.colors is not None: self.file.write(_header(self.colors, 0))
+
+	def __enter__(self): return self
+	def __exit__(self, kind, value, traceback):
+		if kind is None: self.close()
+		else: self.abort()
+
+	def _codes(self, states, colors):
+		"""states with color codes of file palette.
+		"""
+		if self.colors is None:
+			self.colors = tuple(colors[:6])
+			self.file.write(_header(self.colors, 0))
+		if tuple(colors[:6]) == self.colors: return states
+		missing = [color for color in colors if color not in self.colors]
+		if missing: raise ValueError(f"colors {missing} are not center colors of file {self.colors}")
+		return np.array([self.colors.index(color) for color in colors], dtype=np.uint8)[states]
+
+	def write(self, cubes):
+		"""write cubes.
+
+		Args:
+			cubes (Cube, CubeBatch, ndarray): cube(s), or (N, 54) facelet color codes (of file colors)
+
+		Raises:
+			ValueError: if a cube can not be packed, see `pack`
+		"""
+		if isinstance(cubes, (Cube, CubeBatch)):
+			states = cubes.state[None] if isinstance(cubes, Cube) else cubes.states
+			states = self._codes(states, cubes.colors)
+		else:
+			states = np.asarray(cubes).reshape(-1, 54)
+			if self.colors is None: self._codes(states, DEFAULT_COLORS)
+		records = pack(states)
+		self.file.write(records.tobytes())
+		self.count += len(records)
+
+	def close(self):
+		if self.file.closed: return
+		if self.colors is None:
+			self.colors = DEFAULT_COLORS
+			self.file.write(_header(self.colors, 0))
+		if self.file.seekable():
+			end = self.file.seek(0, os.SEEK_END)
+			self.file.seek(self.start)
+			self.file.write(_header(self.colors, self.count))
+			self.file.seek(end)
+		if self.own:
+			self.file.close()
+			os.replace(self.temporary, self.path)
+		else:
+			self.file.flush()
+
+	def abort(self):
+		"""stop writing after a failure: a file given by name is removed (an existing file of that name is
+		left as it was), an open file given is closed as by `close`, keeping records written so far.
+		"""
+		if not self.own: return self.close()
+		if self.file.closed: return
+		self.file.close()
+		os.remove(self.temporary)
+
+
+def write_states(path, cubes, colors=None):
+	"""write cubes to a new state file. file is written completely, or not at all (see `StateWriter`).
+
+	Args:
+		path (str): file name
+		cubes (Cube, CubeBatch, ndarray, iterable): cubes, states, or an iterable of any of them
+		colors (tuple, optional): six center colors, in code order. Defaults to those of first cube.
+
+	Raises:
+		ValueError: if a cube can not be packed, see `pack`
+
+	Returns:
+		int: number of cubes written
+	"""
+	with StateWriter(path, colors) as writer:
+		if isinstance(cubes, (Cube, CubeBatch, np.ndarray)): cubes = [cubes]
+		for item in cubes: writer.write(item)
+	return writer.count
+
+
+class StateFile():
+	"""a state file, memory mapped. records are read from disk only when used.
+	"""
+
+	def __init__(self, path, mode='r'):
+		"""Initialize StateFile.
+
+		Args:
+			path (str): file name
+			mode (str, optional): numpy.memmap mode, 'r' read only or 'r+' to change records in place. Defaults to 'r'.
+
+		Raises:
+			ValueError: if file is not a state file
+		"""
+		with open(path, 'rb') as f:
+			self.header = read_header(f)
+			f.seek(0, 2)
+			size = f.tell()
+		self.colors = self.header['colors']
+		# a file whose writer did not finish has count 0, records are counted from its size then
+		count = self.header['count'] or (size - self.header['offset']) // RECORD.itemsize
+		self.records = np.memmap(path, dtype=RECORD, mode=mode, offset=self.header['offset'], shape=(count,)) if count else np.empty(0, dtype=RECORD)
+
+	def __len__(self): return len(self.records)
+
+	def __getitem__(self, i):
+		"""Cube for an index, CubeBatch for a slice, index array or boolean mask.
+		"""
+		if isinstance(i, (int, np.integer)): return Cube(state=unpack(self.records[i]), colors=self.colors)
+		return CubeBatch(unpack(self.records[i]), self.colors)
+
+	def states(self, start=0, stop=None):
+		"""facelet states of a range of records.
+
+		Returns:
+			ndarray: (n, 54) uint8 facelet color codes
+		"""
+		return unpack(self.records[start:stop])
+
+	def where(self, predicate, chunk=CHUNK):
+		"""indexes of records for which predicate is True, records being read a chunk at a time.
+
+		Args:
+			predicate (callable): function of a chunk of records, returning a boolean array
+			chunk (int, optional): records read at once. Defaults to CHUNK.
+
+		Returns:
+			ndarray: indexes of matching records
+		"""
+		found = [np.flatnonzero(predicate(self.records[start:start+chunk])) + start for start in range(0, len(self), chunk)]
+		return np.concatenate(found) if found else np.empty(0, dtype=np.intp)
+
+	def is_solved(self, chunk=CHUNK):
+		"""solved flag of every record, read a chunk at a time.
+
+		Returns:
+			ndarray: (N,) bool
+		"""
+		solved = np.zeros(len(self), dtype=bool)
+		solved[self.where(is_solved, chunk)] = True
+		return solved
+
+
+def is_solved(records):
+	"""solved flags of records (every piece home and unturned, in any whole cube orientation).
+
+	Args:
+		records (ndarray): records of dtype RECORD
+
+	Returns:
+		ndarray: bool array
+	"""
+	return (records['corners'] == _SOLVED_CORNERS).all(axis=-1) & (records['edges'] == _SOLVED_EDGES).all(axis=-1)
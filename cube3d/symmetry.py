@@ -0,0 +1,105 @@
+"""Symmetries of the cube: 24 whole cube rotations, each with or without a mirror reflection (48).
+
+A symmetry moves facelets (a permutation in `SYMMETRIES`) and then colors are renamed after the centers
+now on each face, so a symmetric state is the same cube seen from another side (or in a mirror). States
+related this way are solved by symmetric move sequences and are equally hard, one representative (the
+lexicographically smallest) stands for the whole class::
+
+	canonicalize(cube) == canonicalize(cube.change_to('left'))      # True
+
+Representatives have home color codes (code of a facelet = face of its center color), so they compare
+and hash by state alone.
+"""
+import numpy as np
+
+from .base import Cube, FACELETS, ORIENTATION_TABLE
+from .state import POSITIONS, NORMALS, facelet_at
+from .cubie import face_labels
+
+# ---------------
+
+# left-right mirror image (x -> -x)
+MIRROR = facelet_at(POSITIONS * (-1, 1, 1), NORMALS * (-1, 1, 1)).astype(np.intp)
+
+def _symmetries():
+	"""facelet permutations of all 48 symmetries, 0-23 rotations (as ORIENTATION_TABLE), 24-47 same
+	rotations followed by mirror.
+	"""
+	return np.concatenate([ORIENTATION_TABLE, ORIENTATION_TABLE[:, MIRROR]])
+
+SYMMETRIES = _symmetries()
+_SYMMETRY_INDEX = {perm.tobytes(): i for i, perm in enumerate(SYMMETRIES)}
+# symmetry undoing each symmetry
+SYMMETRY_INVERSE = np.array([_SYMMETRY_INDEX[np.argsort(perm).tobytes()] for perm in SYMMETRIES], dtype=np.intp)
+# new name (face now holding that center) of each home color code, for every symmetry
+RELABEL = np.argsort(SYMMETRIES[:, 4::9] // 9, axis=1).astype(np.uint8)
+
+# ---------------
+
+def apply_symmetry(state, symmetry):
+	"""symmetric state(s), in home color codes.
+
+	Args:
+		state (ndarray): (54,) or (N, 54) facelet color codes
+		symmetry (int, ndarray): index in SYMMETRIES, or (N,) indexes (one per state)
+
+	Raises:
+		ValueError: if a facelet color is not the color of any center
+
+	Returns:
+		ndarray: same shape as state
+	"""
+	labels, symmetry = face_labels(state), np.asarray(symmetry)
+	if not symmetry.ndim: return RELABEL[symmetry][labels[..., SYMMETRIES[symmetry]]]
+	moved = np.take_along_axis(labels, SYMMETRIES[symmetry], axis=-1)
+	return np.take_along_axis(RELABEL[symmetry], moved.astype(np.intp), axis=-1)
+
+def canonical_state(state):
+	"""class representative of state(s) among all 48 symmetric states, and symmetry giving it.
+
+	Args:
+		state (ndarray): (54,) or (N, 54) facelet color codes
+
+	Raises:
+		ValueError: if a facelet color is not the color of any center
+
+	Returns:
+		tuple: representative(s) (same shape as state, home color codes) and symmetry index(es), so that
+			``apply_symmetry(state, symmetry)`` is the representative
+	"""
+	labels = face_labels(state)
+	candidates = RELABEL[np.arange(len(SYMMETRIES))[:, None], labels[..., SYMMETRIES]]
+	# lexicographic minimum: keep candidates smallest in every facelet so far
+	active = np.ones(candidates.shape[:-1], dtype=bool)
+	for f in range(FACELETS):
+		column = np.where(active, candidates[..., f], np.iinfo(candidates.dtype).max)
+		active &= column == column.min(axis=-1, keepdims=True)
+	symmetry = active.argmax(axis=-1)
+	representative = np.take_along_axis(candidates, symmetry[..., None, None], axis=-2)[..., 0, :]
+	return representative, symmetry
+
+def canonicalize(cube):
+	"""representative of symmetry class of a cube.
+
+	Args:
+		cube (Cube): cube (not changed)
+
+	Raises:
+		ValueError: if a facelet color is not the color of any center
+
+	Returns:
+		Cube: representative, center colors in palette order are given to faces in FACES order
+	"""
+	state, symmetry = canonical_state(cube.state)
+	return Cube(state=state, colors=[cube.colors[code] for code in sorted(cube.state[4::9])])
+
+def symmetry_class(cube):
+	"""all distinct symmetric states of a cube (1 to 48).
+
+	Args:
+		cube (Cube): cube
+
+	Returns:
+		ndarray: (n, 54) states in home color codes
+	"""
+	return np.unique(apply_symmetry(np.tile(cube.state, (len(SYMMETRIES), 1)), np.arange(len(SYMMETRIES))), axis=0)
@@ -0,0 +1,330 @@
+"""Precomputed tables (move tables, pruning tables / pattern databases) and their on-disk cache.
+
+Tables are stored as ``.npy`` files in `table_directory()` and loaded memory-mapped, so that many
+processes using same tables share their pages instead of each holding a copy. Pruning tables hold a
+distance (0..14) per state packed as 4-bit nibbles, two states per byte; 15 means not reached.
+
+Pruning tables are generated by breadth first search, one layer (depth) at a time. A layer is split in
+ranges of states which can be expanded by a pool of worker processes sharing the nibble table in
+shared memory. Generation can be checkpointed and resumed part way through a layer. Generate all tables
+of the solvers ahead of time with::
+
+	python -m cube3d.tables --workers 32
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+# ---------------
+
+UNKNOWN = 15
+CHUNK = 1 << 20
+
+def table_directory():
+	"""folder of cached tables. `CUBE3D_TABLES` environment variable, else ~/.cache/cube3d
+
+	Returns:
+		str: folder path
+	"""
+	return os.environ.get('CUBE3D_TABLES') or os.path.join(os.path.expanduser('~'), '.cache', 'cube3d')
+
+def table_path(name, directory=None):
+	"""file path of a cached table.
+	"""
+	return os.path.join(directory or table_directory(), name + '.npy')
+
+def _save(path, table):
+	"""write a table atomically (readers never see a partly written file).
+	"""
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	temporary = f"{path}.{os.getpid()}.tmp"
+	with open(temporary, 'wb') as f:
+		np.save(f, table)
+	os.replace(temporary, path)
+
+def cached(name, build, directory=None):
+	"""load a table from cache, building and saving it first if not there.
+
+	Args:
+		name (str): table name (file name without extension)
+		build (callable): function returning the table (ndarray) when not cached
+		directory (str, optional): cache folder. Defaults to table_directory().
+
+	Returns:
+		ndarray: read-only memory-mapped table
+	"""
+	path = table_path(name, directory)
+	if not os.path.exists(path):
+		_save(path, build())
+	return np.load(path, mmap_mode='r')
+
+# ---------------
+
+def pack(depths):
+	"""pack distances (0..15) as nibbles, two per byte.
+
+	Args:
+		depths (ndarray): uint8 distances
+
+	Returns:
+		ndarray: uint8 packed table of half size (rounded up)
+	"""
+	depths = np.asarray(depths, dtype=np.uint8)
+	if len(depths) % 2: depths = np.append(depths, UNKNOWN).astype(np.uint8)
+	return depths[0::2] | (depths[1::2] << 4)
+
+def unpack(packed, size=None):
+	"""inverse of `pack`.
+	"""
+	depths = np.empty(len(packed) * 2, dtype=np.uint8)
+	depths[0::2], depths[1::2] = packed & 15, packed >> 4
+	return depths[:size]
+
+def lookup(packed, index):
+	"""distances of given states from a packed table.
+
+	Args:
+		packed (ndarray): packed table
+		index (int, ndarray): state indexes
+
+	Returns:
+		int, ndarray: distances
+	"""
+	return (packed[index >> 1] >> ((index & 1) << 2)) & 15
+
+def store(packed, index, depth):
+	"""set distance of given states in a packed table, in place.
+
+	Args:
+		packed (ndarray): packed table
+		index (ndarray): state indexes
+		depth (int): distance
+	"""
+	even, odd = index[index & 1 == 0] >> 1, index[index & 1 == 1] >> 1
+	packed[even] = (packed[even] & 0xF0) | depth
+	packed[odd] = (packed[odd] & 0x0F) | (depth << 4)
+
+# ---------------
+
+class CoordinateNeighbours():
+	"""Neighbours of states indexed by a pair of coordinates, ``first * second_size + second``, from cached
+	move tables of both coordinates. The second coordinate is moved by its own table, or (xor=True) xor-ed
+	with a mask given by its table for the first coordinate.
+
+	Holds only table names, so it is cheap to send to worker processes, each loads tables memory-mapped.
+	"""
+
+	def __init__(self, first, second, second_size, directory=None, xor=False, columns=None):
+		"""Initialize from names of cached move tables.
+
+		Args:
+			first (str): move table of first coordinate
+			second (str): move table (or xor mask table) of second coordinate
+			second_size (int): number of values of second coordinate
+			directory (str, optional): table cache folder. Defaults to table_directory().
+			xor (bool, optional): second table is xor mask indexed by first coordinate. Defaults to False.
+			columns (list, optional): moves (columns) of first table to use. Defaults to all.
+		"""
+		self.first, self.second, self.second_size = first, second, second_size
+		self.directory, self.xor, self.columns = directory, xor, columns
+		self._tables = None
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['_tables'] = None
+		return state
+
+	@property
+	def tables(self):
+		"""(first, second) move tables, loaded on first use.
+		"""
+		if self._tables is None:
+			first = np.load(table_path(self.first, self.directory), mmap_mode='r')
+			if self.columns is not None: first = np.ascontiguousarray(first[:, self.columns])
+			self._tables = first, np.load(table_path(self.second, self.directory), mmap_mode='r')
+		return self._tables
+
+	def __call__(self, index):
+		"""neighbour states.
+
+		Args:
+			index (ndarray): n state indexes
+
+		Returns:
+			ndarray: (n, moves) neighbour state indexes
+		"""
+		first, second = self.tables
+		a, b = np.divmod(np.asarray(index, dtype=np.int64), self.second_size)
+		moved = first[a].astype(np.int64) * self.second_size
+		if self.xor: return moved + (second[a] ^ b[:, None].astype(second.dtype))
+		return moved + second[b]
+
+# ---------------
+
+def _expand(packed, neighbours, low, high, depth, forward):
+	"""expand states of a range in one layer of breadth first search.
+
+	forward : states of range at `depth` are expanded, their unreached neighbours are returned (not stored).
+	backward: unreached states of range with a neighbour at `depth` are stored at depth + 1, only bytes
+	of this range are written (ranges start at even states), so ranges can be expanded concurrently.
+
+	Returns:
+		ndarray, int: neighbours found (forward) or number of states stored (backward)
+	"""
+	depths = unpack(packed[low >> 1:(high + 1) >> 1], high - low)
+	if forward:
+		states = low + np.flatnonzero(depths == depth)
+		found = neighbours(states).ravel()
+		return np.unique(found[lookup(packed, found) == UNKNOWN])
+	states = low + np.flatnonzero(depths == UNKNOWN)
+	found = states[(lookup(packed, neighbours(states)) == depth).any(axis=1)]
+	store(packed, found, depth + 1)
+	return len(found)
+
+_worker = {}
+
+def _attach(name, size, neighbours):
+	"""pool initializer, attaches worker to shared nibble table.
+	"""
+	memory = shared_memory.SharedMemory(name=name)
+	_worker.update(memory=memory, packed=np.ndarray((size,), dtype=np.uint8, buffer=memory.buf), neighbours=neighbours)
+
+def _worker_expand(low, high, depth, forward):
+	return _expand(_worker['packed'], _worker['neighbours'], low, high, depth, forward)
+
+
+def breadth_first(size, start, neighbours, workers=1, checkpoint=None, progress=None, chunk=CHUNK):
+	"""distance of every state from start state(s), by breadth first search over all states.
+	Layers are expanded forward while they are small, and backward (checking unreached states
+	for a neighbour in last layer) once most states are reached. Moves must be closed under inverse.
+
+	Args:
+		size (int): number of states
+		start (int, list): index of start state(s)
+		neighbours (callable): maps an array of n state indexes to (n, moves) neighbour indexes, must be
+			picklable when workers > 1 (ex: CoordinateNeighbours)
+		workers (int, optional): processes expanding each layer, 1 expands in this process. Defaults to 1.
+		checkpoint (str, optional): path prefix to save progress to and resume from. Defaults to None.
+		progress (callable, optional): called as progress(depth, states, seconds) after each layer. Defaults to None.
+		chunk (int, optional): states in one range of a layer (even). Defaults to CHUNK.
+
+	Returns:
+		ndarray: packed table of distances, UNKNOWN beyond depth 14
+	"""
+	nbytes = (size + 1) // 2
+	memory = shared_memory.SharedMemory(create=True, size=nbytes) if workers > 1 else None
+	packed = np.ndarray((nbytes,), dtype=np.uint8, buffer=memory.buf) if memory else np.empty(nbytes, dtype=np.uint8)
+	try:
+		status = _resume(checkpoint, packed)
+		if status is None:
+			packed[:] = 0xFF
+			store(packed, np.atleast_1d(start), 0)
+			status = {'depth': 0, 'reached': int(np.size(start)), 'layer': int(np.size(start)), 'forward': None, 'done': [], 'found': 0}
+		ranges = [(low, min(low + chunk, size)) for low in range(0, size, chunk)]
+		executor = ProcessPoolExecutor(workers, initializer=_attach, initargs=(memory.name, nbytes, neighbours)) if memory else None
+		try:
+			_layers(packed, neighbours, ranges, status, executor, checkpoint, progress)
+		finally:
+			if executor: executor.shutdown()
+		table = packed.copy()
+	finally:
+		if memory:
+			memory.close()
+			memory.unlink()
+	_clear(checkpoint)
+	return table
+
+def _layers(packed, neighbours, ranges, status, executor, checkpoint, progress):
+	"""run breadth first search layer by layer, from (possibly resumed) status.
+	"""
+	size = ranges[-1][1]
+	saved = time.monotonic()
+	while status['layer'] and status['depth'] < UNKNOWN - 1:
+		started, depth = time.monotonic(), status['depth']
+		if status['forward'] is None:
+			status['forward'] = status['layer'] < size - status['reached']
+		forward = status['forward']
+		pending = [i for i in range(len(ranges)) if i not in set(status['done'])]
+		if executor:
+			futures = {executor.submit(_worker_expand, *ranges[i], depth, forward): i for i in pending}
+			results = ((futures[future], future.result()) for future in as_completed(futures))
+		else:
+			results = ((i, _expand(packed, neighbours, *ranges[i], depth, forward)) for i in pending)
+		for i, result in results:
+			if forward:
+				result = result[lookup(packed, result) == UNKNOWN]
+				store(packed, result, depth + 1)
+				result = len(result)
+			status['found'] += int(result)
+			status['done'].append(i)
+			if checkpoint and time.monotonic() - saved > 60:
+				_save_checkpoint(checkpoint, packed, status)
+				saved = time.monotonic()
+		status.update(depth=depth + 1, layer=status['found'], reached=status['reached'] + status['found'], forward=None, done=[], found=0)
+		if checkpoint: _save_checkpoint(checkpoint, packed, status)
+		if progress: progress(depth + 1, status['layer'], time.monotonic() - started)
+
+def _save_checkpoint(checkpoint, packed, status):
+	_save(checkpoint + '.partial.npy', packed)
+	with open(checkpoint + '.partial.json', 'w') as f:
+		json.dump(status, f)
+
+def _resume(checkpoint, packed):
+	"""load checkpointed table into packed, returns saved status or None.
+	"""
+	if not checkpoint or not os.path.exists(checkpoint + '.partial.json'): return None
+	with open(checkpoint + '.partial.json') as f:
+		status = json.load(f)
+	packed[:] = np.load(checkpoint + '.partial.npy')
+	return status
+
+def _clear(checkpoint):
+	for suffix in ('.partial.npy', '.partial.json'):
+		if checkpoint and os.path.exists(checkpoint + suffix): os.remove(checkpoint + suffix)
+
+def pruning_table(name, size, start, neighbours, directory=None, workers=1, progress=None):
+	"""load a pruning table from cache, generating (resumable) and saving it first if not there.
+
+	Args:
+		name (str): table name
+		size (int): number of states
+		start (int): index of solved state
+		neighbours (callable): neighbour states function (see `breadth_first`)
+		directory (str, optional): cache folder. Defaults to table_directory().
+		workers (int, optional): processes generating the table. Defaults to 1.
+		progress (callable, optional): progress(depth, states, seconds) after each layer. Defaults to None.
+
+	Returns:
+		ndarray: read-only memory-mapped packed table
+	"""
+	path = table_path(name, directory)
+	if not os.path.exists(path):
+		checkpoint = path[:-len('.npy')]
+		_save(path, breadth_first(size, start, neighbours, workers, checkpoint, progress))
+	return np.load(path, mmap_mode='r')
+
+# ---------------
+
+def main(args=None):
+	"""generate all tables of the solvers, command line entry point.
+	"""
+	from .solver import pruning_tables as solver_tables
+	from .twophase import pruning_tables as twophase_tables
+
+	parser = argparse.ArgumentParser(prog='python -m cube3d.tables', description='generate cube3d solver tables')
+	parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes per table (default: all cores)')
+	parser.add_argument('--directory', default=None, help=f'table folder (default: {table_directory()})')
+	options = parser.parse_args(args)
+
+	for tables in (twophase_tables, solver_tables):
+		for name, size, start, neighbours in tables(options.directory):
+			print(f"{name}: {size:,} states", flush=True)
+			report = lambda depth, states, seconds: print(f"  depth {depth:2}: {states:>12,} states  {seconds:8.1f}s", flush=True)
+			pruning_table(name, size, start, neighbours, options.directory, options.workers, report)
+
+if __name__ == '__main__':
+	main()
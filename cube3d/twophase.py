@@ -0,0 +1,342 @@
+"""Two-phase (Kociemba) solver. Fast, near-optimal solutions.
+
+	* phase 1 : bring cube to subgroup G1 = <U, D, R2, L2, F2, B2>, i.e. all corners untwisted, all edges
+	  unflipped and the four middle-layer edges in middle layer. Coordinates: twist (2187), flip (2048),
+	  slice (495 positions of middle-layer edges).
+	* phase 2 : solve within G1 using only its 10 moves. Coordinates: corner permutation (40320), permutation
+	  of the 8 top/bottom edges (40320), permutation of the 4 middle-layer edges (24).
+
+Each phase is an IDA* search over coordinate move tables, guided by pruning tables (three for phase 1, two
+for phase 2). Tables (about 10 MB) are generated on first use and cached in `tables.table_directory()`.
+Search goes on with longer phase 1 solutions to find shorter total solutions, until a length or time budget
+is met.
+
+Search expands up to CHUNK nodes of a level of the IDA* tree at a time, as NumPy lookups over arrays of
+coordinates (same nodes as the depth first search, without a Python call per node). Chunks are taken depth
+first, so memory stays bounded and the time budget is checked between chunks. Phase 2 starts from a chunk
+of phase 1 solutions at once, is expanded until BALL moves are left and is finished by lookup among
+phase 2 states near solved. It is tried up to PHASE2_DEPTH moves, a longer phase 2 is left to longer
+phase 1 solutions.
+
+This is a pure Python/NumPy solver: it finds a first solution (about 21 moves) in some 15-20 ms, i.e. tens
+of solves per second on one core. Higher rates need more processes (as `cube3d serve` does with its
+worker pool); hundreds of solves per second on a core would need compiled search and symmetry-reduced
+tables, which are out of scope here.
+"""
+import time
+from itertools import combinations
+import numpy as np
+
+from .base import MOVES
+from .algorithm import Algorithm
+from .cubie import MOVE_CUBIES, to_cubies, rank_permutation, unrank_permutation, rank_orientation, unrank_orientation
+from .solver import TWISTS, CORNER_PERMUTATIONS, MOVE_FACE, ALLOWED, _twist_moves, _corner_permutation_moves
+from .validate import validate
+from .tables import cached, unpack, pruning_table, CoordinateNeighbours
+
+# ---------------
+
+FLIPS = 2 ** 11
+SLICE_EDGES = (8, 9, 10, 11)
+SLICES = tuple(combinations(range(12), len(SLICE_EDGES)))
+SOLVED_SLICE = SLICES.index(SLICE_EDGES)
+EDGE8_PERMUTATIONS, SLICE_PERMUTATIONS = 40320, 24
+PHASE2_MOVES = tuple(MOVES.index(move) for move in ('U', 'U2', "U'", 'D', 'D2', "D'", 'R2', 'L2', 'F2', 'B2'))
+PHASE1_DEPTH = 12		# longest phase 1 searched without a timeout (any cube reaches phase 2 within 12 moves)
+PHASE2_DEPTH = 12		# longest phase 2 tried after a phase 1 solution
+CHUNK = 4096			# nodes expanded at once
+ROOTS = 64			# phase 2 searches started together
+BALL = 6			# phase 2 moves finished by lookup
+# phase 2 move undoing each phase 2 move (U U2 U' D D2 D' R2 L2 F2 B2)
+_PHASE2_INVERSE = np.array([2, 1, 0, 5, 4, 3, 6, 7, 8, 9])
+
+# ---------------
+# coordinate move tables
+
+def _flip_moves():
+	"""flip coordinate after each move, (2048, 18).
+	"""
+	eo = unrank_orientation(np.arange(FLIPS), 2, 12)
+	ep, meo = MOVE_CUBIES[2], MOVE_CUBIES[3]
+	return np.stack([rank_orientation((eo[:, ep[m]] + meo[m]) % 2, 2) for m in range(len(MOVES))], axis=1).astype(np.uint16)
+
+def _slice_moves():
+	"""slice coordinate (which 4 slots hold middle-layer edges) after each move, (495, 18).
+	"""
+	index = {slots: i for i, slots in enumerate(SLICES)}
+	table = np.empty((len(SLICES), len(MOVES)), dtype=np.uint16)
+	for m in range(len(MOVES)):
+		destination = np.argsort(MOVE_CUBIES[2][m])
+		for i, slots in enumerate(SLICES):
+			table[i, m] = index[tuple(sorted(destination[list(slots)]))]
+	return table
+
+def _phase2_edge_moves():
+	"""permutation coordinates of top/bottom edges and of middle-layer edges after each phase 2 move.
+
+	Returns:
+		tuple: (40320, 10) and (24, 10) tables
+	"""
+	ep = MOVE_CUBIES[2][list(PHASE2_MOVES)]
+	edges8 = unrank_permutation(np.arange(EDGE8_PERMUTATIONS), 8)
+	slices = unrank_permutation(np.arange(SLICE_PERMUTATIONS), 4)
+	edge_table = np.stack([rank_permutation(edges8[:, ep[i, :8]]) for i in range(len(PHASE2_MOVES))], axis=1)
+	slice_table = np.stack([rank_permutation(slices[:, ep[i, 8:] - 8]) for i in range(len(PHASE2_MOVES))], axis=1)
+	return edge_table.astype(np.uint16), slice_table.astype(np.uint16)
+
+def _phase2_key(corner, edge, slice_permutation):
+	return (np.asarray(corner, dtype=np.int64) * EDGE8_PERMUTATIONS + edge) * SLICE_PERMUTATIONS + slice_permutation
+
+def _phase2_ball(corner, edge, slice_permutation):
+	"""phase 2 states at most BALL moves from solved, by breadth first search.
+
+	Args:
+		corner, edge, slice_permutation (ndarray): phase 2 move tables of coordinates
+
+	Returns:
+		ndarray: (n, 3) sorted state key, distance, and phase 2 move (column) one step closer to solved
+	"""
+	c, e, s = (np.zeros(1, dtype=np.intp) for _ in range(3))
+	found = [np.array([[0, 0, 0]], dtype=np.int64)]
+	seen = found[0][:, 0]
+	for depth in range(1, BALL + 1):
+		c, e, s = corner[c].ravel(), edge[e].ravel(), slice_permutation[s].ravel()
+		move = np.tile(np.arange(len(PHASE2_MOVES)), len(c) // len(PHASE2_MOVES))
+		keys, first = np.unique(_phase2_key(c, e, s), return_index=True)
+		new = ~np.isin(keys, seen)
+		keys, first = keys[new], first[new]
+		c, e, s = c[first], e[first], s[first]
+		found.append(np.stack([keys, np.full(len(keys), depth), _PHASE2_INVERSE[move[first]]], axis=1))
+		seen = np.concatenate([seen, keys])
+	ball = np.concatenate(found)
+	return ball[np.argsort(ball[:, 0])]
+
+PRUNING_TABLES = ('prune_twist_slice', 'prune_flip_slice', 'prune_twist_flip', 'prune_corner_slice_permutation',
+	'prune_edge_slice_permutation')		# names of pruning_tables(), without building them
+
+def pruning_tables(directory=None):
+	"""pruning tables of both phases, as (name, size, start, neighbours), building their move tables.
+
+	Args:
+		directory (str, optional): table cache folder. Defaults to tables.table_directory().
+
+	Returns:
+		list: arguments of `tables.pruning_table` for each table
+	"""
+	cached('twist_move', _twist_moves, directory)
+	cached('flip_move', _flip_moves, directory)
+	cached('slice_move', _slice_moves, directory)
+	cached('corner_permutation_move', _corner_permutation_moves, directory)
+	cached('phase2_edge_move', lambda: _phase2_edge_moves()[0], directory)
+	cached('phase2_slice_move', lambda: _phase2_edge_moves()[1], directory)
+	slices, phase2 = len(SLICES), list(PHASE2_MOVES)
+	return [
+		('prune_twist_slice', TWISTS * slices, SOLVED_SLICE, CoordinateNeighbours('twist_move', 'slice_move', slices, directory)),
+		('prune_flip_slice', FLIPS * slices, SOLVED_SLICE, CoordinateNeighbours('flip_move', 'slice_move', slices, directory)),
+		('prune_twist_flip', TWISTS * FLIPS, 0, CoordinateNeighbours('twist_move', 'flip_move', FLIPS, directory)),
+		('prune_corner_slice_permutation', CORNER_PERMUTATIONS * SLICE_PERMUTATIONS, 0,
+			CoordinateNeighbours('corner_permutation_move', 'phase2_slice_move', SLICE_PERMUTATIONS, directory, columns=phase2)),
+		('prune_edge_slice_permutation', EDGE8_PERMUTATIONS * SLICE_PERMUTATIONS, 0,
+			CoordinateNeighbours('phase2_edge_move', 'phase2_slice_move', SLICE_PERMUTATIONS, directory)),
+	]
+
+# ---------------
+
+class TwoPhaseSolver():
+	"""Two-phase solver holding coordinate move tables and pruning tables.
+	"""
+
+	def __init__(self, directory=None):
+		"""Initialize solver, loading (or generating on first use) its tables.
+
+		Args:
+			directory (str, optional): table cache folder. Defaults to tables.table_directory().
+		"""
+		prune = {}
+		for name, size, start, neighbours in pruning_tables(directory):
+			packed = pruning_table(name, size, start, neighbours, directory)
+			prune[name[len('prune_'):]] = unpack(np.asarray(packed), size)
+		twist, flip, slice_, corner, edge, slice_permutation = (np.asarray(cached(name, None, directory), dtype=np.int32) for name in
+			('twist_move', 'flip_move', 'slice_move', 'corner_permutation_move', 'phase2_edge_move', 'phase2_slice_move'))
+		self.twist, self.flip, self.slice, self.corner = twist, flip, slice_, corner
+		self.phase2_corner, self.edge, self.slice_permutation = corner[:, list(PHASE2_MOVES)], edge, slice_permutation
+		self.prune = prune
+		self.allowed, self.face = ALLOWED, MOVE_FACE
+		self.phase2_moves = np.array(PHASE2_MOVES)
+		self.phase2_allowed, self.phase2_face = ALLOWED[:, PHASE2_MOVES], MOVE_FACE[list(PHASE2_MOVES)]
+		ball = _phase2_ball(self.phase2_corner, self.edge, self.slice_permutation)
+		self.ball, self.ball_distance, self.ball_move = ball[:, 0], ball[:, 1], ball[:, 2]
+
+	# ---------------
+
+	def solve(self, cube, max_length=None, timeout=None):
+		"""solution of a cube, within given length and/or time budget.
+
+		Args:
+			cube (Cube): cube to be solved (not changed)
+			max_length (int, optional): stop as soon as a solution this short is found. Defaults to None (first solution).
+				without a timeout, phase 1 is searched up to PHASE1_DEPTH moves, and the best solution found is returned.
+			timeout (float, optional): seconds to search for shorter solutions, best one found so far is returned.
+				Defaults to None (no limit).
+
+		Raises:
+			ValueError: if cube is not a legal state, see `validate.validate`
+
+		Returns:
+			Algorithm: solution, None if no solution found within budget
+		"""
+		validate(cube)
+		cp, co, ep, eo = to_cubies(cube.state)
+		self._cubies = (int(rank_permutation(cp)), ep.astype(np.intp))
+		self._target = 0 if max_length is None and timeout is not None else (max_length if max_length is not None else 99)
+		self._deadline = time.monotonic() + timeout if timeout is not None else None
+		self._best, self._done = None, False
+		twist, flip = int(rank_orientation(co, 3)), int(rank_orientation(eo, 2))
+		slice_ = SLICES.index(tuple(np.flatnonzero(ep >= SLICE_EDGES[0])))
+		depth = int(self._phase1_distance(twist, flip, slice_))
+		limit = PHASE1_DEPTH if timeout is None else 99
+		while not self._done and depth <= limit and (self._best is None or depth < len(self._best)):
+			self._phase1(twist, flip, slice_, depth)
+			depth += 1
+		return Algorithm([MOVES[move] for move in self._best]) if self._best is not None else None
+
+	def _phase1_distance(self, twist, flip, slice_):
+		return np.maximum(np.maximum(self.prune['twist_slice'][twist * len(SLICES) + slice_], self.prune['flip_slice'][flip * len(SLICES) + slice_]),
+			self.prune['twist_flip'][twist * FLIPS + flip])
+
+	def _phase2_distance(self, corner, edge, slice_permutation):
+		return np.maximum(self.prune['corner_slice_permutation'][corner * SLICE_PERMUTATIONS + slice_permutation],
+			self.prune['edge_slice_permutation'][edge * SLICE_PERMUTATIONS + slice_permutation])
+
+	def _timed_out(self):
+		if self._deadline is not None and time.monotonic() > self._deadline:
+			self._done = True
+		return self._done
+
+	def _depth_first(self, nodes, depth, stop, expand, found):
+		"""level by level search over chunks of at most CHUNK nodes, chunks being taken depth first so that
+		memory stays bounded. nodes with `stop` moves left are handed to `found`, which ends search by
+		returning True. search ends on time out too, which is checked for every chunk.
+
+		Args:
+			nodes (tuple): arrays of node values, one entry per node
+			depth (int): moves left at nodes
+			stop (int): moves left at nodes handed to found
+			expand (callable): nodes one move further, of nodes and their moves left
+			found (callable): called with nodes at stop
+
+		Returns:
+			bool: True when ended by found
+		"""
+		stack = [(nodes, depth)]
+		while stack:
+			if self._timed_out(): return False
+			nodes, remaining = stack.pop()
+			if remaining == stop:
+				if found(nodes): return True
+				continue
+			nodes = expand(nodes, remaining)
+			for start in range((len(nodes[0]) - 1) // CHUNK * CHUNK, -1, -CHUNK):
+				stack.append((tuple(values[start:start + CHUNK] for values in nodes), remaining - 1))
+		return False
+
+	def _phase1(self, twist, flip, slice_, depth):
+		"""phase 1 solutions of exactly given depth, handed to phase 2 a chunk at a time.
+		"""
+		root = (np.array([twist]), np.array([flip]), np.array([slice_]), np.array([len(self.allowed) - 1]), np.empty((1, 0), dtype=np.intp))
+		self._depth_first(root, depth, 0, self._phase1_moves, self._phase1_found)
+
+	def _phase1_moves(self, nodes, remaining):
+		t, f, s, last, paths = nodes
+		t, f, s = self.twist[t], self.flip[f], self.slice[s]
+		parent, move = np.nonzero(self.allowed[last] & (self._phase1_distance(t, f, s) < remaining))
+		return t[parent, move], f[parent, move], s[parent, move], self.face[move], np.column_stack([paths[parent], move])
+
+	def _phase1_found(self, nodes):
+		paths = nodes[-1]
+		# a phase 1 solution ending with a phase 2 move is a shorter one followed by phase 2
+		if paths.shape[1]: paths = paths[~np.isin(paths[:, -1], PHASE2_MOVES)]
+		self._start_phase2(paths)
+		return self._done
+
+	def _start_phase2(self, paths):
+		"""phase 2 search after phase 1 solutions of a length, keeping the shortest solution if it is shortest so far.
+		"""
+		if not len(paths): return
+		length = paths.shape[1]
+		corner, ep = np.full(len(paths), self._cubies[0]), np.tile(self._cubies[1], (len(paths), 1))
+		for move in paths.T:
+			corner = self.corner[corner, move]
+			ep = np.take_along_axis(ep, MOVE_CUBIES[2][move].astype(np.intp), axis=1)
+		edge, slice_permutation = rank_permutation(ep[:, :8]), rank_permutation(ep[:, 8:] - 8)
+		last = self.face[paths[:, -1]] if length else np.full(len(paths), len(self.allowed) - 1)
+		distance = self._phase2_distance(corner, edge, slice_permutation)
+		limit = min((len(self._best) - 1 if self._best is not None else 99) - length, PHASE2_DEPTH)
+		for depth in range(int(distance.min()), limit + 1):
+			for roots in _chunks(np.flatnonzero(distance <= depth), ROOTS):
+				if self._timed_out(): return
+				found = self._phase2(corner[roots], edge[roots], slice_permutation[roots], last[roots], depth)
+				if found is not None:
+					root, tail = found
+					self._best = paths[roots[root]].tolist() + tail
+					if len(self._best) <= self._target: self._done = True
+					return
+
+	def _phase2(self, corner, edge, slice_permutation, last, depth):
+		"""phase 2 solution of exactly given depth, from many starting nodes at once. nodes are expanded
+		until BALL moves are left, then looked up in states near solved.
+
+		Returns:
+			tuple: (starting node, moves) of a solution, None if there is none
+		"""
+		roots = (corner, edge, slice_permutation, last, np.arange(len(corner)), np.empty((len(corner), 0), dtype=np.intp))
+		solution = []
+		def found(nodes):
+			solution.extend(self._phase2_finish(nodes, depth))
+			return bool(solution)
+		self._depth_first(roots, depth, min(depth, BALL), self._phase2_moves, found)
+		return tuple(solution) if solution else None
+
+	def _phase2_moves(self, nodes, remaining):
+		c, e, s, last, root, paths = nodes
+		c, e, s = self.phase2_corner[c], self.edge[e], self.slice_permutation[s]
+		parent, move = np.nonzero(self.phase2_allowed[last] & (self._phase2_distance(c, e, s) < remaining))
+		return (c[parent, move], e[parent, move], s[parent, move], self.phase2_face[move], root[parent],
+			np.column_stack([paths[parent], self.phase2_moves[move]]))
+
+	def _phase2_finish(self, nodes, depth):
+		"""(starting node, moves) of a node finishing within BALL moves, looked up in states near solved.
+		"""
+		c, e, s, last, root, paths = nodes
+		keys = _phase2_key(c, e, s)
+		at = np.minimum(np.searchsorted(self.ball, keys), len(self.ball) - 1)
+		near = np.flatnonzero((self.ball[at] == keys) & (self.ball_distance[at] <= min(depth, BALL)))
+		if not len(near): return ()
+		node = near[0]
+		moves, c, e, s = paths[node].tolist(), int(c[node]), int(e[node]), int(s[node])
+		while c or e or s:
+			move = self.ball_move[np.searchsorted(self.ball, _phase2_key(c, e, s))]
+			moves.append(PHASE2_MOVES[move])
+			c, e, s = self.phase2_corner[c, move], self.edge[e, move], self.slice_permutation[s, move]
+		return int(root[node]), moves
+
+
+def _chunks(items, size):
+	return [items[i:i + size] for i in range(0, len(items), size)]
+
+_solvers = {}
+
+def solve(cube, max_length=None, timeout=None, directory=None):
+	"""near-optimal solution of a cube with two-phase search.
+
+	Args:
+		cube (Cube): cube to be solved (not changed)
+		max_length (int, optional): stop as soon as a solution this short is found. Defaults to None (first solution).
+		timeout (float, optional): seconds to search for shorter solutions. Defaults to None (no limit).
+		directory (str, optional): table cache folder. Defaults to tables.table_directory().
+
+	Returns:
+		Algorithm: solution, None if no solution found within budget
+	"""
+	if directory not in _solvers: _solvers[directory] = TwoPhaseSolver(directory)
+	return _solvers[directory].solve(cube, max_length, timeout)
@@ -0,0 +1,122 @@
+"""Validity (solvability) checks of cube states, to reject a mis-entered cube before it reaches a solver.
+
+A state is legal (can be reached by turning a solved cube) when, in this order:
+
+	* centers have six different colors, and every center color is on exactly 9 facelets
+	* colors of every corner and edge slot are those of a real piece
+	* no piece is there twice
+	* corner twists add up to a multiple of 3 (no single corner is twisted)
+	* edge flips add up to a multiple of 2 (no single edge is flipped)
+	* corner and edge permutations have same parity (no two pieces are swapped)
+
+`validate` checks one cube and raises ValueError naming what is wrong; `check_states` checks many states
+at once and gives an error code per state (`OK` for a legal one)::
+
+	validate(get_cube("cube.xlsx"))
+	codes = check_states(cubes)           # CubeBatch or (N, 54) array
+	print(ERRORS[codes[0]])
+"""
+import numpy as np
+
+from .state import FACES, FACELETS, DEFAULT_COLORS, solved_state
+from .cubie import CORNERS, EDGES, CORNER_FACELETS, EDGE_FACELETS, face_labels, parity, _pieces
+
+# ---------------
+
+OK, CENTERS, COLORS, PIECE, DUPLICATE, TWIST, FLIP, PARITY = range(8)
+ERRORS = {
+	OK: "legal state",
+	CENTERS: "two centers have same color",
+	COLORS: "a center color is not on exactly 9 facelets",
+	PIECE: "a corner or edge is not a real piece",
+	DUPLICATE: "a piece is there twice",
+	TWIST: "a corner is twisted",
+	FLIP: "an edge is flipped",
+	PARITY: "two pieces are swapped",
+}
+CHUNK = 1 << 16
+
+def _check(states):
+	"""error codes of (N, 54) states.
+	"""
+	centers = np.sort(states[:, 4::9], axis=1)
+	codes = np.full(len(states), OK, dtype=np.int8)
+	codes[(np.diff(centers, axis=1) == 0).any(axis=1)] = CENTERS
+	match = states[:, :, None] == states[:, None, 4::9]
+	codes[(codes == OK) & (match.sum(axis=1) != 9).any(axis=1)] = COLORS
+	# pieces of bad colored states are read from a solved state, their code is set already
+	labels = np.where((codes == OK)[:, None], match.argmax(axis=2), solved_state())
+	cp, co, ep, eo = _pieces(labels)
+	checks = (
+		(PIECE, (cp < 0).any(axis=1) | (ep < 0).any(axis=1)),
+		(DUPLICATE, (np.sort(cp, axis=1) != np.arange(8)).any(axis=1) | (np.sort(ep, axis=1) != np.arange(12)).any(axis=1)),
+		(TWIST, co.sum(axis=1) % 3 != 0),
+		(FLIP, eo.sum(axis=1) % 2 != 0),
+		(PARITY, parity(cp) != parity(ep)),
+	)
+	for code, failed in checks:
+		codes[(codes == OK) & failed] = code
+	return codes
+
+def check_states(states):
+	"""error code of each state, vectorized.
+
+	Args:
+		states (CubeBatch, ndarray): cubes, or (N, 54) facelet color codes
+
+	Returns:
+		ndarray: (N,) int8 error codes, OK for legal states (see ERRORS)
+	"""
+	states = np.asarray(getattr(states, 'states', states)).reshape(-1, FACELETS)
+	return np.concatenate([_check(states[i:i+CHUNK]) for i in range(0, len(states), CHUNK)] or [np.empty(0, dtype=np.int8)])
+
+def is_valid(cube):
+	"""True if cube is a legal state.
+	"""
+	return bool(check_states(cube.state)[0] == OK)
+
+# ---------------
+
+def _names(codes, colors):
+	return '-'.join(colors[code] if code < len(colors) else str(code) for code in codes)
+
+def validate(cube, colors=None):
+	"""check a cube is a legal state.
+
+	Args:
+		cube (Cube, ndarray): cube, or (54,) facelet color codes
+		colors (tuple, optional): color names of codes of an array, for messages. Defaults to DEFAULT_COLORS.
+
+	Raises:
+		ValueError: telling first thing found wrong, ex: "corner at top-right-front is Red-Red-White, which is not a real piece"
+	"""
+	state = np.asarray(getattr(cube, 'state', cube)).reshape(FACELETS)
+	colors = getattr(cube, 'colors', colors or DEFAULT_COLORS)
+	code = _check(state[None])[0]
+	if code == OK: return
+	centers = state[4::9]
+	if code == CENTERS:
+		same = [f for f in range(len(FACES)) if (centers == centers[f]).sum() > 1]
+		raise ValueError(f"centers of {', '.join(FACES[f] for f in same)} have same color {_names(centers[same[:1]], colors)}")
+	if code == COLORS:
+		counts = (state[:, None] == centers).sum(axis=0)
+		wrong = [f"{counts[f]} {_names(centers[f:f+1], colors)}" for f in range(len(FACES)) if counts[f] != 9]
+		others = sorted(set(state.tolist()) - set(centers.tolist()))
+		message = f"cube has {', '.join(wrong)} facelets (9 of each center color expected)"
+		if others: message += f", and facelets of {', '.join(_names([c], colors) for c in others)} which is not a center color"
+		raise ValueError(message)
+	cp, co, ep, eo = _pieces(face_labels(state))
+	if code == PIECE:
+		for kind, slots, facelets, pieces in (('corner', CORNERS, CORNER_FACELETS, cp), ('edge', EDGES, EDGE_FACELETS, ep)):
+			for s in np.flatnonzero(pieces < 0):
+				raise ValueError(f"{kind} at {'-'.join(FACES[f] for f in slots[s])} is {_names(state[facelets[s]], colors)}, which is not a real piece")
+	if code == DUPLICATE:
+		for kind, slots, pieces in (('corner', CORNERS, cp), ('edge', EDGES, ep)):
+			count = np.bincount(pieces, minlength=len(slots))
+			if (count == 1).all(): continue
+			piece, missing = np.flatnonzero(count > 1)[0], np.flatnonzero(count == 0)[0]
+			raise ValueError(f"{kind} {_names(centers[list(slots[piece])], colors)} is there {count[piece]} times, "
+				f"{kind} {_names(centers[list(slots[missing])], colors)} is missing")
+	if code == TWIST: raise ValueError(f"a corner is twisted (corner twists add up to {co.sum() % 3} turns)")
+	if code == FLIP: raise ValueError("an edge is flipped (odd number of edge flips)")
+	raise ValueError("two pieces are swapped (corner and edge permutations have different parity)")
@@ -20,4 +20,5 @@ setuptools.setup(
     ],
     python_requires='>=3.7',
     install_requires=['pandas', 'numpy'],
+    entry_points={'console_scripts': ['cube3d=cube3d.cli:main']},
 )
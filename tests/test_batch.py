@@ -0,0 +1,32 @@
+"""Tests of CubeBatch: moves of many cubes at once against the same moves of single cubes.
+"""
+import numpy as np
+
+from cube3d import Cube, Algorithm
+from cube3d.base import MOVES
+from cube3d.batch import CubeBatch, move_indexes
+
+# ---------------
+
+def test_apply_matches_single_cubes():
+	cubes = CubeBatch.solved(4)
+	cubes.apply("R U R' U' F2")
+	single = Algorithm("R U R' U' F2").apply(Cube())
+	assert all(cube == single for cube in cubes)
+
+def test_apply_moves_per_row_with_padding():
+	rng = np.random.default_rng(1)
+	moves = rng.integers(0, len(MOVES), (50, 12))
+	lengths = rng.integers(0, 13, 50)
+	moves[np.arange(12) >= lengths[:, None]] = -1
+	cubes = CubeBatch.solved(50)
+	cubes.apply_moves(moves)
+	for row, length, cube in zip(moves, lengths, cubes):
+		assert cube == Algorithm([MOVES[m] for m in row[:length]]).apply(Cube())
+	assert cubes.is_solved().tolist() == [cube.is_solved() for cube in cubes]
+
+def test_apply_moves_one_move_per_cube():
+	cubes = CubeBatch.solved(len(MOVES))
+	cubes.apply_moves(np.arange(len(MOVES)))
+	assert [cube == Algorithm(move).apply(Cube()) for move, cube in zip(MOVES, cubes)] == [True] * len(MOVES)
+	assert move_indexes("R U'").tolist() == [MOVES.index('R'), MOVES.index("U'")]
@@ -0,0 +1,40 @@
+"""Tests of cycle analysis: cycles and orders of known sequences, orders against repeated application,
+and repeated algorithms by powers.
+"""
+import numpy as np
+
+from cube3d import Cube, Algorithm
+from cube3d.algorithm import PERMUTATIONS
+from cube3d.cycles import cycles, order
+
+# ---------------
+
+def repetitions(sequence):
+	"""order by applying sequence until its permutation comes back to identity.
+	"""
+	permutation, state, count = Algorithm(sequence).permutation, np.arange(54), 0
+	while True:
+		state, count = state[permutation], count + 1
+		if (state == np.arange(54)).all(): return count
+
+def test_known_sequences():
+	assert [str(cycle) for cycle in cycles("R U")] == ['(URF)+', '(UFL ULB UBR DRB DFR)++', '(UR BR DR FR UF UL UB)']
+	assert cycles("") == [] and cycles("x y") == []
+	assert [len(cycle.slots) for cycle in cycles("R")] == [4, 4]
+	assert {sequence: order(sequence) for sequence in ("", "R", "R2", "R U", "R U R' U'", "R U2 D' B D'", "x", "M")} == {
+		"": 1, "R": 4, "R2": 2, "R U": 105, "R U R' U'": 6, "R U2 D' B D'": 1260, "x": 4, "M": 4}
+
+def test_order_matches_repetitions():
+	rng = np.random.default_rng(9)
+	names = tuple(PERMUTATIONS)
+	for _ in range(50):
+		sequence = [names[i] for i in rng.integers(0, len(names), rng.integers(1, 6))]
+		assert order(sequence) == repetitions(sequence), sequence
+
+def test_powers():
+	algorithm = Algorithm("R U F'")
+	for k in (0, 1, 2, 7, 80, -3):
+		cube = Cube()
+		for _ in range(abs(k)): (algorithm if k >= 0 else algorithm.inverse()).apply(cube)
+		assert (algorithm ** k).apply(Cube()) == cube
+	assert (algorithm ** order(algorithm)).apply(Cube()).is_solved()
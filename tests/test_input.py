@@ -0,0 +1,65 @@
+"""Tests of loading cubes: Excel workbooks (six side sheets or one cube per row) and CSV files.
+"""
+import os
+import csv
+import numpy as np
+import pytest
+
+from cube3d import Cube
+from cube3d.state import FACES
+from cube3d.formats import to_facelets, from_facelets, read_csv
+from cube3d.scramble import random_cube
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('openpyxl')
+from cube3d.input import get_cube, read_cubes, _sheet_to_view
+
+# ---------------
+
+def cubes():
+	return [random_cube(seed) for seed in range(3)] + [Cube()]
+
+def write_sides(path, cubes):
+	"""workbook of six side sheets, one 3x3 block per cube, as written by hand (top row first).
+	"""
+	with pd.ExcelWriter(path) as writer:
+		for view in FACES:
+			blocks = np.concatenate([_sheet_to_view(np.asarray(cube.show(view)), view) for cube in cubes])
+			pd.DataFrame(blocks).to_excel(writer, sheet_name=view, header=False, index=False)
+
+def test_side_sheets(tmp_path):
+	path = tmp_path / 'cubes.xlsx'
+	write_sides(path, cubes())
+	assert list(read_cubes(path)) == cubes()
+	assert get_cube(path) == cubes()[0]
+
+def test_sample_workbook_layout():
+	path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cube.xlsx')
+	if not os.path.exists(path): pytest.skip("no cube.xlsx")
+	cube = get_cube(path)
+	assert list(read_cubes(path)) == [cube]
+	assert sorted(np.unique(cube.state, return_counts=True)[1]) == [9] * 6
+
+def test_rows_sheet(tmp_path):
+	path = tmp_path / 'rows.xlsx'
+	rows = [[to_facelets(cube)] + [''] * 53 for cube in cubes()] + [[str(color) for color in cube.show_all().ravel()] for cube in cubes()]
+	pd.DataFrame(rows).to_excel(path, sheet_name='cubes', header=False, index=False)
+	loaded = list(read_cubes(path))
+	assert loaded == [from_facelets(to_facelets(cube)) for cube in cubes()] + cubes()
+
+def test_csv(tmp_path):
+	path = tmp_path / 'cubes.csv'
+	with open(path, 'w', newline='') as f:
+		writer = csv.writer(f)
+		writer.writerow(['cube'])
+		writer.writerows([to_facelets(cube)] for cube in cubes())
+		writer.writerow([])
+		writer.writerows([str(color) for color in cube.show_all().ravel()] for cube in cubes())
+	assert list(read_cubes(path)) == [from_facelets(to_facelets(cube)) for cube in cubes()] + cubes()
+	assert list(read_csv(path)) == list(read_cubes(path))
+
+def test_csv_bad_row(tmp_path):
+	path = tmp_path / 'bad.csv'
+	path.write_text(f"{to_facelets(Cube())}\nRRR\n")
+	with pytest.raises(ValueError, match="row 2"):
+		read_csv(path)
@@ -0,0 +1,34 @@
+"""Tests of instrumentation: counters, tracer arguments, export and restoring original functions.
+"""
+from cube3d import Cube, Algorithm, instrument, base, batch
+from cube3d.batch import CubeBatch
+
+# ---------------
+
+def test_counters_and_tracer():
+	calls = []
+	cube = Cube()
+	with instrument.instrumented(tracer=lambda *call: calls.append(call)):
+		cube.rotate_square('front')
+		cube.rotate_square(view='top', clockwise=False)
+		Algorithm("R U")(cube)
+		cube.is_solved()
+		CubeBatch.solved(2).rotate_square('left')
+	counts = {operation: values['count'] for operation, values in instrument.snapshot().items()}
+	assert counts == {'Cube.rotate_square': 2, 'Algorithm.apply': 1, 'Cube.is_solved': 1, 'base._rotate_square': 1}
+	assert [call[0] for call in calls] == ['Cube.rotate_square', 'Cube.rotate_square', 'Algorithm.apply', 'Cube.is_solved', 'base._rotate_square']
+	assert calls[0][1] == {'cube': cube, 'view': 'front', 'clockwise': True}
+	assert calls[1][1] == {'cube': cube, 'view': 'top', 'clockwise': False}
+	assert all(seconds >= 0 for *_, seconds in calls)
+	assert 'cube3d_operations_total{operation="Cube.rotate_square"} 2' in instrument.prometheus()
+
+def test_disable_restores_originals():
+	originals = Cube.rotate_square, Algorithm.apply, Algorithm.__call__, batch._rotate_square
+	with instrument.instrumented():
+		assert instrument.is_enabled() and Cube.rotate_square is not originals[0]
+		assert batch._rotate_square is base._rotate_square is not originals[3]
+	assert not instrument.is_enabled()
+	assert (Cube.rotate_square, Algorithm.apply, Algorithm.__call__, batch._rotate_square) == originals
+	instrument.reset()
+	Cube().rotate_square('front')
+	assert instrument.snapshot() == {}
@@ -0,0 +1,61 @@
+"""Tests of cheap copies and the journal: undo/redo, snapshots and copy-on-write clones.
+"""
+import copy
+import numpy as np
+
+from cube3d import Cube, Algorithm
+from cube3d.state import FACES
+from cube3d.scramble import random_cube
+
+# ---------------
+
+def test_undo_redo():
+	cube = random_cube(1)
+	cube.journal_size = 3
+	states = [cube.state.copy()]
+	for move in (('front', True), ('top', False), Algorithm("R U2"), ('left', True)):
+		if isinstance(move, Algorithm): move.apply(cube)
+		else: cube.rotate_square(*move)
+		states.append(cube.state.copy())
+	# only last three moves are kept
+	for state in states[-2:0:-1]:
+		assert cube.undo()
+		assert np.array_equal(cube.state, state)
+	assert not cube.undo()
+	for state in states[2:]:
+		assert cube.redo()
+		assert np.array_equal(cube.state, state)
+	assert not cube.redo()
+	cube.undo()
+	cube.rotate_square('back')
+	assert not cube.redo()
+
+def test_journal_off_by_default():
+	cube = Cube()
+	cube.rotate_square('front')
+	assert not cube.undo() and not cube.is_solved()
+
+def test_snapshot_restore():
+	cube = random_cube(2)
+	cube.journal_size = 10
+	saved, before = cube.snapshot(), cube.state.copy()
+	cube.rotate_square('right')
+	Algorithm("F' D").apply(cube)
+	cube.restore(saved)
+	assert np.array_equal(cube.state, before)
+	assert not cube.undo()
+	cube.rotate_square('front')
+	cube.restore(saved)
+	assert np.array_equal(cube.state, before)
+
+def test_clone_is_copy_on_write():
+	cube = random_cube(3).change_to(FACES[2])
+	before = cube.state.copy()
+	clones = [cube.clone(), copy.copy(cube), copy.deepcopy(cube)]
+	assert all(clone == cube for clone in clones)
+	clones[0].rotate_square('front')
+	Algorithm("R").apply(clones[1])
+	assert np.array_equal(cube.state, before) and np.array_equal(clones[2].state, before)
+	cube.rotate_square('back', False)
+	assert np.array_equal(clones[2].state, before)
+	assert clones[0] == Algorithm("F").apply(Cube(state=before, colors=cube.colors))
@@ -0,0 +1,32 @@
+"""Tests of NxN cubes: a 3x3x3 NxNCube moves as Cube does, and invalid sequences change nothing.
+"""
+import numpy as np
+import pytest
+
+from cube3d import Cube, Algorithm
+from cube3d.state import FACES
+from cube3d.algorithm import PERMUTATIONS
+from cube3d.nxn import NxNCube
+
+# ---------------
+
+def moves(rng, n, names=tuple(PERMUTATIONS)):
+	return [names[i] for i in rng.integers(0, len(names), n)]
+
+def test_nxn_3_matches_cube():
+	rng = np.random.default_rng(5)
+	slices = {'M': '2L', 'E': '2D', 'S': '2F'}
+	for _ in range(50):
+		sequence = moves(rng, 20)
+		cube, nxn = Algorithm(sequence).apply(Cube()), NxNCube(3)
+		nxn.apply(' '.join(slices.get(move[0], move[0]) + move[1:] for move in sequence))
+		for view in FACES:
+			assert np.array_equal(np.asarray(cube.show(view)), np.asarray(nxn.show(view))), sequence
+
+def test_nxn_invalid_sequence_leaves_cube():
+	nxn = NxNCube(3)
+	before = nxn.faces.copy()
+	for sequence in ("R U 4R", "R U Q", "R 0Rw"):
+		with pytest.raises(ValueError):
+			nxn.apply(sequence)
+		assert np.array_equal(nxn.faces, before)
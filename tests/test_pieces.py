@@ -0,0 +1,50 @@
+"""Tests of the piece index: located pieces against a scan of Points, and the incrementally kept index
+against one rebuilt from state.
+"""
+import numpy as np
+
+from cube3d import Algorithm
+from cube3d.state import FACES
+from cube3d.algorithm import PERMUTATIONS
+from cube3d.pieces import PieceIndex
+from cube3d.scramble import random_cube
+
+# ---------------
+
+def moves(rng, n, names=tuple(PERMUTATIONS)):
+	return [names[i] for i in rng.integers(0, len(names), n)]
+
+
+def scan(cube):
+	"""(colors, position) of every Point of cube with colors.
+	"""
+	points = []
+	for point in cube.members.flat:
+		colors = [member['xiscolor'] for member in point.members.values() if member['xiscolor'] is not None]
+		if colors: points.append((colors, tuple(point.members[axis]['direction'] for axis in 'xyz')))
+	return points
+
+def test_pieces_match_point_scan():
+	for seed in range(20):
+		cube = random_cube(seed)
+		if seed % 2: cube = cube.change_to(FACES[1 + seed % 5])
+		for colors, position in scan(cube):
+			piece = cube.locate(colors)
+			assert set(piece.colors) == set(colors)
+			assert piece.position == position
+			assert cube.piece_at(position) == piece
+
+def test_incremental_pieces_match_rebuilt():
+	rng = np.random.default_rng(7)
+	cube = random_cube(8)
+	cube.journal_size = 10
+	cube.pieces()
+	for _ in range(200):
+		r = rng.integers(5)
+		if r < 2: cube.rotate_square(FACES[rng.integers(6)], bool(rng.integers(2)))
+		elif r == 2: Algorithm(moves(rng, 3)).apply(cube)
+		elif r == 3: cube.undo()
+		else: cube.redo()
+		rebuilt = PieceIndex.of_state(cube.state, cube.colors)
+		assert all(np.array_equal(a, b) for a, b in zip(cube.pieces().cubies, rebuilt.cubies))
+		assert cube.unsolved_pieces() == rebuilt.unsolved()
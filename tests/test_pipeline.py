@@ -0,0 +1,50 @@
+"""Tests of the replay pipeline: replayed cubes against single cubes, and both modes of bad lines.
+"""
+import io
+import json
+import numpy as np
+import pytest
+
+from cube3d import Cube, Algorithm
+from cube3d.formats import to_facelets
+from cube3d.pipeline import read_lines, batches, replay, run, RECORD
+
+# ---------------
+
+TEXT = "R U R' U'\n# comment\n\nF2 x M\nR Q\nL D'\n"
+
+def test_replay_matches_single_cubes():
+	start = Algorithm("F B").apply(Cube())
+	done = [(lines, cubes) for lines, cubes in replay(batches(read_lines(io.StringIO("R U\nx M2 D'\n\nL2\n")), 2), start)]
+	assert [n for lines, cubes in done for n, moves in lines] == [1, 2, 4]
+	for lines, cubes in done:
+		for (n, moves), cube in zip(lines, cubes):
+			assert cube == Algorithm(moves).apply(start.clone())
+
+def test_replay_raises_after_earlier_lines():
+	replayed = replay(batches(read_lines(io.StringIO(TEXT))))
+	lines, cubes = next(replayed)
+	assert [n for n, moves in lines] == [1, 4]
+	with pytest.raises(ValueError, match="line 5"):
+		next(replayed)
+
+def test_replay_skips_bad_lines():
+	replayed = list(replay(batches(read_lines(io.StringIO(TEXT))), errors='skip'))
+	assert [[line[0] for line in lines] for lines, cubes in replayed] == [[1, 4], [5], [6]]
+	(n, moves, error), = replayed[1][0]
+	assert replayed[1][1] is None and moves == 'R Q' and error
+	with pytest.raises(ValueError, match="errors mode"):
+		next(replay([], errors='ignore'))
+
+def test_run_formats():
+	out = io.StringIO()
+	assert run(io.StringIO(TEXT), out, errors='skip') == 4
+	records = [json.loads(line) for line in out.getvalue().splitlines()]
+	assert records[2] == {'line': 5, 'moves': 'R Q', 'error': records[2]['error']}
+	assert records[3]['state'] == to_facelets(Algorithm("L D'").apply(Cube()))
+	binary = io.BytesIO()
+	assert run(io.StringIO(TEXT), binary, format='binary', errors='skip') == 3
+	block = np.frombuffer(binary.getvalue(), dtype=RECORD)
+	assert np.array_equal(block['state'][0], Algorithm("R U R' U'").apply(Cube()).state)
+	with pytest.raises(ValueError):
+		run(io.StringIO(TEXT), io.StringIO())
@@ -0,0 +1,37 @@
+"""Tests of state ranks (round trips, illegal states) and of Cube hashing against equality.
+"""
+import random
+import numpy as np
+import pytest
+
+from cube3d import Cube
+from cube3d.state import FACES
+from cube3d.cubie import STATES, rank_state, unrank_state
+from cube3d.scramble import random_cube
+
+# ---------------
+
+def test_rank_roundtrip():
+	assert Cube().rank() == 0
+	for seed in range(100):
+		cube = random_cube(seed)
+		assert Cube.from_rank(cube.rank()) == cube
+	draw = random.Random(2)
+	for rank in [draw.randrange(24 * STATES) for _ in range(100)]:
+		assert rank_state(unrank_state(rank)) == rank
+
+def test_rank_rejects_illegal_state():
+	state = Cube().state.copy()
+	state[0], state[9] = state[9], state[0]
+	with pytest.raises(ValueError):
+		rank_state(state)
+
+def test_equal_cubes_hash_equal():
+	cubes = [random_cube(seed) for seed in range(20)]
+	for cube in cubes:
+		# same colors, in another palette order
+		order = np.arange(len(cube.colors))[::-1]
+		other = Cube(state=order[cube.state].astype(np.uint8), colors=tuple(cube.colors[::-1]))
+		assert other == cube and hash(other) == hash(cube)
+	assert len(set(cubes + [cube.clone() for cube in cubes])) == len(cubes)
+	assert len({Cube(), Cube().change_to(FACES[1])}) == 2
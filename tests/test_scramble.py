@@ -0,0 +1,37 @@
+"""Tests of random states and scrambles: legal states (parities, orientation sums), reproducible draws
+and scrambles without mergeable neighbour moves.
+"""
+import numpy as np
+
+from cube3d import Cube, Algorithm
+from cube3d.cubie import to_cubies, parity
+from cube3d.validate import validate
+from cube3d.scramble import random_states, random_cube, random_batch, random_scrambles, scramble_text
+from cube3d.batch import CubeBatch
+
+# ---------------
+
+def test_random_states_are_legal():
+	cp, co, ep, eo = to_cubies(random_states(2000, 1))
+	assert (parity(cp) == parity(ep)).all()
+	assert (co.sum(axis=1) % 3 == 0).all() and (eo.sum(axis=1) % 2 == 0).all()
+	assert (np.sort(cp, axis=1) == np.arange(8)).all() and (np.sort(ep, axis=1) == np.arange(12)).all()
+	# both parities, and every twist of a corner, are drawn
+	assert set(parity(cp).tolist()) == {0, 1} and set(co[:, 0].tolist()) == {0, 1, 2}
+	for seed in range(10): validate(random_cube(seed))
+
+def test_draws_are_reproducible():
+	assert np.array_equal(random_states(10, 5), random_states(10, 5))
+	assert np.array_equal(random_batch(10, 5).states, random_states(10, 5))
+	assert random_cube(5) == Cube(state=random_states(1, 5)[0])
+
+def test_scrambles():
+	moves = random_scrambles(500, 25, 3)
+	assert moves.shape == (500, 25)
+	faces = moves // 3
+	assert (faces[:, 1:] != faces[:, :-1]).all()
+	# opposite faces (f, f ^ 1) follow each other in one order only
+	assert not ((faces[:, 1:] ^ 1 == faces[:, :-1]) & (faces[:, 1:] < faces[:, :-1])).any()
+	cubes = CubeBatch.solved(3)
+	cubes.apply_moves(moves[:3])
+	assert all(cube == Algorithm(scramble_text(row)).apply(Cube()) for row, cube in zip(moves, cubes))
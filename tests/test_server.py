@@ -0,0 +1,83 @@
+"""Tests of the cube server protocol, against a server run by ``cube3d serve`` on a Unix socket.
+"""
+import os
+import sys
+import json
+import socket
+import subprocess
+import pytest
+
+from cube3d import Cube, Algorithm
+from cube3d.formats import to_facelets
+from cube3d.tables import table_path
+from cube3d.twophase import PRUNING_TABLES
+from cube3d.server import Client, LINE_LIMIT
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="no Unix sockets")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ---------------
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+	"""socket path of a running server, with a data directory holding one cube file.
+	"""
+	folder = tmp_path_factory.mktemp('server')
+	data, path = folder / 'data', str(folder / 'cube3d.sock')
+	data.mkdir()
+	(data / 'r.json').write_text(json.dumps(to_facelets(Algorithm("R").apply(Cube()))))
+	(folder / 'outside.json').write_text(json.dumps(to_facelets(Cube())))
+	env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+	process = subprocess.Popen([sys.executable, '-m', 'cube3d', 'serve', '--socket', path, '--workers', '1', '--data-dir', str(data), '-v'],
+		cwd=ROOT, env=env, stderr=subprocess.PIPE)
+	try:
+		assert b'serving' in process.stderr.readline()
+		yield path
+	finally:
+		process.terminate()
+		process.wait()
+
+def test_load_move_show(server):
+	with Client(socket=server) as client:
+		assert client.request('load', cube='a') == {'solved': True}
+		assert client.request('move', cube='a', moves="R U R' U'") is not None
+		assert client.request('is_solved', cube='a') is False
+		expected = Algorithm("R U R' U'").apply(Cube())
+		assert client.request('show', cube='a', view='front') == [[str(color) for color in row] for row in expected.show('front')]
+		assert client.request('move', cube='a', moves="U R U' R'") is not None
+		assert client.request('is_solved', cube='a') is True
+		assert client.request('load', cube='b', state=to_facelets(expected)) == {'solved': False}
+		assert client.request('validate', cube='b') is True
+		assert client.request('drop', cube='b') is True
+		assert client.request('stats')['connections'] == 1
+
+def test_errors_keep_connection(server):
+	with Client(socket=server) as client:
+		client.request('load', cube='x')
+		for op, fields in (('move', {'cube': 'missing'}), ('nothing', {}), ('show', {'cube': 'x', 'view': 'up'}),
+				('load', {'cube': 'x', 'path': '../outside.json'}), ('solve', {'cube': 'x', 'timeout': 'long'})):
+			with pytest.raises(ValueError):
+				client.request(op, **fields)
+		assert client.request('load', cube='c', path='r.json') == {'solved': False}
+
+def test_invalid_lines(server):
+	with socket.socket(socket.AF_UNIX) as connection:
+		connection.connect(server)
+		file = connection.makefile('rwb')
+		file.write(b'{not json\n' + b'{"pad": "' + b'x' * (LINE_LIMIT + 10) + b'"}\n' + b'{"id": 3, "op": "load", "cube": "z"}\n')
+		file.flush()
+		responses = [json.loads(file.readline()) for _ in range(3)]
+	assert [response['ok'] for response in responses] == [False, False, True]
+	assert 'longer' in responses[1]['error'] and responses[2]['id'] == 3
+
+@pytest.mark.skipif(not all(os.path.exists(table_path(name)) for name in PRUNING_TABLES),
+	reason="two-phase tables not generated (python -m cube3d.tables)")
+def test_solve(server):
+	with Client(socket=server) as client:
+		client.request('load', cube='s', path='r.json')
+		client.request('move', cube='s', moves="U F2 D'")
+		moves = client.request('solve', cube='s', timeout=0.2)
+		assert client.request('is_solved', cube='s') is False
+		client.request('move', cube='s', moves=moves)
+		assert client.request('is_solved', cube='s') is True
@@ -0,0 +1,36 @@
+"""Tests of the simplifier: simplified sequences keep the permutation, streaming matches, and examples.
+"""
+import numpy as np
+
+from cube3d import Algorithm
+from cube3d.algorithm import PERMUTATIONS
+from cube3d.simplify import simplify, Simplifier
+
+# ---------------
+
+def moves(rng, n, names=tuple(PERMUTATIONS)):
+	return [names[i] for i in rng.integers(0, len(names), n)]
+
+
+def test_simplify_keeps_permutation():
+	rng = np.random.default_rng(3)
+	for _ in range(500):
+		sequence = moves(rng, rng.integers(0, 30))
+		simplified = simplify(sequence)
+		assert Algorithm(simplified) == Algorithm(sequence), (sequence, simplified)
+		faces = [move[0] for move in simplified if move[0] not in 'xyz']
+		assert all(a != b for a, b in zip(faces, faces[1:]))
+
+def test_streaming_simplifier_matches():
+	rng = np.random.default_rng(4)
+	for _ in range(200):
+		sequence = moves(rng, rng.integers(0, 40))
+		simplifier, out = Simplifier(window=3), []
+		for move in sequence: out += simplifier.feed([move])
+		out += simplifier.flush()
+		assert Algorithm(out) == Algorithm(sequence)
+
+def test_simplify_examples():
+	assert simplify("R R R U U' x U M") == ("R'", 'F', 'R', "L'")
+	assert simplify("R L R'") == ('L',)
+	assert simplify("R U U' R'") == ()
@@ -0,0 +1,33 @@
+"""Tests of the optimal solver: solutions solve the cube and are no longer than the scramble.
+
+Pattern databases take minutes to generate, so tests are skipped unless they are in
+`tables.table_directory()` (``python -m cube3d.tables``).
+"""
+import os
+import numpy as np
+import pytest
+
+from cube3d import Cube, Algorithm
+from cube3d.base import MOVES
+from cube3d.tables import table_path
+
+pytestmark = pytest.mark.skipif(not all(os.path.exists(table_path(name)) for name in ('pdb_corners', 'pdb_edges_a', 'pdb_edges_b')),
+	reason="pattern databases not generated (python -m cube3d.tables)")
+
+# ---------------
+
+def test_solutions_solve_cube():
+	from cube3d.solver import solve
+	rng = np.random.default_rng(5)
+	for length in range(7):
+		scramble = Algorithm([MOVES[m] for m in rng.integers(0, len(MOVES), length)])
+		cube = scramble.apply(Cube())
+		solution = solve(cube)
+		assert len(solution) <= length
+		assert solution.apply(cube.clone()).is_solved(), (scramble.moves, solution.moves)
+
+def test_max_depth_bounds_search():
+	from cube3d.solver import solve
+	cube = Algorithm("R U F").apply(Cube())
+	assert solve(cube, max_depth=2) is None
+	assert solve(Cube()).moves == ()
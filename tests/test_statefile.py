@@ -0,0 +1,36 @@
+"""Tests of state files: packing round trips, files of cubes in any orientation, and failed writes.
+"""
+import numpy as np
+import pytest
+
+from cube3d import Cube
+from cube3d.state import FACES
+from cube3d.statefile import StateFile, write_states, pack, unpack
+from cube3d.scramble import random_cube, random_states
+
+# ---------------
+
+
+def test_pack_roundtrip():
+	states = random_states(500, 6)
+	assert np.array_equal(unpack(pack(states)), states)
+
+def test_statefile_roundtrip(tmp_path):
+	path = tmp_path / 'cubes.c3d'
+	cubes = [random_cube(seed) for seed in range(20)]
+	cubes += [cube.change_to(FACES[1 + i % 5]) for i, cube in enumerate(cubes[:5])] + [Cube()]
+	assert write_states(path, cubes) == len(cubes)
+	states = StateFile(path)
+	assert len(states) == len(cubes)
+	assert all(states[i] == cube for i, cube in enumerate(cubes))
+	assert states.is_solved().tolist() == [cube.is_solved() for cube in cubes]
+
+def test_statefile_failed_write_leaves_no_file(tmp_path):
+	path = tmp_path / 'cubes.c3d'
+	bad = Cube()
+	state = bad.state.copy()
+	state[0], state[9] = state[9], state[0]
+	bad.state = state
+	with pytest.raises(ValueError):
+		write_states(path, [Cube(), bad])
+	assert list(tmp_path.iterdir()) == []
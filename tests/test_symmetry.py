@@ -0,0 +1,33 @@
+"""Tests of symmetries: canonical form is the same for all 48 symmetric states of a cube.
+"""
+import numpy as np
+
+from cube3d import Cube, Algorithm
+from cube3d.state import FACES
+from cube3d.symmetry import SYMMETRIES, SYMMETRY_INVERSE, apply_symmetry, canonical_state, canonicalize, symmetry_class
+from cube3d.scramble import random_cube, random_states
+
+# ---------------
+
+def test_symmetries_are_distinct_and_invertible():
+	assert len(np.unique(SYMMETRIES, axis=0)) == 48
+	state = random_cube(1).state
+	for symmetry in range(48):
+		assert np.array_equal(apply_symmetry(apply_symmetry(state, symmetry), SYMMETRY_INVERSE[symmetry]), apply_symmetry(state, 0))
+
+def test_canonical_form_unchanged_under_symmetries():
+	for state in random_states(20, 3):
+		representative, symmetry = canonical_state(state)
+		assert np.array_equal(apply_symmetry(state, symmetry), representative)
+		symmetric = apply_symmetry(np.tile(state, (48, 1)), np.arange(48))
+		representatives, _ = canonical_state(symmetric)
+		assert (representatives == representative).all()
+
+def test_canonicalize_cubes():
+	for seed in range(10):
+		cube = random_cube(seed)
+		canonical = canonicalize(cube)
+		for view in FACES[1:]:
+			assert canonicalize(cube.change_to(view)) == canonical
+	assert len(symmetry_class(Cube())) == 1
+	assert len(symmetry_class(Algorithm("R").apply(Cube()))) == 12
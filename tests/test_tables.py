@@ -0,0 +1,50 @@
+"""Tests of pruning table generation: parallel and resumed breadth first search give the serial table.
+"""
+import os
+import numpy as np
+import pytest
+
+from cube3d.tables import breadth_first, unpack, UNKNOWN
+
+# ---------------
+
+SIZE = 20000
+
+class Steps():
+	"""neighbours on a ring of SIZE states, by steps of 1, 37 and 1000 either way (picklable for workers).
+	"""
+	steps = np.array([1, -1, 37, -37, 1000, -1000])
+
+	def __call__(self, index):
+		return (np.asarray(index, dtype=np.int64)[:, None] + self.steps) % SIZE
+
+def reference():
+	distance = np.full(SIZE, UNKNOWN)
+	distance[0], layer, depth = 0, np.array([0]), 0
+	while len(layer) and depth < UNKNOWN - 1:
+		after = np.unique(Steps()(layer))
+		layer = after[distance[after] == UNKNOWN]
+		depth += 1
+		distance[layer] = depth
+	return distance
+
+def test_serial_matches_reference():
+	assert np.array_equal(unpack(breadth_first(SIZE, 0, Steps(), chunk=1000), SIZE), reference())
+
+def test_parallel_matches_serial():
+	serial = breadth_first(SIZE, 0, Steps(), chunk=1000)
+	assert np.array_equal(breadth_first(SIZE, 0, Steps(), workers=2, chunk=1000), serial)
+
+def test_resumed_matches_serial(tmp_path):
+	serial = breadth_first(SIZE, 0, Steps(), chunk=1000)
+	checkpoint = str(tmp_path / 'steps')
+	def interrupt(depth, states, seconds):
+		if depth == 3: raise KeyboardInterrupt
+	with pytest.raises(KeyboardInterrupt):
+		breadth_first(SIZE, 0, Steps(), checkpoint=checkpoint, progress=interrupt, chunk=1000)
+	assert os.path.exists(checkpoint + '.partial.json')
+	depths = []
+	resumed = breadth_first(SIZE, 0, Steps(), checkpoint=checkpoint, progress=lambda depth, *_: depths.append(depth), chunk=1000)
+	assert depths[0] == 4
+	assert np.array_equal(resumed, serial)
+	assert not os.listdir(tmp_path)
@@ -0,0 +1,34 @@
+"""Tests of the two-phase solver: solutions solve the cube, within length and time budgets.
+
+Tests are skipped unless its tables are in `tables.table_directory()` (``python -m cube3d.tables``).
+"""
+import os
+import time
+import pytest
+
+from cube3d import Cube, Algorithm
+from cube3d.tables import table_path
+from cube3d.twophase import PRUNING_TABLES
+from cube3d.scramble import random_cube
+
+pytestmark = pytest.mark.skipif(not all(os.path.exists(table_path(name)) for name in PRUNING_TABLES),
+	reason="two-phase tables not generated (python -m cube3d.tables)")
+
+# ---------------
+
+def test_solutions_solve_cube():
+	from cube3d.twophase import solve
+	cubes = [random_cube(seed) for seed in range(20)] + [Algorithm(moves).apply(Cube()) for moves in ("", "R", "R2 U2", "F B' R L'")]
+	for cube in cubes:
+		solution = solve(cube)
+		assert solution.apply(cube.clone()).is_solved(), solution.moves
+
+def test_max_length_and_timeout():
+	from cube3d.twophase import solve
+	cube = random_cube(5)
+	solution = solve(cube, max_length=20)
+	assert len(solution) <= 20 and solution.apply(cube.clone()).is_solved()
+	start = time.monotonic()
+	solution = solve(cube, timeout=0.3)
+	assert time.monotonic() - start < 1.5
+	assert solution.apply(cube.clone()).is_solved()
@@ -0,0 +1,60 @@
+"""Tests of validity checks: one broken state for each error code, checked alone and in bulk.
+"""
+import numpy as np
+import pytest
+
+from cube3d import Cube
+from cube3d.state import solved_state
+from cube3d.cubie import CORNER_FACELETS, from_cubies
+from cube3d.batch import CubeBatch
+from cube3d.scramble import random_states
+from cube3d.validate import ERRORS, OK, CENTERS, COLORS, PIECE, DUPLICATE, TWIST, FLIP, PARITY, check_states, is_valid, validate
+
+# ---------------
+
+def cubies(cp=(), co=(), ep=(), eo=()):
+	"""state of solved cubies, with given (index, value) changes.
+	"""
+	arrays = [np.arange(8), np.zeros(8, dtype=int), np.arange(12), np.zeros(12, dtype=int)]
+	for array, changes in zip(arrays, (cp, co, ep, eo)):
+		for i, value in changes: array[i] = value
+	return from_cubies(*(array[None].astype(np.int8) for array in arrays))[0]
+
+def broken():
+	"""a state for every error code.
+	"""
+	states = {OK: solved_state()}
+	states[CENTERS] = solved_state().copy()
+	states[CENTERS][4] = states[CENTERS][13]
+	states[COLORS] = solved_state().copy()
+	states[COLORS][0] = states[COLORS][13]
+	# a corner with two of its facelets swapped is a mirror image of a real corner
+	states[PIECE] = solved_state().copy()
+	a, b = CORNER_FACELETS[0][:2]
+	states[PIECE][[a, b]] = states[PIECE][[b, a]]
+	# corner 0 and edge 2 twice, trading colors so that every color is still on 9 facelets
+	states[DUPLICATE] = cubies(cp=[(1, 0)], ep=[(0, 2)])
+	states[TWIST] = cubies(co=[(0, 1)])
+	states[FLIP] = cubies(eo=[(0, 1)])
+	states[PARITY] = cubies(cp=[(0, 1), (1, 0)])
+	return states
+
+def test_every_error_code():
+	states = broken()
+	assert sorted(states) == sorted(ERRORS)
+	for code, state in states.items():
+		assert check_states(state[None]).tolist() == [code], ERRORS[code]
+		assert is_valid(Cube(state=state)) == (code == OK)
+		if code == OK:
+			validate(Cube(state=state))
+			continue
+		with pytest.raises(ValueError):
+			validate(Cube(state=state))
+
+def test_check_states_in_bulk():
+	states = broken()
+	codes = np.array(list(states) * 3)
+	batch = np.stack([states[code] for code in codes])
+	assert check_states(batch).tolist() == codes.tolist()
+	assert check_states(CubeBatch(batch)).tolist() == codes.tolist()
+	assert (check_states(random_states(1000, 4)) == OK).all()